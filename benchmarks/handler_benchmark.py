@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+변환 Lambda 핸들러 로컬 벤치마크
+
+합성 EventBridge 이벤트(S3 Object Created / MediaConvert Job State Change)를 만들어
+각 핸들러 모듈의 lambda_handler를 직접 호출하고, AWS 호출은 botocore before-send 훅에서
+미리 만든 응답과 지연 시간으로 대체합니다. 요청 직렬화/응답 파싱은 실제 botocore 코드가 수행합니다.
+
+모듈마다 새 프로세스에서 실행하여 콜드 임포트 시간과 첫 호출 지연을 따로 측정합니다.
+
+사용 예:
+    python benchmarks/handler_benchmark.py
+    python benchmarks/handler_benchmark.py --modules optimized_lambda_function --events 2000 --latency-ms 0
+"""
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.parse
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HANDLER_MODULES = ['lambda_function', 'enhanced_lambda_function', 'optimized_lambda_function']
+UNSUPPORTED_EXTENSIONS = ['.txt', '.jpg', '.json']
+# 키에 공백/한글/특수문자를 섞어 URL 인코딩 경로를 거치게 함
+KEY_WORDS = ['회의 녹화', 'clip', 'raw footage', '여행+브이로그', 'final (1)', 'demo']
+
+
+def benchmark_environment(latency_ms):
+    """벤치마크용 환경 변수 - 모듈 임포트 전에 설정되어야 함"""
+    return {
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'AWS_DEFAULT_REGION': 'us-east-1',
+        'AWS_REGION': 'us-east-1',
+        'AWS_LAMBDA_FUNCTION_NAME': 'benchmark',
+        'MEDIACONVERT_ROLE_ARN': 'arn:aws:iam::123456789012:role/MediaConvertServiceRole',
+        'OUTPUT_BUCKET': 'benchmark-output',
+        'ANALYSIS_BUCKET': 'benchmark-analysis',
+        'MEDIACONVERT_ENDPOINT_CACHE': os.path.join(tempfile.mkdtemp(), 'endpoints.json'),
+        # 클라이언트 측 속도 제한이 측정을 방해하지 않도록 충분히 크게
+        'CREATE_JOB_TPS': '1000000',
+        'CREATE_JOB_BURST': '1000000',
+        'BENCHMARK_LATENCY_MS': str(latency_ms),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 합성 이벤트
+# ---------------------------------------------------------------------------
+
+def s3_upload_event(rng, extensions, bucket='benchmark-input'):
+    word = rng.choice(KEY_WORDS)
+    key = f"uploads/{rng.randint(1, 999)}/{word} {uuid.UUID(int=rng.getrandbits(128)).hex[:8]}{rng.choice(extensions)}"
+    return {
+        'version': '0',
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'detail-type': 'Object Created',
+        'source': 'aws.s3',
+        'account': '123456789012',
+        'time': '2024-01-01T00:00:00Z',
+        'region': 'us-east-1',
+        'resources': [f"arn:aws:s3:::{bucket}"],
+        'detail': {
+            'version': '0',
+            'bucket': {'name': bucket},
+            'object': {
+                # EventBridge는 키를 URL 인코딩하여 전달
+                'key': urllib.parse.quote_plus(key, safe='/'),
+                'size': rng.choice([5, 80, 400, 3000]) * 1024 * 1024,
+                'etag': uuid.UUID(int=rng.getrandbits(128)).hex,
+                'sequencer': f"{rng.getrandbits(64):016X}"
+            },
+            'request-id': 'benchmark',
+            'requester': '123456789012',
+            'reason': 'PutObject'
+        }
+    }
+
+
+def job_state_event(rng, status):
+    job_id = f"{rng.getrandbits(40):x}-benchmark"
+    detail = {
+        'timestamp': 1704067200000,
+        'accountId': '123456789012',
+        'queue': 'arn:aws:mediaconvert:us-east-1:123456789012:queues/Default',
+        'jobId': job_id,
+        'status': status,
+        'userMetadata': {'InputFile': f"s3://benchmark-input/uploads/{job_id}.mov", 'InputFormat': 'QuickTime'}
+    }
+    if status == 'COMPLETE':
+        detail['outputGroupDetails'] = [{
+            'type': 'FILE_GROUP',
+            'outputDetails': [{
+                'outputFilePaths': [f"s3://benchmark-output/converted/{job_id}_{rung}.mp4"],
+                'durationInMs': rng.randint(5000, 3600000),
+                'videoDetails': {'widthInPx': width, 'heightInPx': height}
+            } for rung, width, height in [('480p', 720, 480), ('720p', 1280, 720)]]
+        }]
+    elif status == 'ERROR':
+        detail.update(errorCode=1040, errorMessage='benchmark error')
+    return {
+        'version': '0',
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'detail-type': 'MediaConvert Job State Change',
+        'source': 'aws.mediaconvert',
+        'account': '123456789012',
+        'time': '2024-01-01T00:00:00Z',
+        'region': 'us-east-1',
+        'resources': [],
+        'detail': detail
+    }
+
+
+def sqs_burst(events):
+    """이벤트들을 SQS 배치 레코드로 감쌈"""
+    return {'Records': [{
+        'messageId': str(uuid.uuid4()),
+        'receiptHandle': 'benchmark',
+        'eventSource': 'aws:sqs',
+        'body': json.dumps(event)
+    } for event in events]}
+
+
+def build_scenarios(rng, extensions, count, burst):
+    """시나리오 이름 → 핸들러 입력 이벤트 목록"""
+    upload_extensions = extensions * 4 + UNSUPPORTED_EXTENSIONS
+    uploads = [s3_upload_event(rng, upload_extensions) for _ in range(count)]
+    # 일부는 같은 이벤트가 다시 전달되는 경우 (멱등성 경로)
+    uploads += [rng.choice(uploads) for _ in range(count // 10)]
+    rng.shuffle(uploads)
+    completions = [job_state_event(rng, rng.choice(['COMPLETE'] * 8 + ['PROGRESSING', 'ERROR'])) for _ in range(count)]
+    return {
+        'upload': uploads,
+        'completion': completions,
+        'upload_burst': [sqs_burst([s3_upload_event(rng, upload_extensions) for _ in range(burst)])
+                         for _ in range(max(1, count // burst))],
+        'completion_burst': [sqs_burst([job_state_event(rng, 'COMPLETE') for _ in range(burst)])
+                             for _ in range(max(1, count // burst))],
+    }
+
+
+# ---------------------------------------------------------------------------
+# botocore 응답 대체
+# ---------------------------------------------------------------------------
+
+class _Raw:
+    def __init__(self, body):
+        self._body = io.BytesIO(body)
+
+    def stream(self, **kwargs):
+        yield self._body.read()
+
+    def read(self, *args, **kwargs):
+        return self._body.read(*args)
+
+
+def _respond(request, event_name, **kwargs):
+    """before-send 훅 - 네트워크 대신 지연 시간 후 미리 만든 응답 반환"""
+    from botocore.awsrequest import AWSResponse
+
+    latency = float(os.environ.get('BENCHMARK_LATENCY_MS', '0')) / 1000
+    if latency:
+        time.sleep(latency)
+    service, operation = event_name.split('.')[1:3]
+    headers = {'x-amzn-requestid': 'benchmark'}
+    status = 200
+    if operation == 'DescribeEndpoints':
+        body = {'endpoints': [{'url': 'https://benchmark.mediaconvert.us-east-1.amazonaws.com'}]}
+    elif operation == 'CreateJob':
+        body = {'job': {'id': f"{random.getrandbits(40):x}-job", 'status': 'SUBMITTED'}}
+    elif operation == 'GetQueue':
+        body = {'queue': {'name': 'Default', 'submittedJobsCount': 3, 'progressingJobsCount': 5}}
+    elif operation == 'PutEvents':
+        entries = json.loads(request.body)['Entries']
+        body = {'FailedEntryCount': 0, 'Entries': [{'EventId': str(uuid.uuid4())} for _ in entries]}
+    elif operation == 'GetObject':
+        # 알 수 없는 컨테이너로 응답하여 분석 후 기본 변환 경로로 진행
+        data = b'\x00' * 1024
+        headers.update({'Content-Range': 'bytes 0-1023/104857600', 'Content-Length': str(len(data))})
+        return AWSResponse(request.url, 206, headers, _Raw(data))
+    elif service == 's3':
+        return AWSResponse(request.url, 200, headers, _Raw(b''))
+    else:
+        body = {}
+    return AWSResponse(request.url, status, headers, _Raw(json.dumps(body).encode()))
+
+
+# ---------------------------------------------------------------------------
+# 측정 (모듈별 자식 프로세스)
+# ---------------------------------------------------------------------------
+
+class _Context:
+    function_name = 'benchmark'
+    memory_limit_in_mb = 1024
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self):
+        return 900000
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_worker(module_name, count, burst, seed):
+    """모듈 하나를 임포트하고 시나리오별로 호출하여 결과 dict 반환"""
+    sys.path.insert(0, ROOT)
+    # 핸들러 로그/EMF 출력은 버림 (출력 비용 자체는 측정에 포함)
+    # 로거가 임포트 시점의 sys.stdout을 잡으므로 임포트 전에 바꿔야 함
+    real_stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+
+    started = time.perf_counter()
+    import importlib
+    module = importlib.import_module(module_name)
+    import_ms = (time.perf_counter() - started) * 1000
+
+    from video_pipeline import clients
+    clients._get_session().events.register('before-send', _respond)
+
+    rng = random.Random(seed)
+    extensions = sorted(module.SUPPORTED_VIDEO_FORMATS)
+    scenarios = build_scenarios(rng, extensions, count, burst)
+
+    try:
+        first_event = scenarios['upload'][0]
+        started = time.perf_counter()
+        module.lambda_handler(first_event, _Context())
+        first_call_ms = (time.perf_counter() - started) * 1000
+
+        results = {}
+        for name, events in scenarios.items():
+            latencies = []
+            records = 0
+            scenario_started = time.perf_counter()
+            for event in events:
+                started = time.perf_counter()
+                module.lambda_handler(event, _Context())
+                latencies.append((time.perf_counter() - started) * 1000)
+                records += len(event.get('Records', [event]))
+            elapsed = time.perf_counter() - scenario_started
+
+            # 할당량은 별도 패스로 측정 (tracemalloc이 실행 속도를 떨어뜨리므로)
+            tracemalloc.start()
+            peaks = []
+            for event in events[:min(len(events), 50)]:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                module.lambda_handler(event, _Context())
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            tracemalloc.stop()
+
+            results[name] = {
+                'invocations': len(events),
+                'records': records,
+                'p50_ms': round(_percentile(latencies, 0.5), 3),
+                'p99_ms': round(_percentile(latencies, 0.99), 3),
+                'mean_ms': round(statistics.mean(latencies), 3),
+                'records_per_sec': round(records / elapsed, 1),
+                'peak_alloc_kb': round(statistics.mean(peaks) / 1024, 1),
+            }
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    return {
+        'module': module_name,
+        'cold_import_ms': round(import_ms, 1),
+        'first_call_ms': round(first_call_ms, 1),
+        'scenarios': results,
+    }
+
+
+def run_module(module_name, args):
+    """새 프로세스에서 모듈 하나를 측정 (콜드 임포트 시간을 정확히 재기 위해)"""
+    env = dict(os.environ, **benchmark_environment(args.latency_ms))
+    command = [sys.executable, os.path.abspath(__file__), '--worker', module_name,
+               '--events', str(args.events), '--burst', str(args.burst), '--seed', str(args.seed)]
+    output = subprocess.run(command, env=env, cwd=ROOT, check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def print_report(results, latency_ms):
+    print(f"\n주입된 AWS 응답 지연: {latency_ms}ms")
+    for result in results:
+        print(f"\n== {result['module']} (콜드 임포트 {result['cold_import_ms']}ms, 첫 호출 {result['first_call_ms']}ms)")
+        print(f"{'시나리오':<18}{'호출':>7}{'레코드':>8}{'p50 ms':>10}{'p99 ms':>10}{'레코드/초':>12}{'최대 할당 KB':>14}")
+        for name, row in result['scenarios'].items():
+            print(f"{name:<20}{row['invocations']:>7}{row['records']:>8}{row['p50_ms']:>10}{row['p99_ms']:>10}"
+                  f"{row['records_per_sec']:>12}{row['peak_alloc_kb']:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변환 Lambda 핸들러 로컬 벤치마크')
+    parser.add_argument('--modules', nargs='+', default=HANDLER_MODULES, choices=HANDLER_MODULES)
+    parser.add_argument('--events', type=int, default=500, help='시나리오별 이벤트 수')
+    parser.add_argument('--burst', type=int, default=10, help='SQS 배치 하나에 담을 레코드 수')
+    parser.add_argument('--latency-ms', type=float, default=5, help='AWS 호출마다 주입할 지연 시간')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker, args.events, args.burst, args.seed)
+        print(json.dumps(result))
+        return
+
+    results = [run_module(name, args) for name in args.modules]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_report(results, args.latency_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+변환 파이프라인 이산 사건 시뮬레이터 (용량/지연 계획용)
+
+업로드 도착 → 변환 Lambda(동시 실행 한도, 콜드 스타트) → create_job(계정 TPS 한도, 재시도/지연 큐)
+→ MediaConvert 큐(동시 처리 슬롯, 우선순위) → 완료 이벤트 → (분할 변환이면 이어 붙이기 작업) 흐름을
+가상 시간으로 재생하고, 큐 대기 시간/종단 간 지연 백분위와 콘텐츠 1시간당 비용을 보고합니다.
+
+큐 선택, 가속 정책, 렌디션 사다리, 분할 계획, 재시도 설정은 Lambda와 같은 video_pipeline 코드와
+환경 변수(MEDIACONVERT_QUEUES, ACCELERATION_POLICY, SEGMENT_*, SUBMIT_* 등)를 그대로 사용하므로
+설정 변경을 배포 전에 비교할 수 있습니다. AWS 호출은 하지 않습니다.
+
+사용 예:
+    python benchmarks/pipeline_simulator.py --rate 600 --hours 2
+    MEDIACONVERT_QUEUES='[{"name": "reserved", "reserved": true, "capacity": 10}, {"name": "Default", "capacity": 20}]' \\
+        python benchmarks/pipeline_simulator.py --trace jobs.jsonl --json
+"""
+import argparse
+import collections
+import heapq
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# 정책 모듈의 결정 로그/지표가 시뮬레이션 출력에 섞이지 않도록 임포트 전에 설정
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from video_pipeline import acceleration, budget, queues, rate_limit, renditions, segments  # noqa: E402
+
+# 렌디션별 인코딩 속도 (실시간 대비 배수, 가속 없는 온디맨드 큐 기준)
+DEFAULT_ENCODE_SPEED = {'480p': 6.0, '720p': 3.0, '1080p': 1.5}
+# 재인코딩 없이 다시 담는 작업(remux/이어 붙이기)의 속도
+DEFAULT_REMUX_SPEED = 40.0
+
+# 출력 1분당 요금은 사전 비용 추정(budget.PRICE_PER_MINUTE, COST_PRICE_PER_MINUTE)과 같은 표 사용 - --price로 덮어쓰기
+# 예약 큐 슬롯 월 요금 (USD) / Lambda GB-초 요금 / 요청 100만 건 요금
+DEFAULT_RESERVED_SLOT_MONTHLY = 400.0
+LAMBDA_GB_SECOND_PRICE = 0.0000166667
+LAMBDA_REQUEST_PRICE = 0.20 / 1000000
+HOURS_PER_MONTH = 730
+
+# 합성 입력 분포
+SOURCE_HEIGHTS = ((480, 0.2), (720, 0.3), (1080, 0.4), (2160, 0.1))
+
+
+# ---------------------------------------------------------------------------
+# 도착 트레이스
+# ---------------------------------------------------------------------------
+
+def synthetic_arrivals(rng, rate_per_hour, hours, median_duration, bitrate, copy_ratio, remux_ratio):
+    """포아송 도착, 로그정규 길이 분포의 합성 업로드 목록"""
+    arrivals = []
+    at = 0.0
+    while True:
+        at += rng.expovariate(rate_per_hour / 3600)
+        if at >= hours * 3600:
+            return arrivals
+        arrivals.append(synthetic_upload(rng, at, median_duration, bitrate, copy_ratio, remux_ratio))
+
+
+def synthetic_upload(rng, at, median_duration, bitrate, copy_ratio, remux_ratio, **known):
+    duration = known.get('duration') or min(6 * 3600, max(5.0, rng.lognormvariate(math.log(median_duration), 1.0)))
+    roll = rng.random()
+    action = known.get('action') or (
+        'copy' if roll < copy_ratio else 'remux' if roll < copy_ratio + remux_ratio else 'transcode'
+    )
+    heights, weights = zip(*SOURCE_HEIGHTS)
+    return {
+        'at': at,
+        'key': known.get('key') or f"uploads/sim-{rng.getrandbits(48):012x}.mov",
+        'duration': duration,
+        'size': known.get('size') or int(duration * bitrate / 8),
+        'height': known.get('height') or rng.choices(heights, weights)[0],
+        'action': action,
+    }
+
+
+def load_trace(path, rng, median_duration, bitrate, copy_ratio, remux_ratio):
+    """
+    JSONL 트레이스 재생 - 한 줄에 업로드 하나
+    필드: at(시작 기준 초) 또는 submitted_at(epoch 초, 작업 상태 기록 형식) 또는 time(ISO 8601),
+    선택: duration, size, height, key(또는 input), action - 없는 값은 합성 분포에서 채움
+    작업 상태 기록에서 내보낸 구간/이어 붙이기 작업은 시뮬레이터가 다시 만들므로 건너뜁니다.
+    """
+    rows = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if row.get('action') in ('segment', 'stitch'):
+                continue
+            if 'at' in row:
+                at = float(row['at'])
+            elif 'submitted_at' in row:
+                at = float(row['submitted_at'])
+            else:
+                at = datetime.fromisoformat(row['time'].replace('Z', '+00:00')).timestamp()
+            action = row.get('action')
+            if action == 'cache_hit':
+                action = 'copy'
+            rows.append((at, row, action if action in ('copy', 'remux', 'transcode') else None))
+    if not rows:
+        return []
+    start = min(at for at, _, _ in rows)
+    return sorted(
+        (synthetic_upload(rng, at - start, median_duration, bitrate, copy_ratio, remux_ratio,
+                          duration=row.get('duration'), size=row.get('size'), height=row.get('height'),
+                          key=row.get('key') or row.get('input'), action=action)
+         for at, row, action in rows),
+        key=lambda upload: upload['at']
+    )
+
+
+# ---------------------------------------------------------------------------
+# 시뮬레이션 구성 요소
+# ---------------------------------------------------------------------------
+
+class SimTokenBucket:
+    """가상 시간 토큰 버킷 (MediaConvert 계정 create_job 한도)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = 0.0
+
+    def take(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class SimQueue:
+    """MediaConvert 큐 - 동시 처리 슬롯, 우선순위 높은 작업부터 (같으면 먼저 제출된 순)"""
+
+    def __init__(self, name, capacity, reserved=False):
+        self.name = name
+        self.capacity = capacity
+        self.reserved = reserved
+        self.waiting = []
+        self.running = 0
+        self.busy_seconds = 0.0
+        self.waits = []
+
+    def backlog(self):
+        return len(self.waiting) + self.running
+
+
+class Simulator:
+
+    def __init__(self, args, rng):
+        self.args = args
+        self.rng = rng
+        self.now = 0.0
+        self._events = []
+        self._seq = 0
+
+        configured = queues.MEDIACONVERT_QUEUES or [{'name': 'Default', 'capacity': args.default_capacity}]
+        self.queues = {
+            q['name']: SimQueue(q['name'], q.get('capacity', queues.DEFAULT_QUEUE_CAPACITY), q.get('reserved', False))
+            for q in configured
+        }
+        self.default_queue = configured[0]['name']
+        self.api = SimTokenBucket(args.account_tps, args.account_burst)
+
+        self.lambda_active = 0
+        self.lambda_warm = 0
+        self.lambda_waiting = collections.deque()
+        self.lambda_peak = 0
+        self.lambda_busy_seconds = 0.0
+        self.lambda_invocations = 0
+        self.lambda_waits = []
+        self.cold_starts = 0
+
+        self.uploads = []
+        self.jobs = []
+        self.counters = collections.Counter()
+
+    # 사건 큐 -----------------------------------------------------------------
+
+    def schedule(self, at, action, *payload):
+        self._seq += 1
+        heapq.heappush(self._events, (at, self._seq, action, payload))
+
+    def run(self, arrivals):
+        for upload in arrivals:
+            upload.update(done_at=None, deferrals=0, jobs=[])
+            self.uploads.append(upload)
+            self.schedule(upload['at'], self.arrive, upload)
+        while self._events:
+            self.now, _, action, payload = heapq.heappop(self._events)
+            action(*payload)
+        return self.report()
+
+    # Lambda -----------------------------------------------------------------
+
+    def invoke(self, task):
+        """Lambda 호출 - 동시 실행 한도를 넘으면 비동기 호출 대기열에서 기다림"""
+        task['queued_at'] = self.now
+        if self.lambda_active < self.args.lambda_concurrency:
+            self._start_lambda(task)
+        else:
+            self.lambda_waiting.append(task)
+
+    def _start_lambda(self, task):
+        self.lambda_active += 1
+        self.lambda_invocations += 1
+        self.lambda_peak = max(self.lambda_peak, self.lambda_active)
+        self.lambda_waits.append(self.now - task['queued_at'])
+        task['started_at'] = self.now
+        service = task['service']
+        if self.lambda_active > self.lambda_warm:
+            # 새 실행 환경 - 한 번 만든 환경은 시뮬레이션 동안 유지된다고 가정
+            self.lambda_warm += 1
+            self.cold_starts += 1
+            service += self.args.cold_start_ms / 1000
+        self.schedule(self.now + service, self._lambda_body_done, task)
+
+    def _lambda_body_done(self, task):
+        # 핸들러 본문 처리 후 제출할 작업을 하나씩 create_job 호출 (실패 시 같은 호출 안에서 재시도)
+        task['attempt'] = 0
+        task['submit_started'] = self.now
+        self._submit_next(task)
+
+    def _finish_lambda(self, task):
+        self.lambda_active -= 1
+        self.lambda_busy_seconds += self.now - task['started_at']
+        if task.get('on_finish'):
+            task['on_finish']()
+        if self.lambda_waiting:
+            self._start_lambda(self.lambda_waiting.popleft())
+
+    def _submit_next(self, task):
+        pending = task['jobs']
+        if not pending:
+            self._finish_lambda(task)
+            return
+        if self.api.take(self.now):
+            job = pending.pop(0)
+            task['attempt'] = 0
+            task['submit_started'] = self.now
+            submitted_at = self.now + self.args.api_latency_ms / 1000
+            self.schedule(submitted_at, self.enqueue_job, job)
+            self.schedule(submitted_at, self._submit_next, task)
+            return
+
+        # rate_limit.create_job과 같은 재시도: full jitter 지수 백오프, 시도/대기 한도 초과 시 지연 큐로
+        self.counters['throttles'] += 1
+        task['attempt'] += 1
+        waited = self.now - task['submit_started']
+        if task['attempt'] >= rate_limit.SUBMIT_MAX_ATTEMPTS or waited >= rate_limit.SUBMIT_MAX_WAIT_SECONDS:
+            self.counters['deferrals'] += 1
+            upload = task['upload']
+            upload['deferrals'] += 1
+            remaining = list(pending)
+            pending.clear()
+            self._finish_lambda(task)
+            self.schedule(self.now + rate_limit.DEFERRAL_DELAY_SECONDS, self.resubmit, upload, remaining)
+            return
+        delay = self.rng.uniform(0, min(rate_limit.BACKOFF_MAX_SECONDS,
+                                        rate_limit.BACKOFF_BASE_SECONDS * 2 ** (task['attempt'] - 1)))
+        self.schedule(self.now + max(delay, 0.001), self._submit_next, task)
+
+    # 업로드 처리 (lambda_handler → create_mp4_conversion_job) ----------------
+
+    def arrive(self, upload):
+        jobs, extra = self.plan_jobs(upload)
+        task = {'upload': upload, 'jobs': jobs, 'service': self.args.handler_ms / 1000 + extra}
+        if not jobs:
+            # 복사 - MediaConvert 작업 없이 Lambda 안에서 끝남
+            task['on_finish'] = lambda: self.complete_upload(upload)
+        self.invoke(task)
+
+    def resubmit(self, upload, jobs):
+        """지연 큐에서 다시 전달된 이벤트 - 제출하지 못한 작업만 다시 제출 (중복 제거 저장소로 나머지는 건너뜀)"""
+        self.invoke({'upload': upload, 'jobs': jobs, 'service': self.args.handler_ms / 1000})
+
+    def plan_jobs(self, upload):
+        """업로드 하나에서 제출할 작업 목록과 본문 처리 추가 시간(초) - 핸들러와 같은 정책 모듈 사용"""
+        if upload['action'] == 'copy':
+            return [], upload['size'] / (self.args.copy_mbps * 1024 * 1024)
+        ladder = renditions.select_ladder(upload['key'])
+        rungs = renditions.ladder_rungs(ladder, upload['height'])
+        if upload['action'] == 'remux':
+            # 재인코딩하지 않으므로 출력은 하나
+            return [self.new_job(upload, 'remux', upload['duration'], rungs[:1], upload['size'])], 0.0
+
+        # 합성/기록 업로드에는 프레임 레이트가 없으므로 30fps로 가정 (분할 여부 판단에만 사용)
+        ranges = segments.plan(upload['duration'], upload.get('frame_rate', 30))
+        if not ranges:
+            return [self.new_job(upload, 'transcode', upload['duration'], rungs, upload['size'])], 0.0
+        group = {'upload': upload, 'remaining': len(ranges), 'rungs': rungs, 'stitches': len(rungs)}
+        segment_size = int(upload['size'] / len(ranges))
+        jobs = []
+        for start, end in ranges:
+            length = (end if end is not None else upload['duration']) - start
+            jobs.append(self.new_job(upload, 'segment', length, rungs, segment_size, group=group))
+        return jobs, 0.0
+
+    def new_job(self, upload, kind, duration, rungs, size=None, group=None):
+        if kind in ('transcode', 'segment'):
+            tuning = acceleration.select(size, {'duration': duration, 'height': upload['height']})
+        else:
+            tuning = {'mode': None, 'queue': None}
+        accelerated = tuning['mode'] in ('PREFERRED', 'ENABLED')
+        job = {
+            'upload': upload, 'kind': kind, 'duration': duration, 'rungs': rungs, 'size': size,
+            'group': group, 'accelerated': accelerated, 'policy_queue': tuning['queue'],
+            'submitted_at': None, 'started_at': None, 'finished_at': None,
+        }
+        upload['jobs'].append(job)
+        self.jobs.append(job)
+        return job
+
+    # MediaConvert ----------------------------------------------------------
+
+    def route(self, job):
+        """queues.route_job으로 큐 선택 - 적체는 GetQueue 대신 시뮬레이션 상태를 넣어 줌"""
+        for name, sim_queue in self.queues.items():
+            # fetched_at을 무한대로 두어 TTL 설정과 관계없이 항상 이 값을 사용
+            queues._stats[name] = {'backlog': sim_queue.backlog(), 'fetched_at': float('inf')}
+        size = job['size'] if job['kind'] != 'stitch' else None
+        route = queues.route_job(size, job['accelerated'], job['policy_queue'])
+        name = route['queue'] or self.default_queue
+        if name not in self.queues:
+            # 정책이 지정한 큐가 MEDIACONVERT_QUEUES에 없으면 기본 용량의 온디맨드 큐로 가정
+            self.queues[name] = SimQueue(name, queues.DEFAULT_QUEUE_CAPACITY)
+        return self.queues[name], route['priority'] or 0
+
+    def enqueue_job(self, job):
+        sim_queue, priority = self.route(job)
+        job.update(submitted_at=self.now, queue=sim_queue.name, priority=priority)
+        # 예약 큐에서는 가속 변환을 실행할 수 없음
+        job['accelerated'] = job['accelerated'] and not sim_queue.reserved
+        heapq.heappush(sim_queue.waiting, (-priority, self.now, id(job), job))
+        self._dispatch(sim_queue)
+
+    def _dispatch(self, sim_queue):
+        while sim_queue.waiting and sim_queue.running < sim_queue.capacity:
+            _, _, _, job = heapq.heappop(sim_queue.waiting)
+            sim_queue.running += 1
+            job['started_at'] = self.now
+            sim_queue.waits.append(self.now - job['submitted_at'])
+            self.schedule(self.now + self.encode_seconds(job), self.finish_job, sim_queue, job)
+
+    def encode_seconds(self, job):
+        args = self.args
+        if job['kind'] in ('remux', 'stitch'):
+            seconds = job['duration'] / args.remux_speed
+        else:
+            # 한 번 디코딩해서 렌디션마다 인코딩 - 렌디션별 인코딩 시간의 합
+            seconds = sum(job['duration'] / args.encode_speed[rung] for rung in job['rungs'])
+            if job['accelerated']:
+                seconds /= args.accel_speedup
+        return args.job_overhead + seconds
+
+    def finish_job(self, sim_queue, job):
+        sim_queue.running -= 1
+        sim_queue.busy_seconds += self.now - job['started_at']
+        job['finished_at'] = self.now
+        self._dispatch(sim_queue)
+        # 완료 이벤트가 EventBridge를 거쳐 완료 처리 Lambda로 전달됨
+        self.schedule(self.now + self.args.event_delay_ms / 1000, self.job_event, job)
+
+    # 완료 처리 (handle_mediaconvert_completion / segments.on_segment_complete) ------
+
+    def job_event(self, job):
+        upload = job['upload']
+        task = {'upload': upload, 'jobs': [], 'service': self.args.completion_ms / 1000}
+        group = job['group']
+        if job['kind'] == 'segment':
+            group['remaining'] -= 1
+            if group['remaining'] == 0:
+                # 모든 구간 완료 - 렌디션마다 이어 붙이기 작업 제출
+                task['jobs'] = [
+                    self.new_job(upload, 'stitch', upload['duration'], (rung,), group=group) for rung in group['rungs']
+                ]
+        elif job['kind'] == 'stitch':
+            group['stitches'] -= 1
+            if group['stitches'] == 0:
+                task['on_finish'] = lambda: self.complete_upload(upload)
+        else:
+            task['on_finish'] = lambda: self.complete_upload(upload)
+        self.invoke(task)
+
+    def complete_upload(self, upload):
+        upload['done_at'] = self.now
+
+    # 보고서 -----------------------------------------------------------------
+
+    def cost(self, makespan):
+        prices = self.args.price
+        on_demand = 0.0
+        for job in self.jobs:
+            if job['finished_at'] is None or self.queues[job['queue']].reserved:
+                continue
+            minutes = job['duration'] / 60
+            if job['kind'] in ('remux', 'stitch'):
+                on_demand += minutes * prices['passthrough']
+            else:
+                rate = sum(prices[rung] for rung in job['rungs'])
+                on_demand += minutes * rate * (self.args.accel_price_multiplier if job['accelerated'] else 1)
+        reserved_slots = sum(q.capacity for q in self.queues.values() if q.reserved)
+        reserved = reserved_slots * self.args.reserved_slot_monthly / HOURS_PER_MONTH * makespan / 3600
+        lambda_cost = (self.lambda_busy_seconds * self.args.lambda_memory_mb / 1024 * LAMBDA_GB_SECOND_PRICE
+                       + self.lambda_invocations * LAMBDA_REQUEST_PRICE)
+        return {'mediaconvert_on_demand': on_demand, 'mediaconvert_reserved': reserved, 'lambda': lambda_cost}
+
+    def report(self):
+        done = [u for u in self.uploads if u['done_at'] is not None]
+        makespan = max([u['done_at'] for u in done] + [self.now, 1e-9])
+        content_hours = sum(u['duration'] for u in done) / 3600
+        cost = self.cost(makespan)
+        total_cost = sum(cost.values())
+        finished = [job for job in self.jobs if job['finished_at'] is not None]
+        kinds = collections.Counter(job['kind'] for job in self.jobs)
+        all_waits = [wait for q in self.queues.values() for wait in q.waits]
+        return {
+            'uploads': len(self.uploads),
+            'completed': len(done),
+            'content_hours': round(content_hours, 2),
+            'makespan_hours': round(makespan / 3600, 2),
+            'jobs': dict(kinds),
+            'accelerated_jobs': sum(1 for job in finished if job['accelerated']),
+            'throttles': self.counters['throttles'],
+            'deferrals': self.counters['deferrals'],
+            'lambda': {
+                'invocations': self.lambda_invocations,
+                'peak_concurrency': self.lambda_peak,
+                'cold_starts': self.cold_starts,
+                'wait_seconds': summarize(self.lambda_waits),
+            },
+            'queue_wait_seconds': summarize(all_waits),
+            'queues': {
+                name: {
+                    'capacity': q.capacity,
+                    'reserved': q.reserved,
+                    'jobs': len(q.waits),
+                    'utilization': round(q.busy_seconds / (q.capacity * makespan), 3),
+                    'wait_seconds': summarize(q.waits),
+                }
+                for name, q in self.queues.items()
+            },
+            'end_to_end_seconds': summarize([u['done_at'] - u['at'] for u in done]),
+            'end_to_end_by_action': {
+                action: summarize([u['done_at'] - u['at'] for u in done if u['action'] == action])
+                for action in sorted({u['action'] for u in done})
+            },
+            'cost_usd': {name: round(value, 2) for name, value in dict(cost, total=total_cost).items()},
+            'cost_per_content_hour_usd': round(total_cost / content_hours, 3) if content_hours else None,
+        }
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        'p50': round(_percentile(values, 0.5), 1),
+        'p95': round(_percentile(values, 0.95), 1),
+        'p99': round(_percentile(values, 0.99), 1),
+        'max': round(max(values), 1),
+    }
+
+
+def print_report(report):
+    def row(label, stats):
+        if stats:
+            print(f"  {label:<24} p50 {stats['p50']:>9.1f}s  p95 {stats['p95']:>9.1f}s  "
+                  f"p99 {stats['p99']:>9.1f}s  max {stats['max']:>9.1f}s")
+
+    print(f"업로드 {report['uploads']}건 (완료 {report['completed']}), 콘텐츠 {report['content_hours']}시간, "
+          f"전체 처리 {report['makespan_hours']}시간")
+    print(f"작업 {report['jobs']} / 가속 {report['accelerated_jobs']} / 스로틀 {report['throttles']} / "
+          f"지연 큐 {report['deferrals']}")
+    lambda_stats = report['lambda']
+    print(f"Lambda 호출 {lambda_stats['invocations']}, 최대 동시 실행 {lambda_stats['peak_concurrency']}, "
+          f"콜드 스타트 {lambda_stats['cold_starts']}")
+    row('Lambda 대기', lambda_stats['wait_seconds'])
+    row('큐 대기 (전체)', report['queue_wait_seconds'])
+    for name, q in report['queues'].items():
+        kind = '예약' if q['reserved'] else '온디맨드'
+        print(f"  큐 {name} ({kind}, 슬롯 {q['capacity']}): 작업 {q['jobs']}, 사용률 {q['utilization']:.0%}")
+        row(f"  {name} 대기", q['wait_seconds'])
+    row('종단 간 지연', report['end_to_end_seconds'])
+    for action, stats in report['end_to_end_by_action'].items():
+        row(f"  {action}", stats)
+    cost = report['cost_usd']
+    print(f"비용 ${cost['total']} (온디맨드 ${cost['mediaconvert_on_demand']}, 예약 ${cost['mediaconvert_reserved']}, "
+          f"Lambda ${cost['lambda']}) - 콘텐츠 1시간당 ${report['cost_per_content_hour_usd']}")
+
+
+def _key_values(text, default):
+    """'480p=6,720p=3' 형식 → default를 덮어쓴 dict"""
+    values = dict(default)
+    for item in filter(None, text.split(',')):
+        key, value = item.split('=', 1)
+        values[key.strip()] = float(value)
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='변환 파이프라인 용량/지연 시뮬레이터 (오프라인)')
+    parser.add_argument('--trace', help='도착 트레이스 JSONL (없으면 합성 포아송 도착)')
+    parser.add_argument('--rate', type=float, default=300, help='합성 도착률 (업로드/시간)')
+    parser.add_argument('--hours', type=float, default=1, help='합성 도착 기간 (시간)')
+    parser.add_argument('--median-duration', type=float, default=300, help='합성 입력 길이 중앙값 (초)')
+    parser.add_argument('--bitrate', type=float, default=8000000, help='합성 입력 비트레이트 (bps, 크기 계산용)')
+    parser.add_argument('--copy-ratio', type=float, default=0.1, help='변환 없이 복사되는 입력 비율')
+    parser.add_argument('--remux-ratio', type=float, default=0.1, help='재인코딩 없이 다시 담는 입력 비율')
+    parser.add_argument('--seed', type=int, default=1)
+
+    parser.add_argument('--lambda-concurrency', type=int, default=100, help='변환 Lambda 동시 실행 한도')
+    parser.add_argument('--lambda-memory-mb', type=int, default=256)
+    parser.add_argument('--handler-ms', type=float, default=300, help='업로드 이벤트 처리 시간 (입력 분석 포함)')
+    parser.add_argument('--completion-ms', type=float, default=50, help='완료 이벤트 처리 시간')
+    parser.add_argument('--cold-start-ms', type=float, default=800)
+    parser.add_argument('--copy-mbps', type=float, default=100, help='서버 측 복사 속도 (MiB/s)')
+
+    parser.add_argument('--account-tps', type=float, default=20, help='계정 create_job 초당 한도')
+    parser.add_argument('--account-burst', type=int, default=40)
+    parser.add_argument('--api-latency-ms', type=float, default=150, help='create_job 응답 시간')
+    parser.add_argument('--event-delay-ms', type=float, default=1000, help='완료 이벤트 전달 지연')
+
+    parser.add_argument('--default-capacity', type=int, default=queues.DEFAULT_QUEUE_CAPACITY,
+                        help='MEDIACONVERT_QUEUES가 없을 때 Default 큐 동시 처리 수')
+    parser.add_argument('--encode-speed', default='', help='렌디션별 인코딩 속도 (실시간 배수, 예: 480p=6,720p=3)')
+    parser.add_argument('--remux-speed', type=float, default=DEFAULT_REMUX_SPEED)
+    parser.add_argument('--accel-speedup', type=float, default=4.0, help='가속 변환 속도 배수')
+    parser.add_argument('--job-overhead', type=float, default=15, help='작업당 시작/종료 고정 시간 (초)')
+
+    parser.add_argument('--price', default='', help='출력 1분당 요금 덮어쓰기 (예: 480p=0.0075,passthrough=0.0)')
+    parser.add_argument('--accel-price-multiplier', type=float, default=budget.ACCELERATED_PRICE_MULTIPLIER,
+                        help='가속 변환 요금 배수')
+    parser.add_argument('--reserved-slot-monthly', type=float, default=DEFAULT_RESERVED_SLOT_MONTHLY)
+    parser.add_argument('--json', action='store_true', help='보고서를 JSON으로 출력')
+    args = parser.parse_args(argv)
+    args.encode_speed = _key_values(args.encode_speed, DEFAULT_ENCODE_SPEED)
+    args.price = _key_values(args.price, budget.PRICE_PER_MINUTE)
+
+    rng = random.Random(args.seed)
+    if args.trace:
+        arrivals = load_trace(args.trace, rng, args.median_duration, args.bitrate, args.copy_ratio, args.remux_ratio)
+    else:
+        arrivals = synthetic_arrivals(rng, args.rate, args.hours, args.median_duration, args.bitrate,
+                                      args.copy_ratio, args.remux_ratio)
+
+    report = Simulator(args, rng).run(arrivals)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
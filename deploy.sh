@@ -64,9 +64,10 @@ echo "📝 Lambda 함수 코드 준비 중..."
 sed "s/YOUR_ACCOUNT_ID/$ACCOUNT_ID/g; s/your-converted-videos-bucket/$OUTPUT_BUCKET/g" \
   lambda_function.py > /tmp/lambda_function.py
 
-# Lambda 배포 패키지 생성
+# Lambda 배포 패키지 생성 (공유 헬퍼 패키지 포함)
+rm -rf /tmp/video_pipeline && cp -r video_pipeline /tmp/video_pipeline
 cd /tmp
-zip lambda_function.zip lambda_function.py
+zip -r lambda_function.zip lambda_function.py video_pipeline -x '*__pycache__*'
 cd -
 
 # 6. Lambda 함수 생성
@@ -124,3 +125,4 @@ echo "  - MediaConvert 작업: AWS 콘솔에서 확인"
 
 # 임시 파일 정리
 rm -f /tmp/lambda-execution-policy.json /tmp/mediaconvert-service-policy.json /tmp/lambda_function.py /tmp/lambda_function.zip /tmp/eventbridge-rule.json
+rm -rf /tmp/video_pipeline
@@ -1,91 +1,144 @@
 import json
-import boto3
 import uuid
-from datetime import datetime
-import urllib.parse
 import os
 
-# AWS 클라이언트 초기화
-s3_client = boto3.client('s3')
-mediaconvert_client = boto3.client('mediaconvert')
-events_client = boto3.client('events')  # EventBridge 클라이언트 추가
+from video_pipeline import (
+    acceleration, admission, analysis_event, budget, batch, conversion_cache, endpoint, eventbus, idempotency, job_store, log,
+    metrics, output_layout, probe, profiles, progress, queues, rate_limit, renditions, segments
+)
 
 # 설정값
 MEDIACONVERT_ROLE_ARN = os.environ.get('MEDIACONVERT_ROLE_ARN', 'arn:aws:iam::YOUR_ACCOUNT_ID:role/MediaConvertServiceRole')
 OUTPUT_BUCKET = os.environ.get('OUTPUT_BUCKET', 'your-converted-videos-bucket')
 ANALYSIS_BUCKET = os.environ.get('ANALYSIS_BUCKET', 'your-analysis-bucket')
-MEDIACONVERT_ENDPOINT = None  # 런타임에 설정
+
+# 인코딩 프로파일 (초기화 시 한 번 컴파일된 템플릿)
+JOB_PROFILE = profiles.get_profile(os.environ.get('JOB_PROFILE', 'mp4_standard'))
+
+# 분할 변환은 구간/이어 붙이기를 한 번만 제출하도록 공유 멱등성 저장소가 필요 (없으면 초기화 실패)
+segments.require_shared_idempotency()
 
 # 지원하는 입력 동영상 포맷 (모두 MP4로 변환됨)
-SUPPORTED_VIDEO_FORMATS = {
-    '.mp4': 'MP4',
-    '.mov': 'QuickTime',
-    '.avi': 'AVI',
-    '.mkv': 'Matroska',
-    '.wmv': 'Windows Media',
-    '.flv': 'Flash Video',
-    '.webm': 'WebM',
-    '.m4v': 'iTunes Video',
-    '.3gp': '3GPP',
-    '.mts': 'AVCHD',
-    '.m2ts': 'Blu-ray',
-    '.vob': 'DVD Video'
-}
+SUPPORTED_VIDEO_FORMATS = admission.SUPPORTED_VIDEO_FORMATS
 
+@metrics.instrument_handler
 def lambda_handler(event, context):
     """
     S3 업로드 이벤트를 받아서 MediaConvert로 MP4 변환 작업을 시작하는 Lambda 함수
     변환 완료 후 EventBridge를 통해 분석 Lambda들을 트리거합니다.
+    SQS 래핑/다중 레코드 이벤트는 배치 모드로 처리합니다.
     """
     
+    # 호출별 상관관계 ID 설정 및 DEBUG 로그 샘플링 여부 결정
+    log.start_invocation(context)
+    
+    # 처리 대상이 아닌 S3 이벤트는 이벤트 기록/AWS 호출 없이 바로 종료
+    if admission.is_upload_event(event):
+        object_key, _, reason = admission.check(event['detail'])
+        if reason:
+            return admission.skipped_response(object_key, reason)
+    
+    log.debug("📥 받은 이벤트", event=event)
+    
+    # 배치 이벤트는 레코드별 실패를 batchItemFailures로 보고 (예외는 전체 재시도)
+    if batch.is_batch_event(event):
+        return handle_batch(event, context)
+    
     try:
-        # EventBridge에서 온 이벤트 타입 확인
-        if 'source' in event and event['source'] == 'aws.mediaconvert':
-            # MediaConvert 완료 이벤트 처리
-            return handle_mediaconvert_completion(event, context)
+        response = route_event(event, context)
+    
+    except rate_limit.SubmissionDeferred as e:
+        # 스로틀/예산 초과로 제출하지 못한 이벤트는 지연 큐에 다시 넣음 (큐가 없으면 예외로 Lambda 재시도)
+        # 지연 큐 없이 미룬 예산 초과는 재시도가 끝나면 버려지므로 거부로 기록
+        rejected = budget.rejected_instead(e)
+        if rejected:
+            response = budget_rejected_response(event['detail'], rejected)
         else:
-            # S3 업로드 이벤트 처리
-            return handle_s3_upload(event, context)
+            response = rate_limit.defer_event(event, e)
             
     except Exception as e:
-        print(f"❌ 오류 발생: {str(e)}")
-        return {
+        log.error("❌ 오류 발생", error=str(e))
+        response = {
             'statusCode': 500,
             'body': json.dumps({
                 'error': str(e)
             })
         }
+    
+    # 처리 중 쌓인 분석 트리거 이벤트 발송 - 끝내 실패하면 예외로 Lambda 재시도
+    eventbus.publisher.flush_or_raise()
+    return response
+
+def route_event(event, context):
+    """EventBridge 이벤트 타입에 따라 처리 함수 선택"""
+    if 'source' in event and event['source'] == 'aws.mediaconvert':
+        # MediaConvert 완료 이벤트 처리
+        return handle_mediaconvert_completion(event, context)
+    else:
+        # S3 업로드 이벤트 처리
+        return handle_s3_upload(event, context)
+
+def handle_batch(event, context):
+    """SQS/다중 레코드 배치 이벤트 처리 - 실패한 레코드만 재전달되도록 보고"""
+    items = batch.extract_records(event)
+    
+    # 스레드 풀 시작 전에 엔드포인트를 한 번만 설정하여 모든 작업이 같은 클라이언트를 공유
+    # 입장 필터에서 모두 걸러지는 배치는 엔드포인트 설정도 생략
+    has_uploads = any(
+        not isinstance(events, Exception)
+        and any(admission.is_upload_event(e) and not admission.check(e['detail'])[2] for e in events)
+        for _, events in items
+    )
+    if has_uploads:
+        setup_mediaconvert_endpoint()
+    
+    # 분석 트리거 이벤트는 모든 레코드 처리 후 10개씩 묶어 발송하고, 발송 실패한 레코드는 재전달
+    return batch.process_batch(items, lambda e: route_event(e, context), finalize=eventbus.publisher.flush,
+                               sqs=batch.is_sqs_event(event))
 
 def handle_s3_upload(event, context):
     """S3 업로드 이벤트 처리 - 동영상 변환 시작"""
     
     try:
         # EventBridge에서 온 S3 이벤트 파싱
-        detail = event['detail']
-        bucket_name = detail['bucket']['name']
-        object_key = urllib.parse.unquote_plus(detail['object']['key'])
+        with metrics.timer('ParseLatency'):
+            detail = event['detail']
+            bucket_name = detail['bucket']['name']
+            object_key, input_format, reason = admission.check(detail)
         
-        print(f"🎬 처리할 파일: s3://{bucket_name}/{object_key}")
+        log.annotate(bucket=bucket_name, object_key=object_key)
         
-        # 동영상 파일인지 확인
-        input_format = get_video_format(object_key)
-        if not input_format:
-            print(f"❌ 지원하지 않는 파일 형식: {object_key}")
-            return {
-                'statusCode': 200,
-                'body': json.dumps('지원하지 않는 동영상 파일이므로 처리하지 않음')
-            }
+        # 동영상 파일인지/처리 대상 경로와 크기인지 확인 (배치 레코드는 여기서 처음 판정)
+        if reason:
+            return admission.skipped_response(object_key, reason)
         
-        print(f"📹 입력 포맷: {input_format} → 출력 포맷: MP4")
+        log.info("🎬 처리할 파일")
+        log.info("📹 입력 포맷 확인", input_format=input_format, output_format="MP4")
         
-        # MediaConvert 엔드포인트 설정
-        setup_mediaconvert_endpoint()
+        def submit():
+            # MediaConvert 엔드포인트 설정
+            setup_mediaconvert_endpoint()
+            
+            # MediaConvert 작업 생성 (항상 MP4로 변환)
+            return create_mp4_conversion_job(bucket_name, object_key, input_format, detail['object'])
         
-        # MediaConvert 작업 생성 (항상 MP4로 변환)
-        job_id = create_mp4_conversion_job(bucket_name, object_key, input_format)
+        # 같은 객체 버전에 대한 중복 이벤트는 새 작업 없이 기존 작업 ID 반환
+        with metrics.timer('SubmitLatency', InputFormat=input_format):
+            job_id, duplicate = idempotency.submit_once(idempotency.event_key(detail, object_key), submit)
+        if duplicate:
+            metrics.count('DuplicateEvents')
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': '이미 처리된 이벤트이므로 작업을 새로 만들지 않음',
+                    'job_id': job_id,
+                    'input_file': f"s3://{bucket_name}/{object_key}",
+                    'duplicate': True
+                })
+            }
         
         if job_id:
-            print(f"✅ MediaConvert 작업 생성 성공: {job_id}")
+            log.info("✅ MediaConvert 작업 생성 성공", job_id=job_id)
             return {
                 'statusCode': 200,
                 'body': json.dumps({
@@ -99,10 +152,24 @@ def handle_s3_upload(event, context):
         else:
             raise Exception("MediaConvert 작업 생성 실패")
             
+    except budget.BudgetRejected as e:
+        # 재시도해도 결과가 같으므로 실패로 보고하지 않고 거부 기록만 남김
+        return budget_rejected_response(detail, e)
+            
     except Exception as e:
-        print(f"❌ S3 업로드 처리 오류: {str(e)}")
+        log.error("❌ S3 업로드 처리 오류", error=str(e))
         raise
 
+def budget_rejected_response(detail, error):
+    """예산 초과로 제출하지 않은 업로드 기록 (작업 상태 조회에서 거부 사유 확인) 및 응답"""
+    object_key, input_format, _ = admission.check(detail)
+    job_store.record_submission(f"rejected-{uuid.uuid4()}", f"s3://{detail['bucket']['name']}/{object_key}",
+                                status='REJECTED', input_format=input_format, error=str(error))
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'message': '예산 한도를 넘어 변환하지 않음', 'reason': 'budget', 'error': str(error)})
+    }
+
 def handle_mediaconvert_completion(event, context):
     """MediaConvert 완료 이벤트 처리 - 분석 Lambda들 트리거"""
     
@@ -111,7 +178,24 @@ def handle_mediaconvert_completion(event, context):
         job_status = detail['status']
         job_id = detail['jobId']
         
-        print(f"🎬 MediaConvert 작업 상태: {job_status} (Job ID: {job_id})")
+        log.annotate(job_id=job_id)
+        log.info("🎬 MediaConvert 작업 상태", status=job_status)
+        metrics.count('JobStateChanges', Status=job_status)
+        job_record = job_store.record_state_change(detail) or {}
+        
+        if job_status == 'COMPLETE' and segments.is_segment(detail):
+            # 구간 작업은 중간 결과이므로 분석하지 않고, 마지막 구간이면 이어 붙이기 작업 제출
+            result = segments.on_segment_complete(detail, JOB_PROFILE, MEDIACONVERT_ROLE_ARN)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': '구간 변환 완료' if result['remaining'] else '모든 구간 변환 완료, 이어 붙이기 시작',
+                    'job_id': job_id,
+                    'segment_group': result['group'],
+                    'remaining_segments': result['remaining'],
+                    'stitch_jobs': result['stitch_jobs']
+                })
+            }
         
         if job_status == 'COMPLETE':
             # 변환 완료된 파일 정보 추출
@@ -123,13 +207,16 @@ def handle_mediaconvert_completion(event, context):
                             if 'outputFilePaths' in output:
                                 output_files.extend(output['outputFilePaths'])
             
-            print(f"📁 변환 완료된 파일들: {output_files}")
+            log.info("📁 변환 완료된 파일들", output_files=output_files)
+            
+            # 같은 내용이 다시 업로드되면 재사용하도록 변환 캐시에 기록
+            conversion_cache.record_job(detail, output_files)
             
             # 분석 Lambda들을 위한 EventBridge 이벤트 발송
             analysis_event_sent = send_analysis_trigger_event(job_id, output_files, detail)
             
             if analysis_event_sent:
-                print(f"✅ 분석 트리거 이벤트 발송 완료")
+                log.info("✅ 분석 트리거 이벤트 발송 예약 완료")
                 return {
                     'statusCode': 200,
                     'body': json.dumps({
@@ -140,7 +227,7 @@ def handle_mediaconvert_completion(event, context):
                     })
                 }
             else:
-                print(f"⚠️ 분석 트리거 이벤트 발송 실패")
+                log.warning("⚠️ 분석 트리거 이벤트 발송 실패")
                 return {
                     'statusCode': 200,
                     'body': json.dumps({
@@ -152,7 +239,10 @@ def handle_mediaconvert_completion(event, context):
                 }
         
         elif job_status == 'ERROR':
-            print(f"❌ MediaConvert 작업 실패: {job_id}")
+            log.error("❌ MediaConvert 작업 실패")
+            if segments.is_segment(detail):
+                # 구간 하나라도 실패하면 이어 붙일 수 없으므로 분할 변환 전체를 실패로 기록
+                segments.on_segment_failed(detail)
             return {
                 'statusCode': 500,
                 'body': json.dumps({
@@ -161,228 +251,237 @@ def handle_mediaconvert_completion(event, context):
                 })
             }
         
+        elif job_status == 'CANCELED':
+            log.warning("🛑 MediaConvert 작업 취소됨")
+            if segments.is_segment(detail):
+                # 취소된 구간도 출력이 없어 이어 붙일 수 없으므로 분할 변환 전체를 취소로 기록
+                segments.on_segment_failed(detail)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': f'MediaConvert 작업 취소됨: {job_id}',
+                    'job_id': job_id
+                })
+            }
+        
         else:
-            print(f"ℹ️ MediaConvert 작업 진행 중: {job_status}")
+            # 진행률 이벤트(STATUS_UPDATE)면 진행률/속도/남은 시간 포함
+            log.info("ℹ️ MediaConvert 작업 진행 중", status=job_status, progress=job_record.get('progress'),
+                     encode_speed=job_record.get('encode_speed'), eta_seconds=progress.remaining_seconds(job_record))
             return {
                 'statusCode': 200,
                 'body': json.dumps({
                     'message': f'MediaConvert 작업 진행 중: {job_status}',
-                    'job_id': job_id
+                    'job_id': job_id,
+                    'progress': job_record.get('progress'),
+                    'encode_speed': job_record.get('encode_speed'),
+                    'eta_seconds': progress.remaining_seconds(job_record)
                 })
             }
             
     except Exception as e:
-        print(f"❌ MediaConvert 완료 처리 오류: {str(e)}")
+        log.error("❌ MediaConvert 완료 처리 오류", error=str(e))
         raise
 
 def send_analysis_trigger_event(job_id, output_files, mediaconvert_detail):
-    """분석 Lambda들을 트리거하기 위한 EventBridge 이벤트 발송"""
+    """분석 Lambda들을 트리거하기 위한 EventBridge 이벤트를 발송 버퍼에 추가 (핸들러 종료 시 일괄 발송)"""
     
     try:
         # 분석용 커스텀 이벤트 생성
-        analysis_event = {
+        # 작업 detail 전체 대신 요약 정보만 담고, 필요하면 전체 detail은 분석 버킷에 저장 (ANALYSIS_EVENT_MODE)
+        trigger_event = {
             'Source': 'custom.video-pipeline',
             'DetailType': 'Video Analysis Required',
-            'Detail': json.dumps({
-                'mediaconvert_job_id': job_id,
-                'converted_files': output_files,
-                'analysis_bucket': ANALYSIS_BUCKET,
-                'timestamp': datetime.utcnow().isoformat(),
-                'original_mediaconvert_detail': mediaconvert_detail,
-                'analysis_types': ['rekognition', 'twelvelabs', 'transcribe']
-            })
+            'Detail': json.dumps(analysis_event.build_detail(
+                job_id,
+                output_files,
+                mediaconvert_detail,
+                ANALYSIS_BUCKET,
+                ['rekognition', 'twelvelabs', 'transcribe']
+            ))
         }
         
-        # EventBridge로 이벤트 발송
-        response = events_client.put_events(
-            Entries=[analysis_event]
-        )
-        
-        print(f"📡 분석 트리거 이벤트 발송: {response}")
+        # 핸들러 종료 시 다른 이벤트들과 묶어서 발송 (실패한 항목만 재시도)
+        eventbus.publisher.add(trigger_event, tag=batch.current_item())
         
-        # 발송 성공 여부 확인
-        if response['FailedEntryCount'] == 0:
-            print(f"✅ 분석 트리거 이벤트 발송 성공")
-            return True
-        else:
-            print(f"❌ 분석 트리거 이벤트 발송 실패: {response['Entries']}")
-            return False
+        log.info("📡 분석 트리거 이벤트 발송 대기", job_id=job_id)
+        return True
             
     except Exception as e:
-        print(f"❌ 분석 트리거 이벤트 발송 오류: {str(e)}")
+        log.error("❌ 분석 트리거 이벤트 생성 오류", job_id=job_id, error=str(e))
         return False
 
-def get_video_format(file_key):
-    """동영상 파일 포맷 확인 및 반환"""
-    file_extension = os.path.splitext(file_key.lower())[1]
-    return SUPPORTED_VIDEO_FORMATS.get(file_extension)
-
 def setup_mediaconvert_endpoint():
-    """MediaConvert 엔드포인트 설정"""
-    global mediaconvert_client, MEDIACONVERT_ENDPOINT
-    
-    if not MEDIACONVERT_ENDPOINT:
-        try:
-            response = mediaconvert_client.describe_endpoints()
-            MEDIACONVERT_ENDPOINT = response['Endpoints'][0]['Url']
-            mediaconvert_client = boto3.client('mediaconvert', endpoint_url=MEDIACONVERT_ENDPOINT)
-            print(f"🔗 MediaConvert 엔드포인트 설정: {MEDIACONVERT_ENDPOINT}")
-        except Exception as e:
-            print(f"❌ MediaConvert 엔드포인트 설정 실패: {e}")
-            raise
+    """MediaConvert 엔드포인트 설정 (환경 변수/캐시 우선, 필요할 때만 조회)"""
+    try:
+        with metrics.timer('EndpointSetupLatency'):
+            endpoint.get_mediaconvert_client()
+    except Exception as e:
+        log.error("❌ MediaConvert 엔드포인트 설정 실패", error=str(e))
+        raise
 
-def create_mp4_conversion_job(input_bucket, input_key, input_format):
-    """MediaConvert 작업 생성 - 모든 입력 포맷을 MP4로 변환"""
+def create_mp4_conversion_job(input_bucket, input_key, input_format, object_info=None):
+    """
+    MediaConvert 작업 생성 - 모든 입력 포맷을 MP4로 변환
+    같은 내용이 이미 변환되어 있으면 기존 출력을 복사하고,
+    입력 분석 결과 이미 규격에 맞으면 작업 없이 복사하고, 코덱만 맞으면 재인코딩 없이 리먹싱합니다.
+    """
     
     # 파일명에서 확장자 분리
     file_name = input_key.split('/')[-1]
     name_without_ext = os.path.splitext(file_name)[0]
     
-    # 입력 및 출력 경로 설정
+    # 입력 및 출력 경로 설정 (출력 접두사는 OUTPUT_KEY_LAYOUT에 따라 샤딩/날짜/입력 구조로 나뉨)
     input_path = f"s3://{input_bucket}/{input_key}"
-    output_path = f"s3://{OUTPUT_BUCKET}/converted/"
+    output_prefix = output_layout.output_prefix(input_bucket, input_key)
+    output_path = output_layout.destination(OUTPUT_BUCKET, output_prefix)
     
-    print(f"📁 입력: {input_path}")
-    print(f"📁 출력: {output_path}{name_without_ext}_converted.mp4")
+    # 렌디션 사다리 선택 (키 접두사/객체 메타데이터 기준) 후 헤더 분석으로 변환 방식 결정
+    ladder = renditions.resolve_ladder(input_bucket, input_key)
     
-    # 작업 설정 - 항상 MP4로 출력
-    job_settings = {
-        "Role": MEDIACONVERT_ROLE_ARN,
-        "Settings": {
-            "Inputs": [
-                {
-                    "FileInput": input_path,
-                    "AudioSelectors": {
-                        "Audio Selector 1": {
-                            "DefaultSelection": "DEFAULT"
-                        }
-                    },
-                    "VideoSelector": {},
-                    "TimecodeSource": "ZEROBASED"
-                }
-            ],
-            "OutputGroups": [
-                {
-                    "Name": f"{input_format}_to_MP4_Conversion",
-                    "OutputGroupSettings": {
-                        "Type": "FILE_GROUP_SETTINGS",
-                        "FileGroupSettings": {
-                            "Destination": output_path,
-                            "DestinationSettings": {
-                                "S3Settings": {
-                                    "StorageClass": "STANDARD"
-                                }
-                            }
-                        }
-                    },
-                    "Outputs": [
-                        {
-                            "NameModifier": "_converted",
-                            "VideoDescription": {
-                                "Width": 720,
-                                "Height": 480,
-                                "ScalingBehavior": "DEFAULT",
-                                "TimecodeInsertion": "DISABLED",
-                                "AntiAlias": "ENABLED",
-                                "Sharpness": 50,
-                                "CodecSettings": {
-                                    "Codec": "H_264",
-                                    "H264Settings": {
-                                        "InterlaceMode": "PROGRESSIVE",
-                                        "NumberReferenceFrames": 3,
-                                        "Syntax": "DEFAULT",
-                                        "Softness": 0,
-                                        "GopClosedCadence": 1,
-                                        "GopSize": 90,
-                                        "Slices": 1,
-                                        "GopBReference": "DISABLED",
-                                        "SlowPal": "DISABLED",
-                                        "SpatialAdaptiveQuantization": "ENABLED",
-                                        "TemporalAdaptiveQuantization": "ENABLED",
-                                        "FlickerAdaptiveQuantization": "DISABLED",
-                                        "EntropyEncoding": "CABAC",
-                                        "Bitrate": 2000000,
-                                        "FramerateControl": "INITIALIZE_FROM_SOURCE",
-                                        "RateControlMode": "CBR",
-                                        "CodecProfile": "MAIN",
-                                        "Telecine": "NONE",
-                                        "MinIInterval": 0,
-                                        "AdaptiveQuantization": "HIGH",
-                                        "CodecLevel": "AUTO",
-                                        "FieldEncoding": "PAFF",
-                                        "SceneChangeDetect": "ENABLED",
-                                        "QualityTuningLevel": "SINGLE_PASS",
-                                        "FramerateConversionAlgorithm": "DUPLICATE_DROP",
-                                        "UnregisteredSeiTimecode": "DISABLED",
-                                        "GopSizeUnits": "FRAMES",
-                                        "ParControl": "INITIALIZE_FROM_SOURCE",
-                                        "NumberBFramesBetweenReferenceFrames": 2,
-                                        "RepeatPps": "DISABLED"
-                                    }
-                                }
-                            },
-                            "AudioDescriptions": [
-                                {
-                                    "AudioTypeControl": "FOLLOW_INPUT",
-                                    "AudioSourceName": "Audio Selector 1",
-                                    "CodecSettings": {
-                                        "Codec": "AAC",
-                                        "AacSettings": {
-                                            "AudioDescriptionBroadcasterMix": "NORMAL",
-                                            "Bitrate": 128000,
-                                            "RateControlMode": "CBR",
-                                            "CodecProfile": "LC",
-                                            "CodingMode": "CODING_MODE_2_0",
-                                            "RawFormat": "NONE",
-                                            "SampleRate": 48000,
-                                            "Specification": "MPEG4"
-                                        }
-                                    },
-                                    "LanguageCodeControl": "FOLLOW_INPUT"
-                                }
-                            ],
-                            "ContainerSettings": {
-                                "Container": "MP4",
-                                "Mp4Settings": {
-                                    "CslgAtom": "INCLUDE",
-                                    "FreeSpaceBox": "EXCLUDE",
-                                    "MoovPlacement": "PROGRESSIVE_DOWNLOAD",
-                                    "Mp4MajorBrand": "isom"
-                                }
-                            }
-                        }
-                    ]
-                }
-            ],
-            "AdAvailOffset": 0,
-            "TimecodeConfig": {
-                "Source": "ZEROBASED"
-            }
-        },
-        "AccelerationSettings": {
-            "Mode": "DISABLED"
-        },
-        "StatusUpdateInterval": "SECONDS_60",
-        "Priority": 0,
-        "UserMetadata": {
-            "InputFormat": input_format,
-            "OutputFormat": "MP4",
-            "ConversionType": "Format_Standardization",
-            "AnalysisRequired": "true"
-        }
-    }
+    # 같은 내용(ETag)이 같은 설정으로 이미 변환되었으면 기존 출력 복사
+    fingerprint = conversion_cache.fingerprint(object_info, JOB_PROFILE, ladder)
+    cached_outputs = conversion_cache.reuse(fingerprint, OUTPUT_BUCKET, output_prefix, name_without_ext)
+    if cached_outputs:
+        metrics.count('Conversions', InputFormat=input_format, Action='cache_hit')
+        return complete_without_job(input_bucket, input_key, cached_outputs, 'CACHE_HIT')
+    
+    with metrics.timer('PlanLatency'):
+        plan = probe.plan_conversion(input_bucket, input_key, JOB_PROFILE, ladder)
+    rungs = plan['rungs']
+    metrics.count('Conversions', InputFormat=input_format, Action=plan['action'])
+    
+    if plan['action'] == 'copy':
+        return copy_compliant_video(input_bucket, input_key, output_prefix, plan['info'])
+    
+    log.info("📁 변환 입출력", input=input_path, output=output_path, renditions=rungs)
+    
+    # 입력 크기/길이/해상도로 가속 모드와 화질 튜닝을 정하고, 예상 비용이 예산 안인지 확인 (초과 시 지연/하향/거부)
+    size = input_size(object_info, plan['info'])
+    tuning = acceleration.select(size, plan['info'])
+    rungs, tuning, estimate = budget.admit(JOB_PROFILE, size, plan['info'], rungs, plan['action'], tuning)
+    if estimate['decision'] == 'downgrade':
+        # 낮춘 출력은 사다리 전체 결과가 아니므로 같은 내용의 캐시 키로 기록하지 않음
+        fingerprint = None
+    
+    # 긴 영상은 시간 구간으로 나눠 병렬 변환 (모든 구간이 끝나면 완료 이벤트에서 렌디션별로 이어 붙임)
+    # 화질을 낮춘 작업은 구간마다 가속 정책이 다시 적용되지 않도록 분할하지 않음
+    ranges = None
+    if plan['action'] == 'transcode' and estimate['decision'] != 'downgrade':
+        ranges = segments.plan((plan['info'] or {}).get('duration'), (plan['info'] or {}).get('frame_rate'))
+    if ranges:
+        return submit_segmented_job(input_bucket, input_key, input_format, object_info, ladder, plan, rungs, size,
+                                    ranges, output_prefix, estimate)
     
     try:
-        # 작업 생성
-        response = mediaconvert_client.create_job(**job_settings)
+        # 큐 적체로 제출할 큐/우선순위 결정
+        route = queues.route_job(size, tuning['mode'] in ('PREFERRED', 'ENABLED'), tuning['queue'])
+        
+        # 작업 설정 - 컴파일된 프로파일에 작업별 값만 채움 (항상 MP4로 출력)
+        with metrics.timer('BuildLatency'):
+            job_settings = JOB_PROFILE.build(
+                MEDIACONVERT_ROLE_ARN,
+                input_path,
+                output_path,
+                metadata=dict(
+                    conversion_cache.job_metadata(fingerprint, name_without_ext),
+                    InputFile=input_path,
+                    InputFormat=input_format,
+                    RenditionLadder=ladder,
+                    ConversionAction=plan['action'],
+                    **acceleration.job_metadata(tuning),
+                    **route['metadata']
+                ),
+                rungs=rungs,
+                remux=plan['action'] == 'remux',
+                priority=route['priority'],
+                queue=route['queue'],
+                acceleration=tuning['mode'],
+                quality=tuning['quality']
+            )
+        
+        # 작업 생성 (속도 제한 + 스로틀 시 지터 백오프)
+        response = rate_limit.create_job(**job_settings)
         job_id = response['Job']['Id']
         
-        print(f"🎬 MediaConvert 작업 생성됨: {job_id}")
-        print(f"📹 변환: {input_format} → MP4")
-        print(f"📊 설정: 720x480, H.264, AAC, 2Mbps")
+        log.annotate(job_id=job_id)
+        log.info("🎬 MediaConvert 작업 생성됨", input_format=input_format, profile=JOB_PROFILE.description)
+        
+        # 업로드 ↔ 작업 연결 기록 (상태 조회 시 MediaConvert 폴링 불필요)
+        job_store.record_submission(job_id, input_path, input_format=input_format,
+                                    queue=job_settings.get('Queue'), action=plan['action'],
+                                    duration=(plan['info'] or {}).get('duration'), estimated_cost=estimate['cost'])
         
         return job_id
         
+    except rate_limit.SubmissionDeferred:
+        # 제출하지 못한 작업의 예상 비용은 예산에서 돌려줌
+        budget.release(estimate)
+        raise
     except Exception as e:
-        print(f"❌ MediaConvert 작업 생성 실패: {e}")
+        budget.release(estimate)
+        log.error("❌ MediaConvert 작업 생성 실패", error=str(e))
         return None
+
+def submit_segmented_job(input_bucket, input_key, input_format, object_info, ladder, plan, rungs, size, ranges,
+                         output_prefix, estimate=None):
+    """긴 영상을 구간별 작업으로 제출 - 구간 그룹 ID 반환 (구간 작업 ID는 로그와 완료 이벤트로 추적)"""
+    input_path = f"s3://{input_bucket}/{input_key}"
+    group = segments.group_id(input_bucket, input_key, object_info)
+    
+    try:
+        segments.submit(
+            JOB_PROFILE,
+            MEDIACONVERT_ROLE_ARN,
+            input_path,
+            OUTPUT_BUCKET,
+            f"{output_prefix}{output_layout.input_name(input_key)}",
+            group,
+            ranges,
+            size=size,
+            probe_info=plan['info'],
+            metadata=dict(
+                InputFile=input_path,
+                InputFormat=input_format,
+                RenditionLadder=ladder,
+                ConversionAction='segment'
+            ),
+            rungs=rungs
+        )
+        log.info("🎬 MediaConvert 분할 작업 생성됨", input_format=input_format, segment_group=group)
+        return segments.group_job_id(group)
+        
+    except rate_limit.SubmissionDeferred:
+        budget.release(estimate)
+        raise
+    except Exception as e:
+        budget.release(estimate)
+        log.error("❌ MediaConvert 분할 작업 생성 실패", segment_group=group, error=str(e))
+        return None
+
+def input_size(object_info, probe_info):
+    """이벤트의 객체 크기 (없으면 입력 분석 결과의 크기)"""
+    return (object_info or {}).get('size') or (probe_info or {}).get('size')
+
+def copy_compliant_video(input_bucket, input_key, output_prefix, probe_info):
+    """이미 규격에 맞는 MP4를 변환 없이 출력 위치로 복사하고 분석 트리거"""
+    try:
+        output_key = output_layout.output_key(output_prefix, input_key, JOB_PROFILE.name_modifier)
+        output_uri = probe.copy_to_output(input_bucket, input_key, OUTPUT_BUCKET, output_key)
+        return complete_without_job(input_bucket, input_key, [output_uri], 'COPIED', probe=probe_info)
+        
+    except Exception as e:
+        log.error("❌ 복사 실패", error=str(e))
+        return None
+
+def complete_without_job(input_bucket, input_key, output_files, status, **extra):
+    """MediaConvert 작업 없이 출력이 준비된 경우 - 완료 이벤트가 없으므로 분석 트리거를 바로 발송"""
+    copy_id = f"copy-{uuid.uuid4()}"
+    job_store.record_submission(copy_id, f"s3://{input_bucket}/{input_key}", status=status, outputs=output_files,
+                                action=status.lower())
+    send_analysis_trigger_event(copy_id, output_files, dict(
+        extra,
+        status=status,
+        input=f"s3://{input_bucket}/{input_key}"
+    ))
+    return copy_id
@@ -1,76 +1,89 @@
 import json
-import boto3
 import uuid
 from datetime import datetime
-import urllib.parse
 import os
 
-# AWS 클라이언트 초기화
-s3_client = boto3.client('s3')
-mediaconvert_client = boto3.client('mediaconvert')
+from video_pipeline import (
+    acceleration, admission, batch, budget, conversion_cache, endpoint, idempotency, job_store, log, metrics, output_layout,
+    probe, profiles, progress, queues, rate_limit, renditions, segments
+)
 
 # 설정값
 MEDIACONVERT_ROLE_ARN = os.environ.get('MEDIACONVERT_ROLE_ARN')
 OUTPUT_BUCKET = os.environ.get('OUTPUT_BUCKET')
-MEDIACONVERT_ENDPOINT = None  # 런타임에 설정
 
-# 지원하는 입력 동영상 포맷
-SUPPORTED_VIDEO_FORMATS = {
-    '.mp4': 'MP4',
-    '.mov': 'QuickTime',
-    '.avi': 'AVI',
-    '.mkv': 'Matroska',
-    '.wmv': 'Windows Media',
-    '.flv': 'Flash Video',
-    '.webm': 'WebM',
-    '.m4v': 'iTunes Video'
-}
+# 인코딩 프로파일 (초기화 시 한 번 컴파일된 템플릿)
+JOB_PROFILE = profiles.get_profile(os.environ.get('JOB_PROFILE', 'mp4_sd'))
 
+# 분할 변환은 구간/이어 붙이기를 한 번만 제출하도록 공유 멱등성 저장소가 필요 (없으면 초기화 실패)
+segments.require_shared_idempotency()
+
+# 지원하는 입력 동영상 포맷 (다른 핸들러와 같은 목록)
+SUPPORTED_VIDEO_FORMATS = admission.SUPPORTED_VIDEO_FORMATS
+
+@metrics.instrument_handler
 def lambda_handler(event, context):
     """
     S3 업로드 이벤트를 받아서 MediaConvert로 SD 변환 작업을 시작하는 Lambda 함수
     비용 최적화를 위해 분석 기능은 제거됨
+    SQS 래핑/다중 레코드 이벤트는 배치 모드로 처리합니다.
     """
     
+    # 호출별 상관관계 ID 설정 및 DEBUG 로그 샘플링 여부 결정
+    log.start_invocation(context)
+    
+    # 배치 이벤트는 레코드별 실패를 batchItemFailures로 보고 (예외는 전체 재시도)
+    if batch.is_batch_event(event):
+        return handle_batch(event, context)
+    
+    # MediaConvert 작업 상태 이벤트 (변환 캐시 기록용)
+    if event.get('source') == 'aws.mediaconvert':
+        return handle_job_completion(event)
+    
     try:
-        print(f"🎬 동영상 변환 Lambda 시작")
-        print(f"📥 받은 이벤트: {json.dumps(event, indent=2)}")
-        
         # EventBridge에서 온 S3 이벤트 파싱
-        if 'detail' in event and 'bucket' in event['detail']:
-            # EventBridge S3 이벤트
-            bucket_name = event['detail']['bucket']['name']
-            object_key = urllib.parse.unquote_plus(event['detail']['object']['key'])
-        else:
-            print("❌ 지원하지 않는 이벤트 형식")
+        if not admission.is_upload_event(event):
+            log.warning("❌ 지원하지 않는 이벤트 형식")
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': '지원하지 않는 이벤트 형식'})
             }
         
-        print(f"📁 버킷: {bucket_name}")
-        print(f"📄 파일: {object_key}")
+        # 처리 대상이 아닌 객체는 이벤트 기록/AWS 호출 없이 바로 종료 (확장자/크기/경로 규칙)
+        bucket_name = event['detail']['bucket']['name']
+        object_key, input_format, reason = admission.check(event['detail'])
+        if reason:
+            return admission.skipped_response(object_key, reason)
         
-        # 파일 확장자 확인
-        file_extension = os.path.splitext(object_key)[1].lower()
-        if file_extension not in SUPPORTED_VIDEO_FORMATS:
-            print(f"⚠️ 지원하지 않는 파일 형식: {file_extension}")
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': f'지원하지 않는 파일 형식: {file_extension}'})
-            }
+        # 이벤트 전체는 샘플링된 호출에서만 기록 (비활성 시 직렬화하지 않음)
+        log.debug("📥 받은 이벤트", event=event)
+        log.annotate(bucket=bucket_name, object_key=object_key)
+        log.info("🎬 동영상 변환 시작")
         
         # MediaConvert 엔드포인트 가져오기
-        global MEDIACONVERT_ENDPOINT
-        if not MEDIACONVERT_ENDPOINT:
-            MEDIACONVERT_ENDPOINT = get_mediaconvert_endpoint()
-            mediaconvert_client = boto3.client('mediaconvert', endpoint_url=MEDIACONVERT_ENDPOINT)
+        prepare_mediaconvert_client()
         
-        # MediaConvert 작업 생성
-        job_id = create_mediaconvert_job(bucket_name, object_key)
+        # MediaConvert 작업 생성 (같은 객체 버전에 대한 중복 이벤트는 기존 작업 ID 반환)
+        with metrics.timer('SubmitLatency', InputFormat=input_format):
+            job_id, duplicate = idempotency.submit_once(
+                idempotency.event_key(event['detail'], object_key),
+                lambda: create_mediaconvert_job(bucket_name, object_key, event['detail']['object'])
+            )
+        
+        if duplicate:
+            log.info("♻️ 이미 처리된 이벤트", job_id=job_id)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': '이미 처리된 이벤트이므로 작업을 새로 만들지 않음',
+                    'job_id': job_id,
+                    'input_file': f"s3://{bucket_name}/{object_key}",
+                    'duplicate': True
+                })
+            }
         
         if job_id:
-            print(f"✅ MediaConvert 작업 시작됨: {job_id}")
+            log.info("✅ MediaConvert 작업 시작됨", job_id=job_id)
             return {
                 'statusCode': 200,
                 'body': json.dumps({
@@ -81,177 +94,259 @@ def lambda_handler(event, context):
                 })
             }
         else:
-            print(f"❌ MediaConvert 작업 생성 실패")
+            log.error("❌ MediaConvert 작업 생성 실패")
             return {
                 'statusCode': 500,
                 'body': json.dumps({'error': 'MediaConvert 작업 생성 실패'})
             }
+    
+    except rate_limit.SubmissionDeferred as e:
+        # 스로틀/예산 초과로 제출하지 못한 이벤트는 지연 큐에 다시 넣음 (큐가 없으면 예외로 Lambda 재시도)
+        # 지연 큐 없이 미룬 예산 초과는 재시도가 끝나면 버려지므로 거부로 기록
+        rejected = budget.rejected_instead(e)
+        if rejected:
+            return budget_rejected_response(bucket_name, object_key, input_format, rejected)
+        return rate_limit.defer_event(event, e)
+    
+    except budget.BudgetRejected as e:
+        return budget_rejected_response(bucket_name, object_key, input_format, e)
             
     except Exception as e:
-        print(f"❌ Lambda 실행 오류: {str(e)}")
+        log.error("❌ Lambda 실행 오류", error=str(e))
         return {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
         }
 
-def get_mediaconvert_endpoint():
-    """MediaConvert 엔드포인트 URL 가져오기"""
+def handle_batch(event, context):
+    """SQS/다중 레코드 배치 이벤트 처리 - 실패한 레코드만 재전달되도록 보고"""
+    items = batch.extract_records(event)
+    
+    # 스레드 풀 시작 전에 엔드포인트를 한 번만 설정하여 모든 작업이 같은 클라이언트를 공유
+    # (입장 필터에서 모두 걸러지는 배치는 엔드포인트 설정도 생략)
+    if any(
+        not isinstance(events, Exception)
+        and any(admission.is_upload_event(e) and not admission.check(e['detail'])[2] for e in events)
+        for _, events in items
+    ):
+        prepare_mediaconvert_client()
+    
+    return batch.process_batch(items, convert_s3_event, sqs=batch.is_sqs_event(event))
+
+def handle_job_completion(event):
+    """MediaConvert 작업 상태 이벤트 처리 - 완료된 출력을 변환 캐시에 기록"""
+    detail = event['detail']
+    job_id = detail.get('jobId')
+    output_files = [
+        path
+        for group in detail.get('outputGroupDetails', [])
+        for output in group.get('outputDetails', [])
+        for path in output.get('outputFilePaths', [])
+    ]
+    
+    if detail.get('status') == 'COMPLETE':
+        conversion_cache.record_job(detail, output_files)
+    
+    log.info("🎬 MediaConvert 작업 상태", job_id=job_id, status=detail.get('status'))
+    metrics.count('JobStateChanges', Status=detail.get('status'))
+    job_record = job_store.record_state_change(detail) or {}
+    
+    if detail.get('status') in segments.FAILED_STATUSES and segments.is_segment(detail):
+        # 구간 하나라도 실패/취소되면 이어 붙일 수 없으므로 분할 변환 전체를 실패/취소로 기록
+        result = segments.on_segment_failed(detail)
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'job_id': job_id, 'status': detail.get('status'), **result})
+        }
+    
+    if detail.get('status') == 'COMPLETE' and segments.is_segment(detail):
+        # 구간 작업 - 모든 구간이 끝났으면 렌디션별 이어 붙이기 작업 제출
+        result = segments.on_segment_complete(detail, JOB_PROFILE, MEDIACONVERT_ROLE_ARN)
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'job_id': job_id, 'status': detail.get('status'), **result})
+        }
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'job_id': job_id,
+            'status': detail.get('status'),
+            'output_files': output_files,
+            'progress': job_record.get('progress'),
+            'eta_seconds': progress.remaining_seconds(job_record)
+        })
+    }
+
+def convert_s3_event(event):
+    """배치 레코드 하나를 변환 작업으로 제출 - 실패 시 예외 발생"""
+    if event.get('source') == 'aws.mediaconvert':
+        return handle_job_completion(event)
+    
+    bucket_name = event['detail']['bucket']['name']
+    object_key, input_format, reason = admission.check(event['detail'])
+    
+    log.annotate(bucket=bucket_name, object_key=object_key)
+    if reason:
+        # 재시도해도 결과가 같으므로 실패로 보고하지 않음
+        admission.record_rejection(object_key, reason)
+        return None
+    
+    try:
+        job_id, duplicate = idempotency.submit_once(
+            idempotency.event_key(event['detail'], object_key),
+            lambda: create_mediaconvert_job(bucket_name, object_key, event['detail']['object'])
+        )
+    except budget.BudgetRejected as e:
+        # 재시도해도 결과가 같으므로 실패로 보고하지 않음
+        record_rejection(bucket_name, object_key, input_format, e)
+        return None
+    if duplicate:
+        return job_id
+    if not job_id:
+        raise Exception(f"MediaConvert 작업 생성 실패: s3://{bucket_name}/{object_key}")
+    
+    log.info("✅ MediaConvert 작업 시작됨", job_id=job_id)
+    return job_id
+
+def record_rejection(bucket_name, object_key, input_format, error):
+    """예산 초과로 제출하지 않은 업로드 기록 (작업 상태 조회에서 거부 사유 확인)"""
+    job_store.record_submission(f"rejected-{uuid.uuid4()}", f"s3://{bucket_name}/{object_key}",
+                                status='REJECTED', input_format=input_format, error=str(error))
+
+def budget_rejected_response(bucket_name, object_key, input_format, error):
+    """예산 초과 거부를 기록하고 성공으로 응답 (재시도해도 결과가 같음)"""
+    record_rejection(bucket_name, object_key, input_format, error)
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'message': '예산 한도를 넘어 변환하지 않음', 'reason': 'budget', 'error': str(error)})
+    }
+
+def prepare_mediaconvert_client():
+    """엔드포인트가 지정된 MediaConvert 클라이언트 준비 (환경 변수/캐시 우선, 필요할 때만 조회)"""
     try:
-        response = mediaconvert_client.describe_endpoints()
-        return response['Endpoints'][0]['Url']
+        with metrics.timer('EndpointSetupLatency'):
+            return endpoint.get_mediaconvert_client()
     except Exception as e:
-        print(f"❌ MediaConvert 엔드포인트 가져오기 실패: {str(e)}")
+        log.error("❌ MediaConvert 엔드포인트 가져오기 실패", error=str(e))
         raise e
 
-def create_mediaconvert_job(bucket_name, object_key):
-    """MediaConvert 작업 생성"""
+def create_mediaconvert_job(bucket_name, object_key, object_info=None):
+    """
+    MediaConvert 작업 생성
+    같은 내용이 이미 변환되어 있으면 기존 출력을 복사하고,
+    입력 분석 결과 이미 규격에 맞으면 작업 없이 복사하고, 코덱만 맞으면 재인코딩 없이 리먹싱합니다.
+    """
     
+    estimate = None
     try:
-        # 작업 ID 생성
-        job_id = str(uuid.uuid4())
-        
         # 입력 파일 경로
         input_uri = f"s3://{bucket_name}/{object_key}"
         
-        # 출력 파일 경로 (확장자를 .mp4로 변경)
-        base_name = os.path.splitext(object_key)[0]
-        output_key = f"converted/{base_name}_sd.mp4"
+        # 출력 파일 경로 (MediaConvert는 출력 접두사 + 입력 파일명 + NameModifier로 저장)
+        base_name = output_layout.input_name(object_key)
+        input_format = SUPPORTED_VIDEO_FORMATS.get(os.path.splitext(object_key)[1].lower())
+        output_prefix = output_layout.output_prefix(bucket_name, object_key)
+        output_key = output_layout.output_key(output_prefix, object_key, JOB_PROFILE.name_modifier)
         output_uri = f"s3://{OUTPUT_BUCKET}/{output_key}"
         
-        print(f"🔄 변환 시작: {input_uri} → {output_uri}")
+        # 렌디션 사다리 선택 (키 접두사/객체 메타데이터 기준) 후 헤더 분석으로 변환 방식 결정
+        ladder = renditions.resolve_ladder(bucket_name, object_key)
         
-        # MediaConvert 작업 설정
-        job_settings = {
-            "Role": MEDIACONVERT_ROLE_ARN,
-            "Settings": {
-                "Inputs": [
-                    {
-                        "AudioSelectors": {
-                            "Audio Selector 1": {
-                                "Offset": 0,
-                                "DefaultSelection": "DEFAULT",
-                                "ProgramSelection": 1
-                            }
-                        },
-                        "VideoSelector": {
-                            "ColorSpace": "FOLLOW"
-                        },
-                        "FilterEnable": "AUTO",
-                        "PsiControl": "USE_PSI",
-                        "FilterStrength": 0,
-                        "DeblockFilter": "DISABLED",
-                        "DenoiseFilter": "DISABLED",
-                        "TimecodeSource": "EMBEDDED",
-                        "FileInput": input_uri
-                    }
-                ],
-                "OutputGroups": [
-                    {
-                        "Name": "File Group",
-                        "OutputGroupSettings": {
-                            "Type": "FILE_GROUP_SETTINGS",
-                            "FileGroupSettings": {
-                                "Destination": f"s3://{OUTPUT_BUCKET}/converted/"
-                            }
-                        },
-                        "Outputs": [
-                            {
-                                "NameModifier": f"_{base_name}_sd",
-                                "Preset": None,
-                                "VideoDescription": {
-                                    "ScalingBehavior": "DEFAULT",
-                                    "TimecodeInsertion": "DISABLED",
-                                    "AntiAlias": "ENABLED",
-                                    "Sharpness": 50,
-                                    "CodecSettings": {
-                                        "Codec": "H_264",
-                                        "H264Settings": {
-                                            "InterlaceMode": "PROGRESSIVE",
-                                            "NumberReferenceFrames": 3,
-                                            "Syntax": "DEFAULT",
-                                            "Softness": 0,
-                                            "GopClosedCadence": 1,
-                                            "GopSize": 90,
-                                            "Slices": 1,
-                                            "GopBReference": "DISABLED",
-                                            "SlowPal": "DISABLED",
-                                            "SpatialAdaptiveQuantization": "ENABLED",
-                                            "TemporalAdaptiveQuantization": "ENABLED",
-                                            "FlickerAdaptiveQuantization": "DISABLED",
-                                            "EntropyEncoding": "CABAC",
-                                            "Bitrate": 1500000,  # 1.5 Mbps for SD
-                                            "FramerateControl": "INITIALIZE_FROM_SOURCE",
-                                            "RateControlMode": "CBR",
-                                            "CodecProfile": "MAIN",
-                                            "Telecine": "NONE",
-                                            "MinIInterval": 0,
-                                            "AdaptiveQuantization": "HIGH",
-                                            "CodecLevel": "AUTO",
-                                            "FieldEncoding": "PAFF",
-                                            "SceneChangeDetect": "ENABLED",
-                                            "QualityTuningLevel": "SINGLE_PASS",
-                                            "FramerateConversionAlgorithm": "DUPLICATE_DROP",
-                                            "UnregisteredSeiTimecode": "DISABLED",
-                                            "GopSizeUnits": "FRAMES",
-                                            "ParControl": "INITIALIZE_FROM_SOURCE",
-                                            "NumberBFramesBetweenReferenceFrames": 2,
-                                            "RepeatPps": "DISABLED"
-                                        }
-                                    },
-                                    "AfdSignaling": "NONE",
-                                    "DropFrameTimecode": "ENABLED",
-                                    "RespondToAfd": "NONE",
-                                    "ColorMetadata": "INSERT",
-                                    "Width": 720,  # SD width
-                                    "Height": 480  # SD height
-                                },
-                                "AudioDescriptions": [
-                                    {
-                                        "AudioTypeControl": "FOLLOW_INPUT",
-                                        "CodecSettings": {
-                                            "Codec": "AAC",
-                                            "AacSettings": {
-                                                "AudioDescriptionBroadcasterMix": "NORMAL",
-                                                "Bitrate": 96000,
-                                                "RateControlMode": "CBR",
-                                                "CodecProfile": "LC",
-                                                "CodingMode": "CODING_MODE_2_0",
-                                                "RawFormat": "NONE",
-                                                "SampleRate": 48000,
-                                                "Specification": "MPEG4"
-                                            }
-                                        },
-                                        "LanguageCodeControl": "FOLLOW_INPUT",
-                                        "AudioSourceName": "Audio Selector 1"
-                                    }
-                                ],
-                                "ContainerSettings": {
-                                    "Container": "MP4",
-                                    "Mp4Settings": {
-                                        "CslgAtom": "INCLUDE",
-                                        "FreeSpaceBox": "EXCLUDE",
-                                        "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
-                                    }
-                                }
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
+        # 같은 내용(ETag)이 같은 설정으로 이미 변환되었으면 기존 출력 복사
+        fingerprint = conversion_cache.fingerprint(object_info, JOB_PROFILE, ladder)
+        cached_outputs = conversion_cache.reuse(fingerprint, OUTPUT_BUCKET, output_prefix, base_name)
+        if cached_outputs:
+            metrics.count('Conversions', InputFormat=input_format, Action='cache_hit')
+            copy_id = f"copy-{uuid.uuid4()}"
+            job_store.record_submission(copy_id, input_uri, status='CACHE_HIT', outputs=cached_outputs,
+                                        input_format=input_format, action='cache_hit')
+            return copy_id
+        
+        with metrics.timer('PlanLatency'):
+            plan = probe.plan_conversion(bucket_name, object_key, JOB_PROFILE, ladder)
+        rungs = plan['rungs']
+        metrics.count('Conversions', InputFormat=input_format, Action=plan['action'])
         
-        # MediaConvert 작업 제출
-        response = mediaconvert_client.create_job(
-            Role=MEDIACONVERT_ROLE_ARN,
-            Settings=job_settings["Settings"],
-            Queue="Default"
+        if plan['action'] == 'copy':
+            # 이미 SD 규격 MP4이면 변환 없이 복사
+            output_uri = probe.copy_to_output(bucket_name, object_key, OUTPUT_BUCKET, output_key)
+            copy_id = f"copy-{uuid.uuid4()}"
+            job_store.record_submission(copy_id, input_uri, status='COPIED', outputs=[output_uri],
+                                        input_format=input_format, action='copy')
+            return copy_id
+        
+        if len(rungs) > 1:
+            output_uri = f"s3://{OUTPUT_BUCKET}/{output_prefix}{base_name}_{{{','.join(rungs)}}}.mp4"
+        
+        log.info("🔄 변환 시작", input=input_uri, output=output_uri)
+        
+        # 입력 크기/길이/해상도로 가속 모드와 화질 튜닝을 정하고, 예상 비용이 예산 안인지 확인 (초과 시 지연/하향/거부)
+        size = (object_info or {}).get('size') or (plan['info'] or {}).get('size')
+        tuning = acceleration.select(size, plan['info'])
+        rungs, tuning, estimate = budget.admit(JOB_PROFILE, size, plan['info'], rungs, plan['action'], tuning)
+        if estimate['decision'] == 'downgrade':
+            # 낮춘 출력은 사다리 전체 결과가 아니므로 같은 내용의 캐시 키로 기록하지 않음
+            fingerprint = None
+        
+        # 긴 영상은 시간 구간으로 나눠 병렬 변환 (모든 구간이 끝나면 완료 이벤트에서 렌디션별로 이어 붙임)
+        # 화질을 낮춘 작업은 구간마다 가속 정책이 다시 적용되지 않도록 분할하지 않음
+        ranges = None
+        if plan['action'] == 'transcode' and estimate['decision'] != 'downgrade':
+            ranges = segments.plan((plan['info'] or {}).get('duration'), (plan['info'] or {}).get('frame_rate'))
+        if ranges:
+            group = segments.group_id(bucket_name, object_key, object_info)
+            segments.submit(
+                JOB_PROFILE, MEDIACONVERT_ROLE_ARN, input_uri, OUTPUT_BUCKET, f"{output_prefix}{base_name}", group, ranges,
+                size=size,
+                probe_info=plan['info'],
+                metadata=dict(InputFile=input_uri, InputFormat=input_format, RenditionLadder=ladder,
+                              ConversionAction='segment'),
+                rungs=rungs
+            )
+            return segments.group_job_id(group)
+        
+        # 큐 적체로 제출할 큐/우선순위 결정
+        route = queues.route_job(size, tuning['mode'] in ('PREFERRED', 'ENABLED'), tuning['queue'])
+        
+        # MediaConvert 작업 설정 - 컴파일된 프로파일에 작업별 값만 채움
+        job_request = JOB_PROFILE.build(
+            MEDIACONVERT_ROLE_ARN,
+            input_uri,
+            output_layout.destination(OUTPUT_BUCKET, output_prefix),
+            metadata=dict(
+                conversion_cache.job_metadata(fingerprint, base_name),
+                InputFormat=input_format,
+                RenditionLadder=ladder,
+                ConversionAction=plan['action'],
+                **acceleration.job_metadata(tuning),
+                **route['metadata']
+            ),
+            rungs=rungs,
+            remux=plan['action'] == 'remux',
+            priority=route['priority'],
+            queue=route['queue'],
+            acceleration=tuning['mode'],
+            quality=tuning['quality']
         )
         
+        # MediaConvert 작업 제출 (속도 제한 + 스로틀 시 지터 백오프)
+        response = rate_limit.create_job(**job_request)
+        
         actual_job_id = response['Job']['Id']
-        print(f"✅ MediaConvert 작업 생성 완료: {actual_job_id}")
+        log.annotate(job_id=actual_job_id)
+        log.info("✅ MediaConvert 작업 생성 완료")
+        job_store.record_submission(actual_job_id, input_uri, input_format=input_format,
+                                    queue=job_request.get('Queue'), action=plan['action'],
+                                    duration=(plan['info'] or {}).get('duration'), estimated_cost=estimate['cost'])
         
         return actual_job_id
         
+    except (rate_limit.SubmissionDeferred, budget.BudgetRejected):
+        # 제출하지 못한 작업의 예상 비용은 예산에서 돌려줌
+        budget.release(estimate)
+        raise
     except Exception as e:
-        print(f"❌ MediaConvert 작업 생성 실패: {str(e)}")
+        budget.release(estimate)
+        log.error("❌ MediaConvert 작업 생성 실패", error=str(e))
         return None
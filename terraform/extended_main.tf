@@ -139,13 +139,26 @@ resource "aws_iam_role_policy" "lambda_execution_policy" {
           "${aws_s3_bucket.analysis_bucket.arn}/*"
         ]
       },
+      {
+        Sid = "SegmentListing"
+        Effect = "Allow"
+        Action = [
+          "s3:ListBucket"
+        ]
+        Resource = [
+          aws_s3_bucket.output_bucket.arn
+        ]
+      },
       {
         Sid = "MediaConvertAccess"
         Effect = "Allow"
         Action = [
           "mediaconvert:CreateJob",
           "mediaconvert:GetJob",
-          "mediaconvert:DescribeEndpoints"
+          "mediaconvert:DescribeEndpoints",
+          "mediaconvert:GetJobTemplate",
+          "mediaconvert:CreateJobTemplate",
+          "mediaconvert:GetQueue"
         ]
         Resource = "*"
       },
@@ -287,8 +300,21 @@ resource "aws_iam_role_policy" "analysis_lambda_policy" {
 # Lambda 함수 패키징
 data "archive_file" "conversion_lambda_zip" {
   type        = "zip"
-  source_file = "../enhanced_lambda_function.py"
   output_path = "conversion_lambda_function.zip"
+
+  source {
+    content  = file("${path.module}/../enhanced_lambda_function.py")
+    filename = "enhanced_lambda_function.py"
+  }
+
+  # 공유 헬퍼 패키지 포함
+  dynamic "source" {
+    for_each = fileset("${path.module}/../video_pipeline", "*.py")
+    content {
+      content  = file("${path.module}/../video_pipeline/${source.value}")
+      filename = "video_pipeline/${source.value}"
+    }
+  }
 }
 
 data "archive_file" "rekognition_lambda_zip" {
@@ -417,7 +443,7 @@ resource "aws_cloudwatch_event_rule" "mediaconvert_completion" {
     source      = ["aws.mediaconvert"]
     detail-type = ["MediaConvert Job State Change"]
     detail = {
-      status = ["COMPLETE", "ERROR"]
+      status = ["PROGRESSING", "STATUS_UPDATE", "COMPLETE", "ERROR", "CANCELED"]
     }
   })
 }
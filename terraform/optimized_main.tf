@@ -178,8 +178,21 @@ resource "aws_iam_role_policy" "mediaconvert_policy" {
 # Lambda 함수 패키징
 data "archive_file" "lambda_zip" {
   type        = "zip"
-  source_file = "../lambda_function.py"
   output_path = "lambda_function.zip"
+
+  source {
+    content  = file("${path.module}/../lambda_function.py")
+    filename = "lambda_function.py"
+  }
+
+  # 공유 헬퍼 패키지 포함
+  dynamic "source" {
+    for_each = fileset("${path.module}/../video_pipeline", "*.py")
+    content {
+      content  = file("${path.module}/../video_pipeline/${source.value}")
+      filename = "video_pipeline/${source.value}"
+    }
+  }
 }
 
 # 동영상 변환 Lambda 함수
@@ -252,6 +265,34 @@ resource "aws_lambda_permission" "allow_eventbridge_conversion" {
   source_arn    = aws_cloudwatch_event_rule.s3_video_upload.arn
 }
 
+# EventBridge 규칙: MediaConvert 상태 변경 → 변환 Lambda (변환 캐시/작업 상태 기록용)
+resource "aws_cloudwatch_event_rule" "mediaconvert_completion" {
+  name        = "mediaconvert-completion-rule"
+  description = "MediaConvert 작업 완료 시 변환 Lambda 함수를 트리거"
+
+  event_pattern = jsonencode({
+    source      = ["aws.mediaconvert"]
+    detail-type = ["MediaConvert Job State Change"]
+    detail = {
+      status = ["PROGRESSING", "STATUS_UPDATE", "COMPLETE", "ERROR", "CANCELED"]
+    }
+  })
+}
+
+resource "aws_cloudwatch_event_target" "mediaconvert_completion_target" {
+  rule      = aws_cloudwatch_event_rule.mediaconvert_completion.name
+  target_id = "MediaConvertCompletionTarget"
+  arn       = aws_lambda_function.video_converter.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_mediaconvert" {
+  statement_id  = "AllowEventBridgeMediaConvert"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.video_converter.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.mediaconvert_completion.arn
+}
+
 # 출력값
 output "input_bucket_name" {
   description = "입력 S3 버킷 이름"
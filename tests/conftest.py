@@ -0,0 +1,136 @@
+import io
+import os
+import re
+import sys
+
+import pytest
+from botocore.exceptions import ClientError
+
+# 저장소 루트의 video_pipeline 패키지를 설치 없이 불러옴
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+
+class FakeS3:
+    """범위 읽기(get_object Range)와 목록 조회만 흉내 내는 S3 클라이언트 - 요청한 범위를 ranges에 기록"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.ranges = []
+
+    def get_object(self, Bucket, Key, Range):
+        data = self.objects[(Bucket, Key)]
+        start, end = (int(value) for value in Range[len('bytes='):].split('-'))
+        end = min(end, len(data) - 1)
+        self.ranges.append((start, end))
+        return {'Body': io.BytesIO(data[start:end + 1]), 'ContentRange': f"bytes {start}-{end}/{len(data)}"}
+
+    def get_paginator(self, operation):
+        assert operation == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix=''):
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        yield {'Contents': [{'Key': key} for key in keys]}
+
+
+def _plain(value):
+    if value is None:
+        return None
+    return float(value['N']) if 'N' in value else value.get('S')
+
+
+class FakeDynamoDB:
+    """
+    테이블 하나를 흉내 내는 DynamoDB 클라이언트 - 호출은 calls에 (이름, 인자)로 기록
+    저장소들이 쓰는 식만 해석합니다: SET a = :v / if_not_exists(a, :v), 조건 attribute_not_exists, =, <, IN, NOT, OR
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.items = {}
+        self.calls = []
+
+    def put_item(self, TableName, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None):
+        self.calls.append(('put_item', dict(Item=Item, ConditionExpression=ConditionExpression)))
+        key = Item[self.key]['S']
+        self._check(self.items.get(key), ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+        self.items[key] = dict(Item)
+        return {}
+
+    def get_item(self, TableName, Key, **kwargs):
+        self.calls.append(('get_item', dict(Key=Key)))
+        item = self.items.get(Key[self.key]['S'])
+        return {'Item': dict(item)} if item else {}
+
+    def update_item(self, TableName, Key, UpdateExpression, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ConditionExpression=None, ReturnValues=None):
+        self.calls.append(('update_item', dict(
+            Key=Key, UpdateExpression=UpdateExpression, ExpressionAttributeNames=ExpressionAttributeNames,
+            ExpressionAttributeValues=ExpressionAttributeValues, ConditionExpression=ConditionExpression
+        )))
+        names, values = ExpressionAttributeNames or {}, ExpressionAttributeValues or {}
+        key = Key[self.key]['S']
+        self._check(self.items.get(key), ConditionExpression, names, values)
+        item = dict(self.items.get(key) or Key)
+        assert UpdateExpression.startswith('SET ')
+        for clause in re.split(r',\s*(?=[#\w]+\s*=)', UpdateExpression[len('SET '):]):
+            target, expression = (part.strip() for part in clause.split('=', 1))
+            target = names.get(target, target)
+            match = re.match(r'if_not_exists\(([#\w]+),\s*(:\w+)\)$', expression)
+            if match is None:
+                item[target] = values[expression]
+            elif target not in item:
+                item[target] = values[match.group(2)]
+        self.items[key] = item
+        return {'Attributes': dict(item)} if ReturnValues == 'ALL_NEW' else {}
+
+    def delete_item(self, TableName, Key, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None):
+        self.calls.append(('delete_item', dict(Key=Key, ConditionExpression=ConditionExpression)))
+        key = Key[self.key]['S']
+        self._check(self.items.get(key), ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+        self.items.pop(key, None)
+        return {}
+
+    def _check(self, item, condition, names, values):
+        if condition and not any(self._term(item or {}, term.strip(), names or {}, values or {})
+                                 for term in condition.split(' OR ')):
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': condition}},
+                              'ConditionalWrite')
+
+    @staticmethod
+    def _term(item, term, names, values):
+        negate = term.startswith('NOT ')
+        if negate:
+            term = term[len('NOT '):]
+        match = re.match(r'attribute_not_exists\(([#\w]+)\)$', term)
+        if match:
+            result = names.get(match.group(1), match.group(1)) not in item
+        else:
+            name, operator, operand = term.split(' ', 2)
+            current = _plain(item.get(names.get(name, name)))
+            if operator == 'IN':
+                result = current in [_plain(values[value.strip()]) for value in operand.strip('()').split(',')]
+            elif operator == '=':
+                result = current == _plain(values[operand])
+            else:
+                assert operator == '<'
+                result = current is not None and current < _plain(values[operand])
+        return result != negate
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """입력 객체를 s3.objects[(버킷, 키)]에 넣어 쓰는 가짜 S3 클라이언트"""
+    from video_pipeline import clients
+    fake = FakeS3({})
+    monkeypatch.setattr(clients, 'get_client', lambda service, *args, **kwargs: fake)
+    return fake
+
+
+@pytest.fixture
+def dynamodb():
+    """키 속성 이름으로 가짜 DynamoDB 테이블을 만드는 함수 (예: dynamodb('job_id'))"""
+    return FakeDynamoDB
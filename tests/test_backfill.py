@@ -0,0 +1,73 @@
+import json
+
+from video_pipeline import backfill, output_layout
+
+KEYS = ['a.mov', 'b.mov', 'c.mov', 'd.mov', 'e.mov']
+
+
+def test_fresh_checkpoint_has_everything_pending(tmp_path):
+    checkpoint = backfill.Checkpoint(str(tmp_path / 'backfill.json'))
+    assert checkpoint.pending(KEYS) == KEYS
+
+
+def test_resume_after_last_key_and_retry_failed(tmp_path):
+    path = str(tmp_path / 'backfill.json')
+    backfill.Checkpoint(path).save(['a.mov', 'b.mov', 'c.mov'], failed=['b.mov'])
+
+    checkpoint = backfill.Checkpoint(path)
+    assert checkpoint.state == {'last_key': 'c.mov', 'failed': ['b.mov'], 'submitted': 2}
+    # 이전 실행에서 실패한 키를 먼저, 그다음 마지막 키 이후
+    assert checkpoint.pending(KEYS) == ['b.mov', 'd.mov', 'e.mov']
+
+
+def test_retried_key_leaves_failed_list(tmp_path):
+    path = str(tmp_path / 'backfill.json')
+    checkpoint = backfill.Checkpoint(path)
+    checkpoint.save(['a.mov', 'b.mov'], failed=['a.mov', 'b.mov'])
+    checkpoint.save(['a.mov', 'b.mov', 'c.mov'], failed=['b.mov'])
+    assert checkpoint.state == {'last_key': 'c.mov', 'failed': ['b.mov'], 'submitted': 2}
+    # 다시 실패한 키는 중복 기록되지 않음
+    with open(path) as f:
+        assert json.load(f)['failed'] == ['b.mov']
+
+
+def test_failed_key_removed_from_bucket_is_dropped(tmp_path):
+    path = str(tmp_path / 'backfill.json')
+    backfill.Checkpoint(path).save(['a.mov', 'b.mov'], failed=['a.mov'])
+    assert backfill.Checkpoint(path).pending(['b.mov', 'c.mov']) == ['c.mov']
+
+
+def test_save_replaces_file_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / 'backfill.json')
+    replaced = []
+    real_replace = backfill.os.replace
+
+    def replace(source, target):
+        replaced.append((source, target))
+        real_replace(source, target)
+    monkeypatch.setattr(backfill.os, 'replace', replace)
+    backfill.Checkpoint(path).save(['a.mov'], failed=[])
+    assert replaced == [(f"{path}.tmp", path)]
+    assert [p.name for p in tmp_path.iterdir()] == ['backfill.json']
+
+
+def test_checkpoint_without_path_keeps_state_in_memory(tmp_path):
+    checkpoint = backfill.Checkpoint(None)
+    checkpoint.save(['a.mov'], failed=[])
+    assert checkpoint.pending(KEYS) == KEYS[1:]
+
+
+def test_find_missing_uses_expected_output_keys():
+    inputs = {'x/a.mov': None, 'y/a.mov': None, 'b.txt': None}
+    prefix = output_layout.output_prefix('in', 'x/a.mov', 'mirror')
+    done = {output_layout.output_key(prefix, 'x/a.mov', '_480p')}
+    # 같은 파일명이라도 다른 디렉터리의 입력은 변환 대상
+    assert backfill.find_missing('in', inputs, done, {'.mov'}, ['_480p'], layout='mirror') == ['y/a.mov']
+    assert backfill.find_missing('in', inputs, done, {'.mov'}, ['_480p'], reconvert=True,
+                                 layout='mirror') == ['x/a.mov', 'y/a.mov']
+
+
+def test_find_missing_by_name_for_date_layout():
+    inputs = {'x/a.mov': None, 'y/b.mov': None}
+    done = {'converted/2024/01/02/a_480p.mp4'}
+    assert backfill.find_missing('in', inputs, done, {'.mov'}, ['_480p'], layout='date') == ['y/b.mov']
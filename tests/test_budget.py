@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from video_pipeline import budget, profiles, rate_limit
+
+PROFILE = profiles.get_profile('mp4_standard')
+TUNING = {'mode': None, 'quality': None, 'queue': None, 'rule': None}
+# 480p 10분 = $0.075, fhd 10분 = $0.375
+TEN_MINUTES = {'duration': 600}
+FHD = ('480p', '720p', '1080p')
+
+
+@pytest.fixture
+def window(monkeypatch):
+    spend = budget.MemorySpendWindow(window_seconds=3600)
+    monkeypatch.setattr(budget, 'window', spend)
+    monkeypatch.setattr(budget, 'COST_BUDGET_USD', 0.2)
+    monkeypatch.setattr(budget, 'COST_MAX_JOB_USD', 0.0)
+    monkeypatch.setattr(budget, 'COST_BUDGET_ACTION', 'defer')
+    return spend
+
+
+def admit(rungs=('480p',)):
+    return budget.admit(PROFILE, None, TEN_MINUTES, rungs, 'transcode', TUNING)
+
+
+def test_estimate_uses_probed_duration_and_rungs():
+    assert budget.estimate(PROFILE, probe_info=TEN_MINUTES)['cost'] == pytest.approx(0.075)
+    assert budget.estimate(PROFILE, probe_info=TEN_MINUTES, rungs=FHD)['cost'] == pytest.approx(0.375)
+    accelerated = budget.estimate(PROFILE, probe_info=TEN_MINUTES, acceleration_mode='ENABLED')
+    assert accelerated['cost'] == pytest.approx(0.075 * budget.ACCELERATED_PRICE_MULTIPLIER)
+    # 길이를 모르면 크기와 가정 비트레이트로 추정
+    size = budget.COST_ASSUMED_INPUT_BITRATE * 600 // 8
+    assert budget.estimate(PROFILE, size=size)['minutes'] == pytest.approx(10)
+
+
+def test_admit_reserves_until_budget_then_defers(window):
+    first = admit()
+    second = admit()
+    assert (first[2]['decision'], second[2]['decision']) == ('allow', 'allow')
+    assert window.total() == pytest.approx(0.15)
+    with pytest.raises(budget.BudgetDeferred):
+        admit()
+    assert window.total() == pytest.approx(0.15)
+
+
+def test_release_returns_reserved_spend(window):
+    _, _, estimate = admit()
+    budget.release(estimate)
+    budget.release(estimate)
+    assert window.total() == 0
+    assert estimate['reserved_at'] is None
+
+
+def test_try_reserve_is_atomic_across_threads(window):
+    # 모든 스레드가 동시에 확인하더라도 한도 안의 작업만 예약
+    start = threading.Barrier(10)
+    results = []
+
+    def reserve():
+        start.wait()
+        results.append(window.try_reserve(0.075, 0.2, budget.time.time()))
+
+    threads = [threading.Thread(target=reserve) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 2
+    assert window.total() == pytest.approx(0.15)
+
+
+def test_concurrent_admits_do_not_overshoot_budget(window):
+    start = threading.Barrier(10)
+    decisions = []
+
+    def submit():
+        start.wait()
+        try:
+            decisions.append(admit()[2]['decision'])
+        except budget.BudgetDeferred:
+            decisions.append('defer')
+
+    threads = [threading.Thread(target=submit) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert decisions.count('allow') == 2
+    assert window.total() <= 0.2
+
+
+def test_downgrade_keeps_lowest_rung_without_acceleration(window, monkeypatch):
+    monkeypatch.setattr(budget, 'COST_BUDGET_ACTION', 'downgrade')
+    rungs, tuning, estimate = budget.admit(PROFILE, None, TEN_MINUTES, FHD, 'transcode',
+                                           dict(TUNING, mode='ENABLED', queue='fast'))
+    assert rungs == ('480p',)
+    assert (tuning['mode'], tuning['queue']) == ('DISABLED', None)
+    assert estimate['decision'] == 'downgrade'
+    assert window.total() == pytest.approx(0.075)
+
+
+def test_job_limit_rejects_instead_of_deferring(window, monkeypatch):
+    monkeypatch.setattr(budget, 'COST_MAX_JOB_USD', 0.1)
+    with pytest.raises(budget.BudgetRejected):
+        admit(FHD)
+    assert window.total() == 0
+
+
+def test_defer_falls_back_to_reject_only_when_asked(monkeypatch):
+    monkeypatch.setattr(budget, 'DEFER_FALLBACK', True)
+    deferred = budget.BudgetDeferred('over')
+    assert isinstance(budget.rejected_instead(deferred), budget.BudgetRejected)
+    # 스로틀로 미룬 제출은 거부로 바꾸지 않음
+    assert budget.rejected_instead(rate_limit.SubmissionDeferred('throttled')) is None
+    monkeypatch.setattr(budget, 'DEFER_FALLBACK', False)
+    assert budget.rejected_instead(deferred) is None
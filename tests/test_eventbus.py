@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from video_pipeline import eventbus
+
+
+class FakeEvents:
+    """put_events 호출을 기록하는 가짜 EventBridge - fail(entry)가 오류 코드를 반환한 항목은 실패 처리"""
+
+    def __init__(self, fail=None, error=None):
+        self.calls = []
+        self.fail = fail or (lambda entry: None)
+        self.error = error
+
+    def put_events(self, Entries):
+        self.calls.append(list(Entries))
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+        results = []
+        for entry in Entries:
+            code = self.fail(entry)
+            results.append({'ErrorCode': code, 'ErrorMessage': code} if code else {'EventId': 'id'})
+        return {'FailedEntryCount': sum(1 for r in results if 'ErrorCode' in r), 'Entries': results}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(eventbus.time, 'sleep', lambda seconds: None)
+
+
+def entry(index, detail_bytes=10):
+    return {'Source': 'video.pipeline', 'DetailType': 'Video Converted',
+            'Detail': json.dumps({'i': index, 'pad': 'x' * detail_bytes})}
+
+
+def test_entry_size_counts_fields_and_time():
+    item = {'Source': 'ab', 'DetailType': 'cd', 'Detail': '한', 'Resources': ['r'], 'Time': 1}
+    assert eventbus.entry_size(item) == 14 + 2 + 2 + 3 + 1
+
+
+def test_flush_sends_at_most_ten_entries_per_call():
+    events = FakeEvents()
+    publisher = eventbus.EventPublisher(client=events)
+    for index in range(23):
+        publisher.add(entry(index), tag=index)
+    assert publisher.flush() == []
+    assert [len(call) for call in events.calls] == [10, 10, 3]
+    assert publisher.pending() == 0
+
+
+def test_flush_splits_on_request_size():
+    events = FakeEvents()
+    publisher = eventbus.EventPublisher(client=events)
+    # 항목 하나가 100KB 남짓이므로 두 개씩만 한 요청에 들어감
+    for index in range(5):
+        publisher.add(entry(index, 100 * 1024))
+    publisher.flush()
+    assert [len(call) for call in events.calls] == [2, 2, 1]
+    assert all(sum(eventbus.entry_size(e) for e in call) <= eventbus.PUT_EVENTS_MAX_BYTES for call in events.calls)
+
+
+def test_only_failed_entries_are_resent():
+    failures = {3: 1, 7: 1}
+
+    def fail(item):
+        index = json.loads(item['Detail'])['i']
+        if failures.get(index):
+            failures[index] -= 1
+            return 'ThrottlingException'
+        return None
+    events = FakeEvents(fail=fail)
+    publisher = eventbus.EventPublisher(client=events)
+    for index in range(12):
+        publisher.add(entry(index), tag=index)
+    assert publisher.flush() == []
+    resent = [json.loads(e['Detail'])['i'] for e in events.calls[-1]]
+    assert resent == [3, 7]
+
+
+def test_call_error_resends_whole_chunk():
+    events = FakeEvents(error=RuntimeError('connection reset'))
+    publisher = eventbus.EventPublisher(client=events)
+    publisher.add(entry(0), tag='a')
+    assert publisher.flush() == []
+    assert len(events.calls) == 2
+
+
+def test_flush_returns_tags_that_never_succeeded():
+    events = FakeEvents(fail=lambda item: 'InternalFailure' if json.loads(item['Detail'])['i'] == 1 else None)
+    publisher = eventbus.EventPublisher(client=events, max_attempts=3)
+    for index in range(3):
+        publisher.add(entry(index), tag=f"record-{index}")
+    # 혼자서도 한도를 넘는 항목은 보내지 않고 실패로 반환
+    publisher.add(entry(9, eventbus.PUT_EVENTS_MAX_BYTES), tag='too-big')
+    assert sorted(publisher.flush()) == ['record-1', 'too-big']
+    assert len(events.calls) == 3
+
+
+def test_flush_or_raise():
+    publisher = eventbus.EventPublisher(client=FakeEvents(fail=lambda item: 'InternalFailure'), max_attempts=2)
+    publisher.add(entry(0))
+    with pytest.raises(eventbus.PublishError):
+        publisher.flush_or_raise()
@@ -0,0 +1,103 @@
+import pytest
+
+from video_pipeline import idempotency
+
+DETAIL = {'bucket': {'name': 'in'}, 'object': {'key': 'a.mov', 'version-id': 'v1', 'sequencer': '01', 'etag': 'e'}}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    memory = idempotency.MemoryIdempotencyStore()
+    monkeypatch.setattr(idempotency, 'store', memory)
+    return memory
+
+
+@pytest.fixture
+def table(dynamodb):
+    return dynamodb('idempotency_key')
+
+
+def submitter(*results):
+    """호출 횟수를 세며 results를 차례로 반환 (예외면 던짐)하는 submit 함수"""
+    calls = []
+
+    def submit():
+        result = results[len(calls)]
+        calls.append(result)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    submit.calls = calls
+    return submit
+
+
+def test_event_key_prefers_version_then_sequencer_then_etag():
+    assert idempotency.event_key(DETAIL) == 'in/a.mov#v1'
+    obj = dict(DETAIL['object'], **{'version-id': None})
+    assert idempotency.event_key(dict(DETAIL, object=obj)) == 'in/a.mov#01'
+    obj = {'key': 'a.mov', 'etag': 'e'}
+    assert idempotency.event_key(dict(DETAIL, object=obj), 'decoded name.mov') == 'in/decoded name.mov#e'
+
+
+def test_duplicate_returns_existing_job_without_submitting(store):
+    submit = submitter('job-1', 'job-2')
+    assert idempotency.submit_once('k', submit) == ('job-1', False)
+    assert idempotency.submit_once('k', submit) == ('job-1', True)
+    assert submit.calls == ['job-1']
+
+
+def test_failed_submit_releases_claim(store):
+    submit = submitter(RuntimeError('boom'), None, 'job-1')
+    with pytest.raises(RuntimeError):
+        idempotency.submit_once('k', submit)
+    # None(작업 없이 실패)도 해제하여 다음 재시도에서 다시 제출
+    assert idempotency.submit_once('k', submit) == (None, False)
+    assert idempotency.submit_once('k', submit) == ('job-1', False)
+
+
+def test_in_flight_claim_is_reported_as_duplicate(store):
+    assert store.claim('k')
+    submit = submitter('job-1')
+    assert idempotency.submit_once('k', submit) == (None, True)
+    assert submit.calls == []
+
+
+def test_memory_store_evicts_oldest_entries():
+    memory = idempotency.MemoryIdempotencyStore(max_size=2)
+    for key in ('a', 'b', 'c'):
+        memory.complete(key, f"job-{key}")
+    assert memory.get('a') is None
+    assert memory.get('c')['job_id'] == 'job-c'
+
+
+def test_dynamodb_claim_is_conditional(table):
+    store = idempotency.DynamoDBIdempotencyStore('idempotency', client=table)
+    assert store.claim('k')
+    assert not store.claim('k')
+    store.complete('k', 'job-1')
+    record = store.get('k')
+    assert (record['status'], record['job_id']) == ('DONE', 'job-1')
+    # 완료된 기록은 해제되지 않음
+    store.release('k')
+    assert store.get('k')['job_id'] == 'job-1'
+
+
+def test_dynamodb_expired_claim_can_be_taken_over(table):
+    store = idempotency.DynamoDBIdempotencyStore('idempotency', client=table)
+    assert store.claim('k')
+    table.items['k']['expires_at'] = {'N': '0'}
+    assert store.get('k') is None
+    assert store.claim('k')
+
+
+def test_layered_store_reads_through_to_table(table, monkeypatch):
+    durable = idempotency.DynamoDBIdempotencyStore('idempotency', client=table)
+    first = idempotency.LayeredIdempotencyStore(idempotency.MemoryIdempotencyStore(), durable)
+    second = idempotency.LayeredIdempotencyStore(idempotency.MemoryIdempotencyStore(), durable)
+
+    monkeypatch.setattr(idempotency, 'store', first)
+    assert idempotency.submit_once('k', submitter('job-1')) == ('job-1', False)
+    # 다른 실행 환경은 메모리에 없어도 테이블의 완료 기록으로 중복 판단
+    monkeypatch.setattr(idempotency, 'store', second)
+    assert idempotency.submit_once('k', submitter('job-2')) == ('job-1', True)
+    assert second.memory.get('k')['job_id'] == 'job-1'
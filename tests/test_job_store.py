@@ -0,0 +1,112 @@
+import re
+
+import pytest
+
+from video_pipeline import job_store
+
+INPUT = 's3://in/a.mov'
+
+
+@pytest.fixture
+def store(monkeypatch):
+    memory = job_store.MemoryJobStore()
+    monkeypatch.setattr(job_store, 'store', memory)
+    return memory
+
+
+def event(status, at, **detail):
+    return dict(detail, jobId='job-1', status=status, timestamp=at * 1000,
+                userMetadata={'InputFile': INPUT, 'InputFormat': 'QuickTime'})
+
+
+def test_apply_state_keeps_terminal_status_and_first_times():
+    record = job_store.apply_state(None, 'PROGRESSING', 10, queue='Default')
+    record = job_store.apply_state(record, 'PROGRESSING', 20, queue='other')
+    assert (record['started_at'], record['queue']) == (10, 'Default')
+    record = job_store.apply_state(record, 'COMPLETE', 30, outputs=['s3://out/a.mp4'])
+    # 늦게 도착한 진행 이벤트는 종료 기록을 되돌리지 않음
+    assert job_store.apply_state(record, 'PROGRESSING', 40) == record
+    assert (record['status'], record['finished_at'], record['outputs']) == ('COMPLETE', 30, ['s3://out/a.mp4'])
+
+
+def test_state_changes_follow_submission(store):
+    job_store.record_submission('job-1', INPUT, queue='Default', duration=600)
+    job_store.record_state_change(event('PROGRESSING', 100))
+    record = job_store.record_state_change(event('COMPLETE', 400, outputGroupDetails=[
+        {'outputDetails': [{'outputFilePaths': ['s3://out/a_480p.mp4']}]}
+    ]))
+    assert record['status'] == 'COMPLETE'
+    assert (record['started_at'], record['finished_at'], record['progress']) == (100, 400, 100)
+    assert record['outputs'] == ['s3://out/a_480p.mp4']
+    assert job_store.lookup(input_uri=INPUT)[0]['job_id'] == 'job-1'
+
+
+@pytest.mark.parametrize('status', ['INPUT_INFORMATION', 'NEW_WARNING', 'QUEUE_HOP'])
+def test_non_lifecycle_events_do_not_overwrite_status(store, status):
+    job_store.record_submission('job-1', INPUT)
+    job_store.record_state_change(event('PROGRESSING', 100))
+    assert job_store.record_state_change(event(status, 150)) is None
+    record = store.get('job-1')
+    assert record['status'] == 'PROGRESSING'
+    assert (record['last_event'], record['last_event_at']) == (status, 150)
+
+
+def test_status_update_records_progress(store):
+    job_store.record_submission('job-1', INPUT, duration=600)
+    job_store.record_state_change(event('PROGRESSING', 100))
+    record = job_store.record_state_change(event('STATUS_UPDATE', 160, jobProgress={
+        'jobPercentComplete': 25, 'currentPhase': 'TRANSCODING'
+    }))
+    assert record['status'] == 'PROGRESSING'
+    assert (record['progress'], record['phase'], record['encode_speed'], record['eta_at']) == (
+        25, 'TRANSCODING', 2.5, 340)
+
+
+def test_sqlite_store_merges_and_finds_by_input(tmp_path):
+    sqlite = job_store.SQLiteJobStore(str(tmp_path / 'jobs.db'))
+    sqlite.put({'job_id': 'job-1', 'input': INPUT, 'status': 'SUBMITTED', 'submitted_at': 1, 'queue': 'Default'})
+    sqlite.put({'job_id': 'job-2', 'input': INPUT, 'status': 'SUBMITTED', 'submitted_at': 2})
+    sqlite.update('job-1', 'COMPLETE', 5, outputs=['s3://out/a.mp4'])
+    record = sqlite.get('job-1')
+    assert (record['status'], record['queue'], record['outputs']) == ('COMPLETE', 'Default', ['s3://out/a.mp4'])
+    assert [r['job_id'] for r in sqlite.find_by_input(INPUT)] == ['job-2', 'job-1']
+
+
+def test_dynamodb_update_expression(dynamodb):
+    table = dynamodb('job_id')
+    store = job_store.DynamoDBJobStore('jobs', client=table)
+    store.update('job-1', 'PROGRESSING', 100, input=INPUT, queue='Default', progress={'progress': 10})
+    call = table.calls[-1][1]
+    names, values = call['ExpressionAttributeNames'], call['ExpressionAttributeValues']
+    clauses = re.split(r', (?=[#\w]+ = )', call['UpdateExpression'][len('SET '):])
+    assert '#s = :status' in clauses
+    assert 'started_at = if_not_exists(started_at, :at)' in clauses
+    # input 같은 예약어도 이름 치환, 처음 값만 유지
+    assert '#input = if_not_exists(#input, :input)' in clauses
+    assert names['#input'] == 'input'
+    assert '#progress = :progress' in clauses
+    assert values[':progress'] == {'N': '10'}
+    # 종료 상태가 아니면 종료 상태 기록을 덮어쓰지 않는 조건 포함
+    assert call['ConditionExpression'].startswith('attribute_not_exists(#s) OR NOT #s IN (')
+    assert {values[f":t{i}"]['S'] for i in range(len(job_store.TERMINAL_STATUSES))} == set(job_store.TERMINAL_STATUSES)
+
+
+def test_dynamodb_late_progress_keeps_terminal_record(dynamodb):
+    table = dynamodb('job_id')
+    store = job_store.DynamoDBJobStore('jobs', client=table)
+    store.put({'job_id': 'job-1', 'input': INPUT, 'status': 'SUBMITTED', 'submitted_at': 1})
+    completed = store.update('job-1', 'COMPLETE', 50, outputs=['s3://out/a.mp4'])
+    assert table.calls[-1][1]['ConditionExpression'] is None
+    late = store.update('job-1', 'PROGRESSING', 60)
+    assert late == completed
+    assert (late['status'], late['finished_at'], late['outputs']) == ('COMPLETE', 50, ['s3://out/a.mp4'])
+    assert late['submitted_at'] == 1
+
+
+def test_canceled_is_terminal(store):
+    job_store.record_submission('job-1', INPUT)
+    job_store.record_state_change(event('PROGRESSING', 100))
+    record = job_store.record_state_change(event('CANCELED', 200))
+    assert (record['status'], record['finished_at']) == ('CANCELED', 200)
+    assert job_store.record_state_change(event('STATUS_UPDATE', 210, jobProgress={'jobPercentComplete': 50}))[
+        'status'] == 'CANCELED'
@@ -0,0 +1,156 @@
+import struct
+
+import pytest
+
+from video_pipeline import probe, profiles
+
+PROFILE = profiles.get_profile('mp4_standard')
+
+
+# MP4/MOV 박스 구성 ---------------------------------------------------------------
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def mp4_track(handler, codec, width=0, height=0, timescale=30000, frame_delta=1001):
+    tkhd = b'\0' * 76 + struct.pack('>II', width << 16, height << 16)
+    mdhd = b'\0' * 12 + struct.pack('>II', timescale, 0) + b'\0' * 4
+    hdlr = b'\0' * 8 + handler + b'\0' * 12
+    stsd = b'\0' * 8 + struct.pack('>I', 16) + codec + b'\0' * 8
+    # 첫 프레임만 간격이 다른 stts (가장 많은 샘플의 간격이 프레임 레이트)
+    stts = b'\0' * 4 + struct.pack('>IIIII', 2, 1, 2 * frame_delta, 299, frame_delta)
+    stbl = box(b'stbl', box(b'stsd', stsd) + box(b'stts', stts))
+    return box(b'trak', box(b'tkhd', tkhd) + box(b'mdia', box(b'mdhd', mdhd) + box(b'hdlr', hdlr) + box(b'minf', stbl)))
+
+
+def mp4_file(brand=b'isom', video=b'avc1', audio=b'mp4a', width=640, height=360, seconds=10,
+             moov_first=True, mdat_bytes=4096):
+    ftyp = box(b'ftyp', brand + b'\0\0\0\0' + brand)
+    mvhd = b'\0' * 12 + struct.pack('>II', 1000, seconds * 1000) + b'\0' * 80
+    moov = box(b'moov', box(b'mvhd', mvhd) + mp4_track(b'vide', video, width, height) + mp4_track(b'soun', audio))
+    mdat = box(b'mdat', b'\0' * mdat_bytes)
+    return ftyp + (moov + mdat if moov_first else mdat + moov)
+
+
+# Matroska(EBML) 요소 구성 ------------------------------------------------------------
+
+def element(element_id, payload=b''):
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big')
+    size = bytes([0x80 | len(payload)]) if len(payload) < 127 else struct.pack('>H', 0x4000 | len(payload))
+    return id_bytes + size + payload
+
+
+def mkv_file(video_codec=b'V_MPEG4/ISO/AVC', audio_codec=b'A_AAC', width=640, height=360, seconds=12.0,
+             segment_size=None):
+    header = element(0x1A45DFA3, element(0x4282, b'matroska'))
+    info = element(0x1549A966, element(0x2AD7B1, (1000000).to_bytes(3, 'big')) + element(0x4489, struct.pack('>d', seconds * 1000)))
+    # DefaultDuration 40ms = 25fps
+    video = element(0xAE, element(0x83, b'\x01') + element(0x23E383, (40000000).to_bytes(4, 'big')) +
+                    element(0x86, video_codec) +
+                    element(0xE0, element(0xB0, width.to_bytes(2, 'big')) + element(0xBA, height.to_bytes(2, 'big'))))
+    audio = element(0xAE, element(0x83, b'\x02') + element(0x86, audio_codec))
+    cluster = element(0x1F43B675, b'\0' * 32)
+    # segment_size가 없으면 라이브 녹화처럼 Segment 크기를 알 수 없는 경우 (8바이트 모두 1)
+    size = b'\x01' + (segment_size.to_bytes(7, 'big') if segment_size else b'\xff' * 7)
+    segment = b'\x18\x53\x80\x67' + size + info + element(0x1654AE6B, video + audio) + cluster
+    return header + segment
+
+
+def plan(s3, data, key='video'):
+    s3.objects[('in', key)] = data
+    return probe.plan_conversion('in', key, PROFILE, 'sd')
+
+
+# MP4 / MOV -----------------------------------------------------------------------
+
+def test_mp4_moov_first_is_copied(s3):
+    result = plan(s3, mp4_file())
+    info = result['info']
+    assert result['action'] == 'copy'
+    assert (info['container'], info['video_codec'], info['audio_codec']) == ('mp4', 'h264', 'aac')
+    assert (info['width'], info['height'], info['duration']) == (640, 360, 10)
+    assert info['frame_rate'] == pytest.approx(29.97)
+    assert info['moov_first'] is True
+    assert len(s3.ranges) == 1
+
+
+def test_mp4_moov_last_is_remuxed_without_reading_mdat(s3, monkeypatch):
+    monkeypatch.setattr(probe, 'PROBE_HEAD_BYTES', 256)
+    data = mp4_file(moov_first=False, mdat_bytes=64 * 1024)
+    result = plan(s3, data)
+    assert result['action'] == 'remux'
+    assert result['info']['moov_first'] is False
+    assert result['info']['video_codec'] == 'h264'
+    # 머리 + mdat 다음 박스 헤더 + moov 본문만 읽음
+    assert sum(end - start + 1 for start, end in s3.ranges) < 1024
+
+
+def test_mov_container_is_remuxed(s3):
+    result = plan(s3, mp4_file(brand=b'qt  '))
+    assert result['info']['container'] == 'mov'
+    assert result['action'] == 'remux'
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'video': b'hvc1'},                     # H.265
+    {'width': 1920, 'height': 1080},        # 프로파일보다 큰 해상도
+    {'audio': b'ac-3'},                     # AAC가 아닌 음성
+])
+def test_mp4_outside_profile_is_transcoded(s3, kwargs):
+    assert plan(s3, mp4_file(**kwargs))['action'] == 'transcode'
+
+
+def test_mp4_high_bitrate_is_transcoded(s3):
+    # 1초에 1MB → 약 8Mbps
+    result = plan(s3, mp4_file(seconds=1, mdat_bytes=1024 * 1024))
+    assert result['info']['bitrate'] > PROFILE.max_bitrate
+    assert result['action'] == 'transcode'
+
+
+def test_mp4_corrupt_box_falls_back_to_transcode(s3):
+    data = box(b'ftyp', b'isom\0\0\0\0isom') + struct.pack('>I4s', 4, b'moov')
+    result = plan(s3, data)
+    assert result['info'] is None
+    assert result['action'] == 'transcode'
+
+
+# Matroska ------------------------------------------------------------------------
+
+@pytest.mark.parametrize('segment_size', [None, 10 * 2 ** 30])
+def test_matroska_header_is_parsed(s3, segment_size):
+    # 크기를 알 수 없는 Segment / 첫 범위 읽기보다 훨씬 큰 Segment
+    result = plan(s3, mkv_file(segment_size=segment_size))
+    info = result['info']
+    assert (info['container'], info['video_codec'], info['audio_codec']) == ('matroska', 'h264', 'aac')
+    assert (info['width'], info['height']) == (640, 360)
+    assert info['duration'] == pytest.approx(12.0)
+    assert info['frame_rate'] == 25
+    assert result['action'] == 'remux'
+
+
+def test_matroska_vp9_is_transcoded(s3):
+    result = plan(s3, mkv_file(video_codec=b'V_VP9', audio_codec=b'A_OPUS'))
+    assert (result['info']['video_codec'], result['info']['audio_codec']) == ('vp9', 'opus')
+    assert result['action'] == 'transcode'
+
+
+def test_matroska_truncated_in_tracks_keeps_partial_info(s3):
+    data = mkv_file()
+    cut = data.index(b'V_MPEG4') + 3
+    result = plan(s3, data[:cut])
+    assert result['info']['duration'] == pytest.approx(12.0)
+    assert result['info']['video_codec'] is None
+    assert result['action'] == 'transcode'
+
+
+@pytest.mark.parametrize('length', [5, 6, 9])
+def test_matroska_truncated_header_falls_back_to_transcode(s3, length):
+    result = plan(s3, mkv_file()[:length])
+    assert result['action'] == 'transcode'
+
+
+def test_unknown_format_falls_back_to_transcode(s3):
+    result = plan(s3, b'RIFF\0\0\0\0AVI LIST' + b'\0' * 64)
+    assert result['info'] is None
+    assert result['action'] == 'transcode'
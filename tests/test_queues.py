@@ -0,0 +1,61 @@
+import pytest
+
+from video_pipeline import queues
+
+QUEUES = [
+    {'name': 'reserved-hd', 'reserved': True, 'capacity': 2},
+    {'name': 'Default', 'capacity': 20},
+    {'name': 'short-clips', 'capacity': 20, 'max_bytes': 100},
+]
+
+
+@pytest.fixture
+def get_queue(monkeypatch):
+    """큐별 적체(counts)를 돌려주는 가짜 GetQueue - 조회 중에 모듈 잠금이 잡혀 있지 않은지 확인"""
+    def fake(operation, Name):
+        assert not queues._lock.locked()
+        fake.calls.append(Name)
+        if fake.counts[Name] is None:
+            raise RuntimeError('TooManyRequestsException')
+        return {'Queue': {'SubmittedJobsCount': fake.counts[Name], 'ProgressingJobsCount': 0}}
+    fake.counts = {'reserved-hd': 0, 'Default': 10, 'short-clips': 2}
+    fake.calls = []
+    monkeypatch.setattr(queues.endpoint, 'call_mediaconvert', fake)
+    monkeypatch.setattr(queues, 'MEDIACONVERT_QUEUES', QUEUES)
+    monkeypatch.setattr(queues, '_stats', {})
+    return fake
+
+
+def test_reserved_queue_used_while_slots_are_free(get_queue):
+    routes = [queues.route_job(size=1000)['queue'] for _ in range(3)]
+    # 예약 슬롯 두 개를 채운 뒤 적체 비율이 가장 낮은 큐로
+    assert routes == ['reserved-hd', 'reserved-hd', 'Default']
+    # TTL 동안은 다시 조회하지 않음
+    assert sorted(get_queue.calls) == ['Default', 'reserved-hd']
+
+
+def test_small_input_can_use_size_limited_queue(get_queue):
+    get_queue.counts['reserved-hd'] = 2
+    route = queues.route_job(size=50)
+    assert route['queue'] == 'short-clips'
+    assert route['metadata']['QueueRouting'] == 'least_loaded'
+
+
+def test_accelerated_jobs_skip_reserved_queues(get_queue):
+    assert queues.route_job(size=1000, accelerated=True)['queue'] == 'Default'
+    assert 'reserved-hd' not in get_queue.calls
+
+
+def test_failed_lookup_keeps_last_backlog(get_queue, monkeypatch):
+    queues.route_job(size=1000)
+    monkeypatch.setattr(queues, 'QUEUE_STATS_TTL_SECONDS', 0)
+    get_queue.counts['reserved-hd'] = None
+    queues.route_job(size=1000)
+    # 조회에 실패한 예약 큐는 앞선 값(0)에 예약 반영분만 더해짐
+    assert queues._stats['reserved-hd']['backlog'] == 2
+
+
+def test_policy_queue_is_used_as_is(get_queue):
+    route = queues.route_job(size=1000, queue='fast')
+    assert (route['queue'], route['metadata']['QueueRouting']) == ('fast', 'policy')
+    assert get_queue.calls == []
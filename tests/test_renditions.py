@@ -0,0 +1,31 @@
+import re
+
+import pytest
+
+from video_pipeline import renditions
+
+
+def test_valid_ladders_pass():
+    renditions._validate('sd', {'premium/': 'fhd', 'shorts/': 'hd'})
+
+
+@pytest.mark.parametrize('default, rules, name', [
+    ('uhd', {}, 'DEFAULT_RENDITION_LADDER=uhd'),
+    ('sd', {'premium/': 'fhd', 'shorts/': '720p'}, "RENDITION_LADDER_RULES['shorts/']=720p"),
+])
+def test_unknown_ladder_is_rejected(default, rules, name):
+    with pytest.raises(ValueError, match=re.escape(name)):
+        renditions._validate(default, rules)
+
+
+def test_select_ladder_prefers_metadata_then_longest_prefix(monkeypatch):
+    monkeypatch.setattr(renditions, '_SORTED_RULES', [('premium/shorts/', 'hd'), ('premium/', 'fhd')])
+    assert renditions.select_ladder('premium/shorts/a.mov') == 'hd'
+    assert renditions.select_ladder('premium/a.mov') == 'fhd'
+    assert renditions.select_ladder('premium/a.mov', {'rendition-ladder': 'sd'}) == 'sd'
+    assert renditions.select_ladder('other/a.mov') == renditions.DEFAULT_LADDER
+
+
+def test_ladder_rungs_drop_upscaled_renditions():
+    assert renditions.ladder_rungs('fhd', source_height=720) == ('480p', '720p')
+    assert renditions.ladder_rungs('fhd', source_height=360) == ('480p',)
@@ -0,0 +1,181 @@
+import pytest
+
+from video_pipeline import idempotency, job_store, profiles, segments
+
+PROFILE = profiles.get_profile('mp4_standard')
+ROLE = 'arn:aws:iam::123456789012:role/MediaConvert'
+INPUT = 's3://in/movies/long.mov'
+PROBE_INFO = {'duration': 1800, 'frame_rate': 29.97}
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    monkeypatch.setattr(segments, 'SEGMENTED_TRANSCODING_ENABLED', True)
+    monkeypatch.setattr(segments, 'SEGMENT_MIN_DURATION_SECONDS', 1800)
+    monkeypatch.setattr(segments, 'SEGMENT_TARGET_SECONDS', 600)
+    monkeypatch.setattr(segments, 'SEGMENT_MAX_COUNT', 20)
+    monkeypatch.setattr(job_store, 'store', job_store.MemoryJobStore())
+
+
+@pytest.fixture
+def containers(monkeypatch, dynamodb):
+    """DynamoDB 멱등성 테이블을 공유하는 실행 환경 - 호출할 때마다 메모리 저장소가 빈 새 실행 환경으로 바뀜"""
+    table = dynamodb('idempotency_key')
+
+    def new_container():
+        store = idempotency.LayeredIdempotencyStore(
+            idempotency.MemoryIdempotencyStore(), idempotency.DynamoDBIdempotencyStore('idempotency', client=table)
+        )
+        monkeypatch.setattr(idempotency, 'store', store)
+        return store
+    return new_container
+
+
+@pytest.fixture
+def create_job(monkeypatch):
+    """제출한 create_job 요청을 기록하는 가짜 제출 - fail_at 번째 호출에서 한 번 실패"""
+    submitted = []
+
+    def fake(**request):
+        if len(submitted) == fake.fail_at:
+            fake.fail_at = None
+            raise RuntimeError('InternalServerError')
+        submitted.append(request)
+        return {'Job': {'Id': f"job-{len(submitted)}"}}
+    fake.fail_at = None
+    fake.submitted = submitted
+    monkeypatch.setattr(segments.rate_limit, 'create_job', fake)
+    return fake
+
+
+def submit(ranges):
+    return segments.submit(PROFILE, ROLE, INPUT, 'out', 'converted/long', 'g1', ranges, size=3 * 2 ** 30,
+                           probe_info=PROBE_INFO, metadata={'InputFile': INPUT, 'InputFormat': 'QuickTime'})
+
+
+def test_plan_splits_long_inputs_into_whole_second_ranges():
+    assert segments.plan(1800, 30) == [(0, 600), (600, 1200), (1200, None)]
+    assert segments.plan(1900, 30) == [(0, 475), (475, 950), (950, 1425), (1425, None)]
+    assert len(segments.plan(600 * 50, 30)) == 20
+
+
+@pytest.mark.parametrize('duration, frame_rate', [(1000, 30), (None, 30), (3600, None)])
+def test_plan_does_not_split(duration, frame_rate):
+    # 짧거나 길이를 모르는 영상, 경계 프레임을 자를 수 없는(프레임 레이트를 모르는) 영상
+    assert segments.plan(duration, frame_rate) is None
+
+
+def test_plan_disabled(monkeypatch):
+    monkeypatch.setattr(segments, 'SEGMENTED_TRANSCODING_ENABLED', False)
+    assert segments.plan(3600, 30) is None
+
+
+@pytest.mark.parametrize('frame_rate, end_timecode', [
+    (29.97, '00:19:59:29'), (25, '00:19:59:24'), (23.976, '00:19:59:23')
+])
+def test_clip_ends_one_frame_before_next_segment(frame_rate, end_timecode):
+    request = PROFILE.build(ROLE, INPUT, 's3://out/segments/g1/part0001', inline=True)
+    clipped = segments.clip(request, 600, 1200, frame_rate)
+    clipping = clipped['Settings']['Inputs'][0]['InputClippings']
+    assert clipping == [{'StartTimecode': '00:10:00:00', 'EndTimecode': end_timecode}]
+    assert clipped['Settings']['Inputs'][0]['TimecodeSource'] == 'ZEROBASED'
+    # 원래 요청(프로파일 설정)은 그대로
+    assert 'InputClippings' not in request['Settings']['Inputs'][0]
+
+
+def test_last_clip_runs_to_end_of_file():
+    request = PROFILE.build(ROLE, INPUT, 's3://out/segments/g1/part0002', inline=True)
+    clipping = segments.clip(request, 1268, None, 30)['Settings']['Inputs'][0]['InputClippings']
+    assert clipping == [{'StartTimecode': '00:21:08:00'}]
+
+
+def test_shared_idempotency_store_is_required(monkeypatch):
+    monkeypatch.setattr(idempotency, 'IDEMPOTENCY_TABLE', None)
+    with pytest.raises(ValueError):
+        segments.require_shared_idempotency()
+    monkeypatch.setattr(idempotency, 'IDEMPOTENCY_TABLE', 'idempotency')
+    segments.require_shared_idempotency()
+    monkeypatch.setattr(segments, 'SEGMENTED_TRANSCODING_ENABLED', False)
+    monkeypatch.setattr(idempotency, 'IDEMPOTENCY_TABLE', None)
+    segments.require_shared_idempotency()
+
+
+def test_retry_in_new_container_skips_submitted_segments(containers, create_job):
+    ranges = segments.plan(1800, 30)
+    create_job.fail_at = 2
+    containers()
+    with pytest.raises(RuntimeError):
+        submit(ranges)
+    assert len(create_job.submitted) == 2
+
+    containers()
+    job_ids = submit(ranges)
+    assert job_ids == ['job-1', 'job-2', 'job-3']
+    assert [r['UserMetadata']['SegmentIndex'] for r in create_job.submitted] == ['0', '1', '2']
+
+
+def segment_complete(create_job, index):
+    metadata = create_job.submitted[index]['UserMetadata']
+    return {'jobId': f"job-{index + 1}", 'status': 'COMPLETE', 'userMetadata': metadata}
+
+
+def finish_segments(s3, create_job, count):
+    for request in create_job.submitted[:count]:
+        metadata = request['UserMetadata']
+        for modifier in metadata['SegmentModifiers'].split(','):
+            s3.objects[('out', segments.segment_key('g1', int(metadata['SegmentIndex']), modifier))] = b''
+
+
+def test_stitch_waits_for_all_segments(s3, containers, create_job):
+    containers()
+    submit(segments.plan(1800, 30))
+    finish_segments(s3, create_job, 2)
+    result = segments.on_segment_complete(segment_complete(create_job, 1), PROFILE, ROLE)
+    assert (result['remaining'], result['stitch_jobs']) == (1, None)
+    assert len(create_job.submitted) == 3
+
+
+def test_stitch_submitted_once_across_containers(s3, containers, create_job):
+    containers()
+    submit(segments.plan(1800, 30))
+    finish_segments(s3, create_job, 3)
+
+    # 마지막 두 구간의 완료 이벤트를 서로 다른 실행 환경이 받음
+    first = segments.on_segment_complete(segment_complete(create_job, 2), PROFILE, ROLE)
+    containers()
+    second = segments.on_segment_complete(segment_complete(create_job, 1), PROFILE, ROLE)
+    assert first['stitch_jobs'] == ['job-4']
+    assert second['stitch_jobs'] == ['job-4']
+    assert len(create_job.submitted) == 4
+
+    stitch = create_job.submitted[3]
+    modifier = create_job.submitted[0]['UserMetadata']['SegmentModifiers']
+    assert [i['FileInput'] for i in stitch['Settings']['Inputs']] == [
+        f"s3://out/{segments.segment_key('g1', index, modifier)}" for index in range(3)
+    ]
+    assert stitch['UserMetadata']['ConversionAction'] == 'stitch'
+
+
+def test_segment_failure_marks_group_error(containers, create_job):
+    containers()
+    submit(segments.plan(1800, 30))
+    detail = dict(segment_complete(create_job, 1), status='ERROR', errorMessage='decode failed')
+    result = segments.on_segment_failed(detail)
+    assert result == {'group': 'g1', 'failed_segment': 1}
+    record = job_store.store.get(segments.group_job_id('g1'))
+    assert (record['status'], record['error']) == ('ERROR', 'decode failed')
+
+
+def test_canceled_segment_stops_stitch(s3, containers, create_job):
+    containers()
+    submit(segments.plan(1800, 30))
+    finish_segments(s3, create_job, 3)
+    canceled = dict(segment_complete(create_job, 0), status='CANCELED')
+    assert segments.on_segment_complete(canceled, PROFILE, ROLE)['stitch_jobs'] is None
+    record = job_store.store.get(segments.group_job_id('g1'))
+    assert (record['status'], record['error']) == ('CANCELED', '구간 0 취소')
+
+    # 나머지 구간이 모두 완료되어도 취소된 그룹은 이어 붙이지 않음
+    result = segments.on_segment_complete(segment_complete(create_job, 2), PROFILE, ROLE)
+    assert result['stitch_jobs'] is None
+    assert len(create_job.submitted) == 3
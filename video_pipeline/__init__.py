@@ -0,0 +1 @@
+"""변환 Lambda 함수들이 공유하는 헬퍼 모듈 모음"""
@@ -0,0 +1,64 @@
+import json
+import os
+
+from video_pipeline import log
+
+ACCELERATION_MODES = ('DISABLED', 'PREFERRED', 'ENABLED')
+QUALITY_TUNING_LEVELS = ('SINGLE_PASS', 'SINGLE_PASS_HQ', 'MULTI_PASS_HQ')
+
+# 가속/화질 정책 규칙 (JSON 배열, 위에서부터 처음 일치하는 규칙 적용)
+# 조건: min_bytes(입력 크기), min_duration(초), min_height(세로 해상도) - 규칙 안의 조건은 모두 만족해야 함
+# 결과: mode(AccelerationSettings), quality(H.264 QualityTuningLevel), queue(제출할 큐)
+# 길이/해상도는 입력 분석 결과가 있을 때만 비교하며, 모르면 해당 조건은 불일치로 간주합니다.
+# 기본값: 20분 이상 또는 2GB 이상 또는 1080p 초과 원본은 가속 사용 (지원하지 않는 입력은 자동으로 일반 변환)
+DEFAULT_POLICY = [
+    {'min_duration': 1200, 'mode': 'PREFERRED'},
+    {'min_bytes': 2 * 1024 * 1024 * 1024, 'mode': 'PREFERRED'},
+    {'min_height': 1081, 'mode': 'PREFERRED'},
+]
+ACCELERATION_POLICY = json.loads(os.environ.get('ACCELERATION_POLICY', 'null')) or DEFAULT_POLICY
+
+_CONDITIONS = (('min_bytes', 'size'), ('min_duration', 'duration'), ('min_height', 'height'))
+
+
+def _validate(policy):
+    for rule in policy:
+        if rule.get('mode') not in (None,) + ACCELERATION_MODES:
+            raise ValueError(f"알 수 없는 가속 모드: {rule['mode']}")
+        if rule.get('quality') not in (None,) + QUALITY_TUNING_LEVELS:
+            raise ValueError(f"알 수 없는 화질 튜닝 수준: {rule['quality']}")
+    return policy
+
+
+_validate(ACCELERATION_POLICY)
+
+
+def select(size=None, probe_info=None, policy=None):
+    """
+    입력 크기와 분석 결과(길이/해상도)로 가속 모드, 화질 튜닝 수준, 큐 선택
+    반환값: {'mode', 'quality', 'queue', 'rule'} - 일치하는 규칙이 없으면 모두 None (프로파일 기본값 사용)
+    """
+    facts = dict(probe_info or {}, size=size or (probe_info or {}).get('size'))
+    for index, rule in enumerate(ACCELERATION_POLICY if policy is None else policy):
+        conditions = [(key, fact) for key, fact in _CONDITIONS if key in rule]
+        if all(facts.get(fact) is not None and facts[fact] >= rule[key] for key, fact in conditions):
+            log.info("🚀 가속 정책 규칙 적용", rule_index=index, rule=rule)
+            return {
+                'mode': rule.get('mode'),
+                'quality': rule.get('quality'),
+                'queue': rule.get('queue'),
+                'rule': index
+            }
+    return {'mode': None, 'quality': None, 'queue': None, 'rule': None}
+
+
+def job_metadata(decision):
+    """작업 UserMetadata에 기록할 정책 결정"""
+    if decision['rule'] is None:
+        return {}
+    metadata = {'AccelerationRule': str(decision['rule'])}
+    if decision['mode']:
+        metadata['AccelerationMode'] = decision['mode']
+    if decision['quality']:
+        metadata['QualityTuningLevel'] = decision['quality']
+    return metadata
@@ -0,0 +1,131 @@
+import json
+import os
+import urllib.parse
+
+# 입장 필터는 AWS 호출 없이 끝나야 하므로 클라이언트/저장소를 쓰는 모듈은 불러오지 않음
+from video_pipeline import log, metrics, output_layout
+
+# S3 업로드 이벤트 입장 필터 - 이벤트 내용(키/크기)만으로 처리 대상인지 판정하여
+# 대상이 아닌 이벤트는 엔드포인트 조회/이벤트 직렬화 등 AWS 호출 없이 바로 끝냅니다.
+
+# 지원하는 입력 동영상 포맷 (모두 MP4로 변환됨) - 모든 핸들러가 같은 목록 사용
+SUPPORTED_VIDEO_FORMATS = {
+    '.mp4': 'MP4',
+    '.mov': 'QuickTime',
+    '.avi': 'AVI',
+    '.mkv': 'Matroska',
+    '.wmv': 'Windows Media',
+    '.flv': 'Flash Video',
+    '.webm': 'WebM',
+    '.m4v': 'iTunes Video',
+    '.3gp': '3GPP',
+    '.mts': 'AVCHD',
+    '.m2ts': 'Blu-ray',
+    '.vob': 'DVD Video'
+}
+
+# 객체 크기 범위 (바이트, 이벤트의 detail.object.size 기준 - 크기가 없는 이벤트는 검사하지 않음)
+ADMISSION_MIN_SIZE_BYTES = int(os.environ.get('ADMISSION_MIN_SIZE_BYTES', '1'))
+ADMISSION_MAX_SIZE_BYTES = int(os.environ.get('ADMISSION_MAX_SIZE_BYTES', '0'))  # 0: 제한 없음
+# 쉼표로 구분한 키 접두사/접미사 규칙 (포함 규칙이 비어 있으면 모든 키 허용)
+ADMISSION_INCLUDE_PREFIXES = os.environ.get('ADMISSION_INCLUDE_PREFIXES', '')
+ADMISSION_EXCLUDE_PREFIXES = os.environ.get('ADMISSION_EXCLUDE_PREFIXES', '')
+ADMISSION_EXCLUDE_SUFFIXES = os.environ.get('ADMISSION_EXCLUDE_SUFFIXES', '')
+
+# 콘솔/도구가 만드는 폴더 표시 객체
+FOLDER_MARKER_SUFFIXES = ('/', '_$folder$')
+
+
+def _split(value):
+    return tuple(item.strip() for item in value.split(',') if item.strip())
+
+
+class AdmissionFilter:
+    """
+    설정을 한 번만 컴파일해 두고 이벤트마다 문자열 비교만 수행하는 입장 필터
+    own_prefixes: 파이프라인이 직접 쓰는 출력 접두사 - output_bucket에 올라온 객체는 변환 루프 방지를 위해 거부
+    """
+
+    def __init__(self, formats, min_size=0, max_size=0, include_prefixes=(), exclude_prefixes=(),
+                 exclude_suffixes=(), output_bucket=None, own_prefixes=()):
+        self.formats = dict(formats)
+        self.min_size = min_size
+        self.max_size = max_size
+        # str.startswith/endswith는 튜플을 한 번에 비교
+        self.include_prefixes = tuple(include_prefixes)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+        self.exclude_suffixes = tuple(suffix.lower() for suffix in exclude_suffixes)
+        self.output_bucket = output_bucket
+        self.own_prefixes = tuple(own_prefixes)
+
+    def check(self, detail):
+        """
+        EventBridge S3 이벤트 detail 판정
+        반환값: (디코딩된 객체 키, 입력 포맷, 거부 사유) - 처리 대상이면 거부 사유가 None
+        """
+        bucket = detail['bucket']['name']
+        obj = detail['object']
+        key = urllib.parse.unquote_plus(obj['key'])
+
+        if key.endswith(FOLDER_MARKER_SUFFIXES):
+            return key, None, 'folder_marker'
+        if self.own_prefixes and bucket == self.output_bucket and key.startswith(self.own_prefixes):
+            return key, None, 'own_output'
+
+        lowered = key.lower()
+        input_format = self.formats.get(os.path.splitext(lowered)[1])
+        if input_format is None:
+            return key, None, 'unsupported_format'
+        if self.exclude_suffixes and lowered.endswith(self.exclude_suffixes):
+            return key, input_format, 'excluded_suffix'
+        if self.include_prefixes and not key.startswith(self.include_prefixes):
+            return key, input_format, 'not_included_prefix'
+        if self.exclude_prefixes and key.startswith(self.exclude_prefixes):
+            return key, input_format, 'excluded_prefix'
+
+        size = obj.get('size')
+        if size is not None:
+            if size < self.min_size:
+                return key, input_format, 'too_small'
+            if self.max_size and size > self.max_size:
+                return key, input_format, 'too_large'
+        return key, input_format, None
+
+
+# 환경 변수 설정으로 모듈 로드 시 한 번 컴파일
+default_filter = AdmissionFilter(
+    SUPPORTED_VIDEO_FORMATS,
+    min_size=ADMISSION_MIN_SIZE_BYTES,
+    max_size=ADMISSION_MAX_SIZE_BYTES,
+    include_prefixes=_split(ADMISSION_INCLUDE_PREFIXES),
+    exclude_prefixes=_split(ADMISSION_EXCLUDE_PREFIXES),
+    exclude_suffixes=_split(ADMISSION_EXCLUDE_SUFFIXES),
+    output_bucket=os.environ.get('OUTPUT_BUCKET'),
+    own_prefixes=(output_layout.OUTPUT_PREFIX, output_layout.SEGMENT_PREFIX)
+)
+
+
+def is_upload_event(event):
+    """입장 필터 대상인 S3 객체 이벤트인지 확인"""
+    detail = event.get('detail')
+    return event.get('source') != 'aws.mediaconvert' and isinstance(detail, dict) and 'bucket' in detail
+
+
+def check(detail):
+    """기본 필터로 판정 - (객체 키, 입력 포맷, 거부 사유)"""
+    return default_filter.check(detail)
+
+
+def record_rejection(object_key, reason):
+    """거부 사유별 건수 지표와 로그 기록 (AWS 호출 없음 - 지표는 호출 종료 시 로그로 출력)"""
+    metrics.count('AdmissionRejected', Reason=reason)
+    log.info("⏭️ 처리 대상이 아닌 객체", object_key=object_key, reason=reason)
+
+
+def skipped_response(object_key, reason):
+    """거부된 객체 응답 (모든 핸들러 공통) - 재시도해도 결과가 같으므로 성공으로 응답"""
+    record_rejection(object_key, reason)
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'message': '처리 대상이 아닌 객체이므로 처리하지 않음', 'reason': reason})
+    }
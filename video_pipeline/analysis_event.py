@@ -0,0 +1,95 @@
+import json
+import os
+from datetime import datetime
+
+from video_pipeline import clients, eventbus, log
+
+# 분석 트리거 이벤트 스키마 버전 (1: MediaConvert detail 전체를 포함하던 기존 형식)
+SCHEMA_VERSION = 2
+# compact: 요약 정보만 / claim_check: 전체 detail은 분석 버킷에 저장하고 위치만 전달 / full: 전체 detail 포함
+ANALYSIS_EVENT_MODE = os.environ.get('ANALYSIS_EVENT_MODE', 'compact')
+ANALYSIS_DETAIL_PREFIX = os.environ.get('ANALYSIS_DETAIL_PREFIX', 'job-details/')
+
+
+def build_detail(job_id, output_files, mediaconvert_detail, analysis_bucket, analysis_types):
+    """
+    분석 트리거 이벤트의 Detail 생성
+    작업 ID, 입력, 출력 경로, 출력별 길이/해상도만 담고, 모드에 따라 전체 detail을 포함하거나 S3 위치만 전달합니다.
+    full 모드에서 EventBridge 항목 크기 한도를 넘으면 claim_check로 전환합니다.
+    """
+    mediaconvert_detail = mediaconvert_detail or {}
+    outputs = _output_summaries(mediaconvert_detail, output_files)
+    detail = {
+        'schema_version': SCHEMA_VERSION,
+        'mediaconvert_job_id': job_id,
+        'status': mediaconvert_detail.get('status'),
+        'input': mediaconvert_detail.get('input') or (mediaconvert_detail.get('userMetadata') or {}).get('InputFile'),
+        'converted_files': output_files,
+        'outputs': outputs,
+        'duration_ms': max((o['duration_ms'] for o in outputs if o.get('duration_ms')), default=None),
+        'analysis_bucket': analysis_bucket,
+        'timestamp': datetime.utcnow().isoformat(),
+        'analysis_types': analysis_types
+    }
+
+    mode = ANALYSIS_EVENT_MODE
+    if mode == 'full':
+        full = dict(detail, original_mediaconvert_detail=mediaconvert_detail)
+        if len(json.dumps(full).encode('utf-8')) < eventbus.PUT_EVENTS_MAX_BYTES - 1024:
+            return full
+        log.warning("⚠️ 작업 detail이 이벤트 크기 한도를 넘어 S3 참조로 전달", job_id=job_id)
+        mode = 'claim_check'
+    if mode == 'claim_check' and analysis_bucket:
+        try:
+            detail['detail_ref'] = store_detail(analysis_bucket, job_id, mediaconvert_detail)
+        except Exception as e:
+            # 요약 정보만으로도 분석은 가능하므로 참조 없이 발송
+            log.warning("⚠️ 작업 detail 저장 실패, 요약 정보만 전달", job_id=job_id, error=str(e))
+    return detail
+
+
+def store_detail(bucket, job_id, mediaconvert_detail):
+    """전체 작업 detail을 분석 버킷에 저장하고 S3 URI 반환"""
+    key = f"{ANALYSIS_DETAIL_PREFIX}{job_id}.json"
+    clients.get_client('s3').put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(mediaconvert_detail).encode('utf-8'),
+        ContentType='application/json'
+    )
+    return f"s3://{bucket}/{key}"
+
+
+def load_detail(detail):
+    """분석 Lambda용 - 이벤트 Detail에서 전체 작업 detail 복원 (포함되어 있거나 S3 참조를 읽음)"""
+    if 'original_mediaconvert_detail' in detail:
+        return detail['original_mediaconvert_detail']
+    if not detail.get('detail_ref'):
+        return None
+    bucket, key = detail['detail_ref'][len('s3://'):].split('/', 1)
+    body = clients.get_client('s3').get_object(Bucket=bucket, Key=key)['Body'].read()
+    return json.loads(body)
+
+
+def _output_summaries(mediaconvert_detail, output_files):
+    """outputGroupDetails에서 출력별 경로/길이/해상도 추출"""
+    summaries = []
+    for group in mediaconvert_detail.get('outputGroupDetails', []):
+        for output in group.get('outputDetails', []):
+            video = output.get('videoDetails') or {}
+            for path in output.get('outputFilePaths', []):
+                summaries.append({
+                    'path': path,
+                    'duration_ms': output.get('durationInMs'),
+                    'width': video.get('widthInPx'),
+                    'height': video.get('heightInPx')
+                })
+    if summaries:
+        return summaries
+    # 변환 없이 복사한 경우 입력 분석 결과의 길이/해상도 사용
+    probe = mediaconvert_detail.get('probe') or {}
+    duration_ms = int(probe['duration'] * 1000) if probe.get('duration') else None
+    return [
+        {'path': path, 'duration_ms': duration_ms, 'width': probe.get('width'), 'height': probe.get('height')}
+        for path in output_files
+    ]
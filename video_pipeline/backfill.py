@@ -0,0 +1,227 @@
+"""
+기존 입력 버킷 일괄 변환 (backfill)
+
+입력 버킷과 출력 버킷의 출력 접두사(OUTPUT_PREFIX)를 병렬로 나열해 아직 변환되지 않은 동영상을 찾고,
+S3 업로드 이벤트와 같은 형식의 배치 이벤트로 만들어 변환 Lambda 핸들러에 그대로 전달합니다.
+작업 설정/중복 제거/속도 제한/작업 상태 기록은 Lambda와 같은 코드를 사용합니다.
+
+사용 예:
+    python -m video_pipeline.backfill --input-bucket my-input --output-bucket my-output --dry-run
+    python -m video_pipeline.backfill --input-bucket my-input --output-bucket my-output \\
+        --checkpoint backfill.json --workers 20 --tps 15
+"""
+import argparse
+import importlib
+import json
+import os
+import posixpath
+import sys
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from video_pipeline import output_layout
+
+# 접두사 하나를 나누어 병렬로 나열할 깊이 (구분자 '/' 기준)
+LISTING_FAN_OUT_DEPTH = 2
+
+
+def list_keys(s3, bucket, prefix='', workers=16):
+    """
+    버킷 접두사 아래 모든 객체를 {키: (ETag, 크기)}로 반환
+    '/' 구분자로 하위 접두사를 찾아 접두사별 페이지 나열을 스레드 풀에서 동시에 실행합니다.
+    """
+    objects = {}
+    prefixes = [prefix]
+    # 상위 몇 단계는 구분자로 나열하여 병렬로 나눌 접두사 수집
+    for _ in range(LISTING_FAN_OUT_DEPTH):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda p: _list_level(s3, bucket, p), prefixes))
+        prefixes = []
+        for level_objects, common_prefixes in results:
+            objects.update(level_objects)
+            prefixes.extend(common_prefixes)
+        if not prefixes:
+            break
+    # 남은 하위 접두사는 구분자 없이 끝까지 나열
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for leaf_objects in executor.map(lambda p: _list_all(s3, bucket, p), prefixes):
+            objects.update(leaf_objects)
+    return objects
+
+
+def _list_level(s3, bucket, prefix):
+    objects, prefixes = {}, []
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+        objects.update((o['Key'], (o.get('ETag'), o.get('Size'))) for o in page.get('Contents', []))
+        prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+    return objects, prefixes
+
+
+def _list_all(s3, bucket, prefix):
+    objects = {}
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        objects.update((o['Key'], (o.get('ETag'), o.get('Size'))) for o in page.get('Contents', []))
+    return objects
+
+
+def converted_names(output_keys, name_modifiers):
+    """출력 키(<출력 접두사>/<입력 파일명><NameModifier>.mp4)에서 입력 파일명 집합 추출"""
+    names = set()
+    for key in output_keys:
+        stem = posixpath.splitext(posixpath.basename(key))[0]
+        for modifier in name_modifiers:
+            if stem.endswith(modifier):
+                names.add(stem[:-len(modifier)])
+    return names
+
+
+def find_missing(input_bucket, input_objects, output_keys, supported_formats, name_modifiers, reconvert=False,
+                 layout=None):
+    """
+    변환 대상 형식이면서 출력이 없는 입력 키 목록 (정렬됨 - 체크포인트 재개에 사용)
+    flat/hash/mirror 방식은 입력마다 예상 출력 키를 계산해 확인하고 (다른 디렉터리의 같은 이름 파일과 구분),
+    date 방식은 출력 위치가 변환 날짜에 따라 달라 계산할 수 없으므로 파일명으로만 확인합니다.
+    """
+    layout = layout or output_layout.OUTPUT_KEY_LAYOUT
+    candidates = [key for key in input_objects if posixpath.splitext(key.lower())[1] in supported_formats]
+    if reconvert:
+        return sorted(candidates)
+    if layout == 'date':
+        done = converted_names(output_keys, name_modifiers)
+        return sorted(key for key in candidates if output_layout.input_name(key) not in done)
+    return sorted(key for key in candidates if not any(
+        output_layout.output_key(output_layout.output_prefix(input_bucket, key, layout), key, modifier) in output_keys
+        for modifier in name_modifiers
+    ))
+
+
+def upload_event(bucket, key, etag, size):
+    """S3 'Object Created' EventBridge 이벤트 형식 (키는 EventBridge처럼 URL 인코딩)"""
+    return {
+        'source': 'aws.s3',
+        'detail-type': 'Object Created',
+        'detail': {
+            'bucket': {'name': bucket},
+            'object': {'key': urllib.parse.quote_plus(key, safe='/'), 'size': size, 'etag': etag},
+            'reason': 'Backfill'
+        }
+    }
+
+
+def batch_event(bucket, keys, input_objects):
+    """핸들러 배치 모드 입력 (SQS 레코드 형식, 메시지 ID = 입력 키)"""
+    return {'Records': [{
+        'messageId': key,
+        'eventSource': 'aws:sqs',
+        'body': json.dumps(upload_event(bucket, key, *input_objects[key]))
+    } for key in keys]}
+
+
+class Checkpoint:
+    """
+    재개용 체크포인트 파일 - 정렬된 대상 목록에서 처리 완료한 마지막 키와 실패한 키를 기록
+    배치 단위로 원자적으로 다시 씁니다 (임시 파일 후 이름 변경).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {'last_key': None, 'failed': [], 'submitted': 0}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.state.update(json.load(f))
+
+    def pending(self, keys):
+        """아직 처리하지 않은 키 + 이전 실행에서 실패한 키"""
+        last_key = self.state['last_key']
+        targets = set(keys)
+        retry = [key for key in self.state['failed'] if key in targets]
+        return retry + [key for key in keys if last_key is None or key > last_key]
+
+    def save(self, batch_keys, failed):
+        state = self.state
+        failed = set(failed)
+        batch_keys = set(batch_keys)
+        state['failed'] = [key for key in state['failed'] if key not in batch_keys or key in failed]
+        state['failed'].extend(key for key in batch_keys if key in failed and key not in state['failed'])
+        state['submitted'] += len(batch_keys) - len(failed)
+        state['last_key'] = max([state['last_key'] or ''] + list(batch_keys))
+        if self.path:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.path)
+
+
+def run(args):
+    # 동시성/속도 제한 설정은 모듈 임포트 시 읽히므로 핸들러를 불러오기 전에 환경 변수로 지정
+    os.environ['OUTPUT_BUCKET'] = args.output_bucket
+    os.environ['BATCH_MAX_WORKERS'] = str(args.workers)
+    if args.tps:
+        os.environ['CREATE_JOB_TPS'] = str(args.tps)
+    if args.role:
+        os.environ['MEDIACONVERT_ROLE_ARN'] = args.role
+    from video_pipeline import clients, log, renditions
+    handler = importlib.import_module(args.handler)
+
+    s3 = clients.get_client('s3')
+    started = time.time()
+    input_objects = list_keys(s3, args.input_bucket, args.prefix, args.list_workers)
+    # 출력 키 배치 방식(OUTPUT_KEY_LAYOUT)과 관계없이 파일명은 입력 파일명 + NameModifier
+    output_keys = list_keys(s3, args.output_bucket, output_layout.OUTPUT_PREFIX, args.list_workers)
+    modifiers = {handler.JOB_PROFILE.name_modifier} | {f"_{rung}" for rung in renditions.RENDITIONS}
+    missing = find_missing(args.input_bucket, input_objects, output_keys, handler.SUPPORTED_VIDEO_FORMATS, modifiers,
+                           args.reconvert)
+    log.info("🔎 일괄 변환 대상 확인", inputs=len(input_objects), outputs=len(output_keys), missing=len(missing),
+             listing_seconds=round(time.time() - started, 1))
+
+    checkpoint = Checkpoint(args.checkpoint)
+    pending = checkpoint.pending(missing)
+    if args.limit:
+        pending = pending[:args.limit]
+    if args.dry_run:
+        for key in pending[:args.show]:
+            print(key)
+        print(json.dumps({'inputs': len(input_objects), 'missing': len(missing), 'pending': len(pending)}))
+        return 0
+
+    failed_total = 0
+    for start in range(0, len(pending), args.batch_size):
+        keys = pending[start:start + args.batch_size]
+        response = handler.lambda_handler(batch_event(args.input_bucket, keys, input_objects), None)
+        failed = [item['itemIdentifier'] for item in response.get('batchItemFailures', [])]
+        failed_total += len(failed)
+        checkpoint.save(keys, failed)
+        log.info("📦 일괄 변환 진행", done=start + len(keys), total=len(pending), failed=len(failed))
+
+    print(json.dumps({'submitted': len(pending) - failed_total, 'failed': failed_total,
+                      'elapsed_seconds': round(time.time() - started, 1)}))
+    return 1 if failed_total else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='입력 버킷의 변환되지 않은 동영상 일괄 변환')
+    parser.add_argument('--input-bucket', required=True)
+    parser.add_argument('--output-bucket', required=True)
+    parser.add_argument('--prefix', default='', help='입력 버킷에서 대상으로 삼을 접두사')
+    parser.add_argument('--role', help='MediaConvert 서비스 역할 ARN (기본값: MEDIACONVERT_ROLE_ARN 환경 변수)')
+    parser.add_argument('--handler', default='lambda_function',
+                        choices=['lambda_function', 'enhanced_lambda_function', 'optimized_lambda_function'])
+    parser.add_argument('--checkpoint', help='재개용 체크포인트 파일 경로')
+    parser.add_argument('--reconvert', action='store_true', help='출력 유무와 관계없이 모두 다시 변환 (프로파일 변경 시)')
+    parser.add_argument('--dry-run', action='store_true', help='제출하지 않고 대상만 출력')
+    parser.add_argument('--show', type=int, default=20, help='--dry-run 시 출력할 대상 키 수')
+    parser.add_argument('--limit', type=int, help='이번 실행에서 처리할 최대 개수')
+    parser.add_argument('--batch-size', type=int, default=100, help='핸들러 호출 한 번에 담을 객체 수')
+    parser.add_argument('--workers', type=int, default=10, help='동시에 제출할 작업 수 (BATCH_MAX_WORKERS)')
+    parser.add_argument('--tps', type=float, help='초당 CreateJob 호출 한도 (CREATE_JOB_TPS)')
+    parser.add_argument('--list-workers', type=int, default=16, help='병렬 나열 스레드 수')
+    args = parser.parse_args(argv)
+    # 역할이 없으면 핸들러의 자리 표시자 ARN으로 제출되어 모든 작업이 실패하므로 시작 전에 중단
+    if not args.dry_run and not (args.role or os.environ.get('MEDIACONVERT_ROLE_ARN')):
+        parser.error('--role 또는 MEDIACONVERT_ROLE_ARN 환경 변수가 필요합니다')
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
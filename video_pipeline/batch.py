@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from video_pipeline import log
+
+# 배치 처리 동시성 (MediaConvert 클라이언트 커넥션 풀 크기와 맞춤)
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '10'))
+
+# 워커 스레드가 처리 중인 레코드 ID
+_current = threading.local()
+
+
+def current_item():
+    """현재 스레드에서 처리 중인 배치 레코드 ID (배치 모드가 아니면 None)"""
+    return getattr(_current, 'item_id', None)
+
+
+class BatchFailed(Exception):
+    """SQS가 아닌 배치에서 실패한 레코드가 있음 - batchItemFailures를 읽지 않는 호출자는 예외로만 재시도"""
+
+
+def is_batch_event(event):
+    """SQS 래핑 또는 다중 레코드 이벤트인지 확인"""
+    return isinstance(event, dict) and isinstance(event.get('Records'), list)
+
+
+def is_sqs_event(event):
+    """모든 레코드가 SQS 메시지인지 확인 (batchItemFailures 응답은 SQS 이벤트 소스 매핑만 읽음)"""
+    records = event.get('Records') or []
+    return bool(records) and all(record.get('eventSource') == 'aws:sqs' for record in records)
+
+
+def is_known_event(event):
+    """변환 핸들러가 처리할 수 있는 이벤트인지 확인 (S3 업로드 / MediaConvert 상태 변경)"""
+    detail = event.get('detail') if isinstance(event, dict) else None
+    if not isinstance(detail, dict):
+        return False
+    if event.get('source') == 'aws.mediaconvert':
+        return 'jobId' in detail and 'status' in detail
+    return 'bucket' in detail and 'object' in detail
+
+
+def extract_records(event):
+    """배치 이벤트를 (item_id, EventBridge 형식 이벤트 목록) 쌍의 리스트로 변환"""
+    items = []
+    for index, record in enumerate(event.get('Records', [])):
+        if record.get('eventSource') == 'aws:sqs':
+            item_id = record['messageId']
+            try:
+                body = json.loads(record['body'])
+                events = _unwrap_body(body)
+            except (ValueError, KeyError, TypeError) as e:
+                # 파싱 불가 메시지는 실패로 보고하여 DLQ로 이동하도록 함
+                items.append((item_id, e))
+                continue
+        else:
+            item_id = record.get('s3', {}).get('object', {}).get('sequencer') or str(index)
+            events = _unwrap_body(record)
+        items.append((item_id, events))
+    return items
+
+
+def _unwrap_body(body):
+    """SQS 메시지 본문 / S3 알림 레코드를 EventBridge 형식 이벤트 목록으로 변환"""
+    if 'detail' in body:
+        # EventBridge → SQS 타겟으로 전달된 이벤트
+        return [body]
+    if 'Records' in body:
+        # S3 → SQS 직접 알림 (한 메시지에 여러 레코드 가능)
+        return [s3_record_to_eventbridge(r) for r in body['Records']]
+    if 's3' in body:
+        return [s3_record_to_eventbridge(body)]
+    if body.get('Event') == 's3:TestEvent':
+        return []
+    raise ValueError(f"지원하지 않는 레코드 형식: {list(body)}")
+
+
+def s3_record_to_eventbridge(record):
+    """S3 알림 레코드를 EventBridge 'Object Created' 이벤트 형식으로 변환"""
+    s3 = record['s3']
+    obj = s3['object']
+    return {
+        'source': 'aws.s3',
+        'detail-type': 'Object Created',
+        'detail': {
+            'bucket': {'name': s3['bucket']['name']},
+            'object': {
+                'key': obj['key'],
+                'size': obj.get('size'),
+                'etag': obj.get('eTag'),
+                'version-id': obj.get('versionId'),
+                'sequencer': obj.get('sequencer'),
+            },
+        },
+    }
+
+
+def process_batch(items, worker, max_workers=None, finalize=None, sqs=True):
+    """
+    레코드들을 제한된 스레드 풀에서 병렬 처리하고 batchItemFailures 응답을 반환
+    worker(event)가 예외를 던지면 해당 레코드만 실패로 보고됩니다.
+    finalize()는 모든 레코드 처리 후 호출되며, 추가로 실패 처리할 레코드 ID 목록을 반환합니다.
+    sqs가 아니면(S3 비동기 호출 등) 응답의 batchItemFailures가 무시되므로 실패한 레코드가 있으면 BatchFailed를 던져
+    호출 전체를 재시도하게 합니다 (성공한 레코드는 멱등성 기록으로 다시 제출되지 않음).
+    처리할 수 없는 형식의 이벤트는 재시도해도 같은 결과이므로 실패로 보고하지 않고 건너뜁니다.
+    """
+    failures = []
+    jobs = []
+    for item_id, events in items:
+        if isinstance(events, Exception):
+            log.error("❌ 레코드 파싱 실패", item_id=item_id, error=str(events))
+            failures.append(item_id)
+        else:
+            jobs.append((item_id, events))
+
+    def run(item):
+        item_id, events = item
+        _current.item_id = item_id
+        try:
+            with log.bind(item_id=item_id):
+                for event in events:
+                    if not is_known_event(event):
+                        log.warning("⚠️ 처리할 수 없는 이벤트 건너뜀", source=event.get('source'),
+                                    detail_type=event.get('detail-type'))
+                        continue
+                    worker(event)
+        finally:
+            _current.item_id = None
+        return item_id
+
+    if jobs:
+        workers = max(1, min(max_workers or BATCH_MAX_WORKERS, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(item[0], executor.submit(run, item)) for item in jobs]
+            for item_id, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    log.error("❌ 레코드 처리 실패", item_id=item_id, error=str(e))
+                    failures.append(item_id)
+
+    if finalize is not None:
+        for item_id in finalize():
+            if item_id is not None and item_id not in failures:
+                failures.append(item_id)
+
+    log.info("📦 배치 처리 완료", succeeded=len(items) - len(failures), total=len(items))
+    if failures and not sqs:
+        raise BatchFailed(f"배치 레코드 {len(failures)}/{len(items)}개 처리 실패: {failures}")
+    return {
+        'batchItemFailures': [{'itemIdentifier': item_id} for item_id in failures]
+    }
@@ -0,0 +1,284 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from video_pipeline import clients, log, metrics, rate_limit, renditions
+
+# 사전 비용 추정과 예산 기반 제출 제어 - 대용량/고화질 영상이 한꺼번에 올라와도
+# 설정한 기간 예산을 넘는 작업은 미루거나(defer) 화질을 낮추거나(downgrade) 거부(reject)하여 일반 트래픽 처리량을 보호합니다.
+# 기간(COST_BUDGET_WINDOW_SECONDS) 동안 제출한 작업의 예상 비용 합계 한도 (USD, 0이면 사용 안 함)
+COST_BUDGET_USD = float(os.environ.get('COST_BUDGET_USD', '0'))
+COST_BUDGET_WINDOW_SECONDS = int(os.environ.get('COST_BUDGET_WINDOW_SECONDS', '3600'))
+# 작업 하나의 예상 비용 한도 (USD, 0이면 사용 안 함) - 기간 예산과 관계없이 적용
+COST_MAX_JOB_USD = float(os.environ.get('COST_MAX_JOB_USD', '0'))
+# 한도 초과 시 동작: defer(지연 큐로 다시 넣음) / downgrade(가장 낮은 렌디션만, 가속 없이) / reject(제출하지 않음)
+COST_BUDGET_ACTION = os.environ.get('COST_BUDGET_ACTION', 'defer')
+# 지정하면 실행 환경 간에 지출 기간 합계를 공유하도록 DynamoDB 테이블 사용
+COST_BUDGET_TABLE = os.environ.get('COST_BUDGET_TABLE')
+COST_BUDGET_CACHE_SECONDS = float(os.environ.get('COST_BUDGET_CACHE_SECONDS', '15'))
+# 입력 분석으로 길이를 모를 때 크기에서 길이를 추정할 입력 비트레이트 (bps)
+COST_ASSUMED_INPUT_BITRATE = int(os.environ.get('COST_ASSUMED_INPUT_BITRATE', '8000000'))
+
+# 대략적인 온디맨드 요금 (USD, 출력 1분당) - 리전/계약에 맞게 COST_PRICE_PER_MINUTE(JSON)로 덮어쓰기
+PRICE_PER_MINUTE = dict(
+    {'480p': 0.0075, '720p': 0.015, '1080p': 0.015, 'passthrough': 0.0075},
+    **json.loads(os.environ.get('COST_PRICE_PER_MINUTE', '{}'))
+)
+ACCELERATED_PRICE_MULTIPLIER = float(os.environ.get('COST_ACCELERATED_MULTIPLIER', '2.0'))
+
+BUDGET_ACTIONS = ('defer', 'downgrade', 'reject')
+if COST_BUDGET_ACTION not in BUDGET_ACTIONS:
+    raise ValueError(f"알 수 없는 예산 초과 동작: {COST_BUDGET_ACTION}")
+# 지연 큐 없이 defer하면 직접(비동기) 호출 이벤트는 Lambda 재시도가 끝나는 대로 버려지므로 그 경로에서만 거부로 바꿈
+# (SQS 배치/워커 레코드는 실패로 보고하면 SQS 재전달이 지연 역할을 하므로 그대로 BudgetDeferred)
+DEFER_FALLBACK = COST_BUDGET_ACTION == 'defer' and not rate_limit.DEFERRAL_QUEUE_URL
+if DEFER_FALLBACK and COST_BUDGET_USD:
+    log.warning("⚠️ DEFERRAL_QUEUE_URL이 없어 직접 호출 이벤트는 예산 초과 시 defer 대신 reject", budget=COST_BUDGET_USD)
+
+# 기간을 나누는 칸 수 (DynamoDB 저장소는 칸마다 항목 하나에 합계 누적)
+WINDOW_SLOTS = 12
+
+
+class BudgetDeferred(rate_limit.SubmissionDeferred):
+    """예산 초과로 제출을 미룸 - 스로틀과 같은 지연 큐/재시도 경로로 처리"""
+
+
+class BudgetRejected(Exception):
+    """예산 초과로 제출하지 않음 - 재시도해도 같은 결과이므로 실패로 보고하지 않음"""
+
+
+def estimate(profile, size=None, probe_info=None, rungs=None, action='transcode', acceleration_mode=None):
+    """
+    작업 하나의 예상 MediaConvert 출력 분(minutes), 비용(USD), 출력 크기(바이트)
+    길이는 입력 분석 결과를 쓰고, 모르면 객체 크기와 COST_ASSUMED_INPUT_BITRATE로 추정합니다 (둘 다 없으면 0).
+    """
+    duration = (probe_info or {}).get('duration')
+    if not duration and size:
+        duration = size * 8 / COST_ASSUMED_INPUT_BITRATE
+    minutes = (duration or 0) / 60
+    rungs = tuple(rungs or profile.base_rungs)
+
+    if action == 'remux':
+        # 재인코딩 없이 다시 담으므로 출력은 하나, 크기는 입력과 비슷
+        price = PRICE_PER_MINUTE['passthrough']
+        output_bytes = size or 0
+    else:
+        price = sum(PRICE_PER_MINUTE[rung] for rung in rungs)
+        if acceleration_mode in ('PREFERRED', 'ENABLED'):
+            price *= ACCELERATED_PRICE_MULTIPLIER
+        bitrate = sum(
+            profile.max_bitrate if rung in profile.base_rungs else renditions.RENDITIONS[rung]['bitrate']
+            for rung in rungs
+        )
+        output_bytes = int((duration or 0) * bitrate / 8)
+    return {'minutes': round(minutes, 2), 'cost': round(minutes * price, 4), 'output_bytes': output_bytes}
+
+
+class MemorySpendWindow:
+    """실행 환경 안의 지출 기록 (시각, 금액) - 기간이 지난 기록은 합계 계산 시 제거"""
+
+    def __init__(self, window_seconds=COST_BUDGET_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self._entries = deque()
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, cost, now=None):
+        with self._lock:
+            self._entries.append((now or time.time(), cost))
+            self._total += cost
+
+    def try_reserve(self, cost, budget, at):
+        """기간 합계에 cost를 더해도 budget 이하이면 기록하고 True (확인과 기록을 한 잠금 안에서)"""
+        with self._lock:
+            self._expire(at)
+            if self._total + cost > budget:
+                return False
+            self._entries.append((at, cost))
+            self._total += cost
+            return True
+
+    def release(self, cost, at):
+        """add(cost, at)로 더한 기록 취소 (이미 기간이 지나 제거되었으면 무시)"""
+        with self._lock:
+            try:
+                self._entries.remove((at, cost))
+            except ValueError:
+                return
+            self._total -= cost
+
+    def total(self, now=None):
+        with self._lock:
+            self._expire(now or time.time())
+            return max(0.0, self._total)
+
+    def _expire(self, now):
+        cutoff = now - self.window_seconds
+        while self._entries and self._entries[0][0] <= cutoff:
+            self._total -= self._entries.popleft()[1]
+
+
+class DynamoDBSpendWindow:
+    """
+    DynamoDB 테이블 지출 기록 (파티션 키: budget_key, TTL 속성: expires_at)
+    기간을 WINDOW_SLOTS칸으로 나눠 칸마다 ADD로 합계를 누적하고, 합계는 최근 칸들을 한 번에 읽어 계산합니다.
+    읽은 합계는 COST_BUDGET_CACHE_SECONDS 동안 재사용하고 그 사이 이 실행 환경의 지출만 더합니다.
+    try_reserve는 이 실행 환경의 스레드끼리만 직렬화하므로, 다른 실행 환경의 지출은 캐시 주기만큼 늦게 반영됩니다.
+    """
+
+    def __init__(self, table_name, window_seconds=COST_BUDGET_WINDOW_SECONDS, client=None):
+        self.table_name = table_name
+        self.window_seconds = window_seconds
+        self.slot_seconds = max(1, window_seconds // WINDOW_SLOTS)
+        self._client = client
+        self._cached = None
+        self._lock = threading.Lock()
+        self._reserve_lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self._client or clients.get_client('dynamodb')
+
+    def _slot(self, at):
+        return int(at // self.slot_seconds) * self.slot_seconds
+
+    def add(self, cost, now=None):
+        now = now or time.time()
+        slot = self._slot(now)
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={'budget_key': {'S': f"spend#{slot}"}},
+            UpdateExpression='ADD spend :cost SET expires_at = :expires_at',
+            ExpressionAttributeValues={
+                ':cost': {'N': str(cost)},
+                ':expires_at': {'N': str(int(slot + self.window_seconds + self.slot_seconds))}
+            }
+        )
+        with self._lock:
+            if self._cached is not None:
+                self._cached = (self._cached[0], self._cached[1] + cost)
+
+    def try_reserve(self, cost, budget, at):
+        """기간 합계에 cost를 더해도 budget 이하이면 기록하고 True"""
+        with self._reserve_lock:
+            if self.total(at) + cost > budget:
+                return False
+            self.add(cost, at)
+            return True
+
+    def release(self, cost, at):
+        """add(cost, at)로 더한 금액을 같은 칸에서 빼서 취소"""
+        self.add(-cost, at)
+
+    def total(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            if self._cached is not None and now - self._cached[0] < COST_BUDGET_CACHE_SECONDS:
+                return self._cached[1]
+        # 현재 칸 포함 기간을 덮는 칸들 (가장 오래된 칸은 일부만 기간에 걸치지만 보수적으로 포함)
+        first = self._slot(now - self.window_seconds)
+        keys = [{'budget_key': {'S': f"spend#{slot}"}}
+                for slot in range(first, self._slot(now) + 1, self.slot_seconds)]
+        total = 0.0
+        request = {self.table_name: {'Keys': keys, 'ProjectionExpression': 'spend'}}
+        while request:
+            response = self.client.batch_get_item(RequestItems=request)
+            total += sum(float(item['spend']['N']) for item in response['Responses'].get(self.table_name, []))
+            request = response.get('UnprocessedKeys') or None
+        with self._lock:
+            self._cached = (now, total)
+        return total
+
+
+def _default_window():
+    if COST_BUDGET_TABLE:
+        return DynamoDBSpendWindow(COST_BUDGET_TABLE)
+    return MemorySpendWindow()
+
+
+window = _default_window()
+
+
+def downgrade(rungs, tuning):
+    """가장 낮은 렌디션 하나만, 가속 없이 변환하도록 낮춘 (rungs, tuning)"""
+    return tuple(rungs)[:1], dict(tuning, mode='DISABLED', queue=None)
+
+
+def admit(profile, size, probe_info, rungs, action, tuning):
+    """
+    예상 비용으로 제출 여부 결정 - 허용되면 예산 확인과 같은 잠금 안에서 예상 비용을 지출 기간에 더해
+    동시 제출이 함께 한도를 넘지 않게 함
+    반환값: (rungs, tuning, estimate) - downgrade면 낮춘 설정, estimate['decision']은 allow/downgrade
+    제출에 실패하면 release(estimate)로 예약한 비용을 돌려줘야 합니다.
+    한도를 넘으면 BudgetDeferred/BudgetRejected를 던집니다.
+    작업 하나의 한도(COST_MAX_JOB_USD)는 기다려도 달라지지 않으므로 defer 대신 거부하고,
+    기간 예산은 낮춰도 넘으면 defer합니다.
+    """
+    cost = estimate(profile, size, probe_info, rungs, action, tuning['mode'])
+    metrics.record('EstimatedMinutes', cost['minutes'], 'None')
+    metrics.record('EstimatedCost', cost['cost'], 'None')
+    if not COST_BUDGET_USD and not COST_MAX_JOB_USD:
+        return rungs, tuning, dict(cost, decision='allow')
+
+    if _over_job_limit(cost['cost']):
+        decision = 'downgrade' if COST_BUDGET_ACTION == 'downgrade' else 'reject'
+    else:
+        decision = 'allow' if _reserve(cost) else COST_BUDGET_ACTION
+    if decision == 'downgrade':
+        rungs, tuning = downgrade(rungs, tuning)
+        cost = estimate(profile, size, probe_info, rungs, action, tuning['mode'])
+        if _over_job_limit(cost['cost']):
+            decision = 'reject'
+        elif not _reserve(cost):
+            decision = 'defer'
+
+    metrics.count('BudgetDecisions', Decision=decision)
+    spent = round(window.total(), 2) if COST_BUDGET_USD else 0.0
+    if decision in ('allow', 'downgrade'):
+        if decision == 'downgrade':
+            log.warning("💸 예산 초과로 화질/가속 하향", estimated_cost=cost['cost'], spent=spent,
+                        budget=COST_BUDGET_USD, renditions=rungs)
+        return rungs, tuning, dict(cost, decision=decision, reserved_at=cost.get('reserved_at'))
+
+    log.warning("💸 예산 초과", decision=decision, estimated_cost=cost['cost'], estimated_minutes=cost['minutes'],
+                spent=spent, budget=COST_BUDGET_USD, max_job_cost=COST_MAX_JOB_USD)
+    if decision == 'reject':
+        raise BudgetRejected(f"예상 비용 ${cost['cost']}이 예산 한도를 넘어 제출하지 않음")
+    raise BudgetDeferred(f"예상 비용 ${cost['cost']}이 예산 한도를 넘어 제출을 미룸")
+
+
+def rejected_instead(error):
+    """
+    직접(비동기) 호출 경로에서 지연 큐 없이 미뤄진 예산 초과를 거부로 바꾼 BudgetRejected (해당하지 않으면 None)
+    SQS 배치/워커 경로는 BudgetDeferred를 그대로 실패로 보고해 SQS 재전달로 미룹니다.
+    """
+    if DEFER_FALLBACK and isinstance(error, BudgetDeferred):
+        return BudgetRejected(f"{error} (지연 큐가 없어 defer 대신 거부)")
+    return None
+
+
+def release(estimate):
+    """
+    제출하지 못한 작업(스로틀로 지연, 제출 실패)의 예약 비용을 지출 기간에서 돌려줌
+    admit이 기간에 더하지 않은 경우(예산 사용 안 함, estimate 없음)는 아무것도 하지 않습니다.
+    """
+    if estimate and estimate.get('reserved_at'):
+        window.release(estimate['cost'], estimate['reserved_at'])
+        estimate['reserved_at'] = None
+
+
+def _over_job_limit(cost):
+    return bool(COST_MAX_JOB_USD) and cost > COST_MAX_JOB_USD
+
+
+def _reserve(cost):
+    """기간 예산 안이면 예상 비용을 지출 기간에 예약하고 cost['reserved_at']에 시각 기록 (예산 사용 안 하면 항상 True)"""
+    if not COST_BUDGET_USD:
+        return True
+    at = time.time()
+    if not window.try_reserve(cost['cost'], COST_BUDGET_USD, at):
+        return False
+    cost['reserved_at'] = at
+    return True
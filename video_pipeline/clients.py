@@ -0,0 +1,75 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+# 커넥션 풀 크기는 배치 동시성에 맞춤 (풀이 작으면 스레드들이 커넥션을 기다림)
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', os.environ.get('BATCH_MAX_WORKERS', '10')))
+MAX_RETRY_ATTEMPTS = int(os.environ.get('AWS_MAX_RETRY_ATTEMPTS', '5'))
+# MediaConvert 스로틀은 rate_limit의 토큰 버킷과 바깥쪽 재시도가 처리하므로 botocore 재시도는 일시 오류용으로만 짧게 (첫 호출 포함 횟수)
+MEDIACONVERT_MAX_RETRY_ATTEMPTS = int(os.environ.get('MEDIACONVERT_MAX_RETRY_ATTEMPTS', '2'))
+
+# 모든 클라이언트가 공유하는 botocore 설정
+CLIENT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=30,
+    retries={'mode': 'adaptive', 'max_attempts': MAX_RETRY_ATTEMPTS},
+)
+
+# 서비스별 설정 - MediaConvert는 클라이언트 쪽 속도 제한기가 둘이 되지 않도록 adaptive 대신 standard 모드
+# (스로틀 한 번에 최대 SUBMIT_MAX_ATTEMPTS × MEDIACONVERT_MAX_RETRY_ATTEMPTS번 호출)
+SERVICE_CONFIGS = {
+    'mediaconvert': CLIENT_CONFIG.merge(Config(
+        retries={'mode': 'standard', 'total_max_attempts': MEDIACONVERT_MAX_RETRY_ATTEMPTS}
+    )),
+}
+
+# (서비스, 리전, 엔드포인트)별 클라이언트 캐시
+_clients = {}
+_session = None
+_lock = threading.RLock()
+
+
+def current_region():
+    """현재 실행 리전 반환"""
+    return os.environ.get('AWS_REGION') or _get_session().region_name
+
+
+def get_client(service, region=None, endpoint_url=None):
+    """
+    boto3 클라이언트를 처음 사용할 때 생성하고 재사용
+    클라이언트는 스레드 안전하므로 배치 워커들이 함께 사용합니다.
+    """
+    key = (service, region, endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        # 세션에서 클라이언트를 만드는 과정은 스레드 안전하지 않으므로 잠금
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _get_session().client(
+                    service,
+                    region_name=region,
+                    endpoint_url=endpoint_url,
+                    config=SERVICE_CONFIGS.get(service, CLIENT_CONFIG),
+                )
+                _clients[key] = client
+    return client
+
+
+def discard_client(service, region=None, endpoint_url=None):
+    """캐시된 클라이언트 제거"""
+    with _lock:
+        _clients.pop((service, region, endpoint_url), None)
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session()
+    return _session
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+
+from botocore.exceptions import ClientError
+
+from video_pipeline import clients, log
+
+CONVERSION_CACHE_ENABLED = os.environ.get('CONVERSION_CACHE_ENABLED', 'true').lower() == 'true'
+# 출력 버킷 수명 주기와 맞춰야 함 - 출력이 지워진 뒤에는 캐시 항목도 의미가 없음
+CONVERSION_CACHE_TTL_SECONDS = int(os.environ.get('CONVERSION_CACHE_TTL_DAYS', '30')) * 24 * 3600
+CONVERSION_CACHE_SIZE = int(os.environ.get('CONVERSION_CACHE_SIZE', '1000'))
+# 지정하면 실행 환경 간에 캐시를 공유하도록 DynamoDB 테이블 사용
+CONVERSION_CACHE_TABLE = os.environ.get('CONVERSION_CACHE_TABLE')
+
+
+def fingerprint(object_info, profile, ladder):
+    """원본 내용(ETag + 크기)과 변환 설정(프로파일 해시 + 사다리)으로 캐시 키 생성"""
+    if not CONVERSION_CACHE_ENABLED or not object_info or not object_info.get('etag'):
+        return None
+    etag = object_info['etag'].strip('"')
+    raw = f"{etag}:{object_info.get('size')}:{profile.digest}:{ladder}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class MemoryConversionCache:
+    """TTL이 있는 LRU 캐시 (실행 환경 내부)"""
+
+    def __init__(self, max_size=CONVERSION_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry['expires_at'] < time.time():
+                self._items.pop(key, None)
+                return None
+            self._items.move_to_end(key)
+            return entry
+
+    def put(self, key, input_name, outputs):
+        with self._lock:
+            self._items[key] = {
+                'input_name': input_name,
+                'outputs': list(outputs),
+                'expires_at': time.time() + CONVERSION_CACHE_TTL_SECONDS
+            }
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def evict(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class DynamoDBConversionCache:
+    """DynamoDB 테이블 캐시 (파티션 키: fingerprint, TTL 속성: expires_at)"""
+
+    def __init__(self, table_name, client=None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or clients.get_client('dynamodb')
+
+    def get(self, key):
+        item = self.client.get_item(TableName=self.table_name, Key={'fingerprint': {'S': key}}).get('Item')
+        if not item or float(item['expires_at']['N']) < time.time():
+            return None
+        return {
+            'input_name': item['input_name']['S'],
+            'outputs': item['outputs']['SS'],
+            'expires_at': float(item['expires_at']['N'])
+        }
+
+    def put(self, key, input_name, outputs):
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'fingerprint': {'S': key},
+                'input_name': {'S': input_name},
+                'outputs': {'SS': list(outputs)},
+                'expires_at': {'N': str(int(time.time() + CONVERSION_CACHE_TTL_SECONDS))}
+            }
+        )
+
+    def evict(self, key):
+        self.client.delete_item(TableName=self.table_name, Key={'fingerprint': {'S': key}})
+
+
+class LayeredConversionCache:
+    """메모리 캐시를 앞에 두고 테이블에서 최종 조회"""
+
+    def __init__(self, memory, durable):
+        self.memory = memory
+        self.durable = durable
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is None:
+            entry = self.durable.get(key)
+            if entry is not None:
+                self.memory.put(key, entry['input_name'], entry['outputs'])
+        return entry
+
+    def put(self, key, input_name, outputs):
+        self.durable.put(key, input_name, outputs)
+        self.memory.put(key, input_name, outputs)
+
+    def evict(self, key):
+        self.memory.evict(key)
+        self.durable.evict(key)
+
+
+def _default_cache():
+    memory = MemoryConversionCache()
+    if CONVERSION_CACHE_TABLE:
+        return LayeredConversionCache(memory, DynamoDBConversionCache(CONVERSION_CACHE_TABLE))
+    return memory
+
+
+cache = _default_cache()
+
+
+def job_metadata(key, input_name):
+    """작업 UserMetadata에 넣을 캐시 정보 (완료 이벤트에서 다시 읽음)"""
+    if not key:
+        return {}
+    return {'ContentFingerprint': key, 'InputName': input_name}
+
+
+def record_job(detail, output_files):
+    """MediaConvert 완료 이벤트의 출력들을 캐시에 기록"""
+    metadata = detail.get('userMetadata') or {}
+    key = metadata.get('ContentFingerprint')
+    if not key or not output_files:
+        return
+    try:
+        cache.put(key, metadata['InputName'], output_files)
+        log.info("🗂️ 변환 캐시 기록", fingerprint=key, outputs=len(output_files))
+    except Exception as e:
+        log.warning("⚠️ 변환 캐시 기록 실패", fingerprint=key, error=str(e))
+
+
+def reuse(key, output_bucket, output_prefix, input_name):
+    """
+    같은 내용이 이미 변환되어 있으면 기존 출력을 새 위치로 서버 측 복사
+    캐시 미스이거나 기존 출력이 지워졌으면 None 반환 (지워진 경우 캐시 항목 제거)
+    """
+    if not key:
+        return None
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        log.warning("⚠️ 변환 캐시 조회 실패", fingerprint=key, error=str(e))
+        return None
+    if entry is None:
+        return None
+
+    s3 = clients.get_client('s3')
+    copied = []
+    for source_uri in entry['outputs']:
+        source_bucket, source_key = source_uri[len('s3://'):].split('/', 1)
+        file_name = posixpath.basename(source_key)
+        if not file_name.startswith(entry['input_name']):
+            return None
+        # 출력 파일명 = 입력 파일명 + NameModifier + 확장자 이므로 입력 파일명 부분만 교체
+        target_key = f"{output_prefix}{input_name}{file_name[len(entry['input_name']):]}"
+        if (source_bucket, source_key) == (output_bucket, target_key):
+            # 같은 이름으로 다시 올라온 경우 출력이 이미 제자리에 있음
+            copied.append(source_uri)
+            continue
+        try:
+            s3.copy({'Bucket': source_bucket, 'Key': source_key}, output_bucket, target_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                log.info("🗑️ 캐시된 출력이 삭제되어 캐시 항목 제거", fingerprint=key, source=source_uri)
+                cache.evict(key)
+            else:
+                log.warning("⚠️ 캐시된 출력 복사 실패, 변환 진행", fingerprint=key, error=str(e))
+            return None
+        copied.append(f"s3://{output_bucket}/{target_key}")
+
+    log.info("⚡ 변환 캐시 적중, 기존 출력 복사", fingerprint=key, outputs=copied)
+    return copied
@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from video_pipeline import clients, log, metrics
+
+# 환경 변수로 엔드포인트를 지정하면 describe_endpoints 호출을 완전히 생략
+MEDIACONVERT_ENDPOINT_OVERRIDE = os.environ.get('MEDIACONVERT_ENDPOINT')
+# 같은 실행 환경의 재시작 사이에 조회 결과를 보존하는 파일 캐시
+ENDPOINT_CACHE_FILE = os.environ.get('MEDIACONVERT_ENDPOINT_CACHE', '/tmp/mediaconvert_endpoints.json')
+
+# 리전별 엔드포인트 캐시
+_endpoints = {}
+_lock = threading.Lock()
+
+
+def get_endpoint(region=None, refresh=False):
+    """
+    MediaConvert 엔드포인트 URL 반환
+    우선순위: 환경 변수 → 메모리 캐시 → /tmp 파일 캐시 → describe_endpoints
+    """
+    region = region or clients.current_region()
+    if MEDIACONVERT_ENDPOINT_OVERRIDE and not refresh:
+        return MEDIACONVERT_ENDPOINT_OVERRIDE
+
+    with _lock:
+        if not refresh:
+            url = _endpoints.get(region)
+            if url:
+                return url
+            url = _read_cache_file().get(region)
+            if url:
+                _endpoints[region] = url
+                return url
+
+        with metrics.timer('DescribeEndpointsLatency'):
+            response = clients.get_client('mediaconvert', region).describe_endpoints(Mode='DEFAULT')
+        url = response['Endpoints'][0]['Url']
+        _endpoints[region] = url
+        _write_cache_file(region, url)
+        log.info("🔗 MediaConvert 엔드포인트 조회", endpoint=url, region=region)
+        return url
+
+
+def get_mediaconvert_client(region=None):
+    """엔드포인트가 지정된 MediaConvert 클라이언트 반환 (엔드포인트별로 재사용)"""
+    region = region or clients.current_region()
+    return clients.get_client('mediaconvert', region, get_endpoint(region))
+
+
+def invalidate(region=None):
+    """캐시된 엔드포인트 제거 - 다음 호출 시 다시 조회"""
+    region = region or clients.current_region()
+    with _lock:
+        url = _endpoints.pop(region, None)
+        clients.discard_client('mediaconvert', region, url)
+        cached = _read_cache_file()
+        if cached.pop(region, None):
+            _dump_cache_file(cached)
+
+
+def call_mediaconvert(operation, region=None, **kwargs):
+    """
+    엔드포인트가 지정된 클라이언트로 MediaConvert API 호출
+    엔드포인트 오류가 발생한 경우에만 엔드포인트를 다시 조회하고 한 번 재시도합니다.
+    """
+    try:
+        return getattr(get_mediaconvert_client(region), operation)(**kwargs)
+    except Exception as e:
+        if not is_endpoint_error(e):
+            raise
+        log.warning("⚠️ MediaConvert 엔드포인트 오류, 재조회 후 재시도", error=str(e))
+        metrics.count('EndpointRefreshes')
+        invalidate(region)
+        get_endpoint(region, refresh=True)
+        return getattr(get_mediaconvert_client(region), operation)(**kwargs)
+
+
+def is_endpoint_error(error):
+    """엔드포인트가 잘못되었거나 만료되었음을 나타내는 오류인지 확인"""
+    if isinstance(error, EndpointConnectionError):
+        return True
+    if isinstance(error, ClientError):
+        err = error.response.get('Error', {})
+        return err.get('Code') == 'BadRequestException' and 'endpoint' in err.get('Message', '').lower()
+    return False
+
+
+def _read_cache_file():
+    try:
+        with open(ENDPOINT_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache_file(region, url):
+    cached = _read_cache_file()
+    cached[region] = url
+    _dump_cache_file(cached)
+
+
+def _dump_cache_file(cached):
+    # 동시 실행 중 부분 쓰기를 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{ENDPOINT_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, ENDPOINT_CACHE_FILE)
+    except OSError as e:
+        log.warning("⚠️ 엔드포인트 캐시 파일 저장 실패", error=str(e))
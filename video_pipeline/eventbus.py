@@ -0,0 +1,123 @@
+import os
+import random
+import threading
+import time
+
+from video_pipeline import clients, log, metrics
+
+# PutEvents 한 번에 보낼 수 있는 최대 항목 수 / 요청 크기
+PUT_EVENTS_MAX_ENTRIES = 10
+PUT_EVENTS_MAX_BYTES = 256 * 1024
+# 실패한 항목만 다시 보내는 최대 시도 횟수
+PUT_EVENTS_MAX_ATTEMPTS = int(os.environ.get('PUT_EVENTS_MAX_ATTEMPTS', '4'))
+BACKOFF_BASE_SECONDS = 0.2
+
+
+class PublishError(Exception):
+    """재시도 후에도 발송하지 못한 이벤트가 남은 경우"""
+
+
+def entry_size(entry):
+    """EventBridge가 요청 크기 한도를 계산하는 방식의 항목 크기"""
+    size = 14 if entry.get('Time') is not None else 0
+    for field in ('Source', 'DetailType', 'Detail'):
+        if entry.get(field):
+            size += len(entry[field].encode('utf-8'))
+    for resource in entry.get('Resources', []):
+        size += len(resource.encode('utf-8'))
+    return size
+
+
+class EventPublisher:
+    """
+    PutEvents 항목을 호출 단위로 모아두었다가 한꺼번에 발송
+    10개/256KB 단위로 나누어 보내고, 실패한 항목만 지터 백오프로 다시 보냅니다.
+    항목마다 tag(배치 레코드 ID 등)를 붙여 두면 flush()가 끝내 실패한 tag 목록을 반환합니다.
+    """
+
+    def __init__(self, client=None, max_attempts=PUT_EVENTS_MAX_ATTEMPTS):
+        self._client = client
+        self.max_attempts = max_attempts
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self._client or clients.get_client('events')
+
+    def add(self, entry, tag=None):
+        with self._lock:
+            self._buffer.append((entry, tag))
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """쌓인 항목을 모두 발송하고, 재시도 후에도 실패한 항목의 tag 목록 반환"""
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+        if not pending:
+            return []
+
+        failed = []
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(random.uniform(0, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            retry = []
+            for chunk in self._chunks(pending, failed):
+                retry.extend(self._send(chunk))
+            pending = retry
+            if not pending:
+                break
+
+        failed.extend(pending)
+        if failed:
+            log.error("❌ 이벤트 발송 실패", failed=len(failed))
+        return [tag for _, tag in failed]
+
+    def flush_or_raise(self):
+        """flush() 후 실패한 항목이 있으면 PublishError - 호출자가 재시도하도록"""
+        failed = self.flush()
+        if failed:
+            raise PublishError(f"EventBridge 이벤트 {len(failed)}개 발송 실패")
+
+    def _chunks(self, items, oversized):
+        """항목 수/요청 크기 한도 안에서 묶음 생성 (혼자서도 한도를 넘는 항목은 oversized로 분리)"""
+        chunk, chunk_bytes = [], 0
+        for item in items:
+            size = entry_size(item[0])
+            if size > PUT_EVENTS_MAX_BYTES:
+                log.error("❌ 이벤트가 너무 커서 발송 불가", size=size, detail_type=item[0].get('DetailType'))
+                oversized.append(item)
+                continue
+            if chunk and (len(chunk) == PUT_EVENTS_MAX_ENTRIES or chunk_bytes + size > PUT_EVENTS_MAX_BYTES):
+                yield chunk
+                chunk, chunk_bytes = [], 0
+            chunk.append(item)
+            chunk_bytes += size
+        if chunk:
+            yield chunk
+
+    def _send(self, chunk):
+        """묶음 하나 발송 - 실패한 항목만 반환"""
+        try:
+            with metrics.timer('PutEventsLatency'):
+                response = self.client.put_events(Entries=[entry for entry, _ in chunk])
+        except Exception as e:
+            metrics.count('PutEventsFailedEntries', len(chunk))
+            log.warning("⚠️ PutEvents 호출 실패, 재시도 예정", entries=len(chunk), error=str(e))
+            return chunk
+        if response.get('FailedEntryCount', 0) == 0:
+            log.info("📡 이벤트 발송", entries=len(chunk))
+            return []
+        # 응답 Entries는 요청 순서와 같으며 실패한 항목에만 ErrorCode가 있음
+        retry = [item for item, result in zip(chunk, response['Entries']) if result.get('ErrorCode')]
+        metrics.count('PutEventsFailedEntries', len(retry))
+        log.warning("⚠️ 일부 이벤트 발송 실패, 재시도 예정", failed=len(retry), entries=len(chunk),
+                    error_codes=sorted({r['ErrorCode'] for r in response['Entries'] if r.get('ErrorCode')}))
+        return retry
+
+
+# 실행 환경 전체에서 공유하는 발송기 (핸들러 종료 시 flush)
+publisher = EventPublisher()
@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from botocore.exceptions import ClientError
+
+from video_pipeline import clients, log
+
+# 중복 이벤트 판단 기록 유지 시간 / 제출 중 상태 유지 시간 (제출 도중 실패한 경우 이후 재시도 허용)
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+IDEMPOTENCY_PENDING_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_PENDING_TTL_SECONDS', '900'))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', '10000'))
+# 지정하면 실행 환경 간에도 중복을 걸러내도록 DynamoDB 테이블 사용
+IDEMPOTENCY_TABLE = os.environ.get('IDEMPOTENCY_TABLE')
+
+PENDING = 'PENDING'
+DONE = 'DONE'
+
+
+def event_key(detail, object_key=None):
+    """S3 이벤트의 버킷/키/버전(없으면 sequencer, ETag)으로 멱등성 키 생성"""
+    obj = detail['object']
+    version = obj.get('version-id') or obj.get('sequencer') or obj.get('etag') or ''
+    return f"{detail['bucket']['name']}/{object_key or obj['key']}#{version}"
+
+
+class MemoryIdempotencyStore:
+    """TTL이 있는 LRU 저장소 - 같은 실행 환경에서 반복되는 이벤트를 API 호출 없이 걸러냄"""
+
+    def __init__(self, max_size=IDEMPOTENCY_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item['expires_at'] < time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item
+
+    def claim(self, key):
+        """제출 권한 획득 - 이미 기록이 있으면 False"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item['expires_at'] >= time.time():
+                return False
+            self._put(key, {'status': PENDING, 'job_id': None,
+                            'expires_at': time.time() + IDEMPOTENCY_PENDING_TTL_SECONDS})
+            return True
+
+    def complete(self, key, job_id):
+        with self._lock:
+            self._put(key, {'status': DONE, 'job_id': job_id,
+                            'expires_at': time.time() + IDEMPOTENCY_TTL_SECONDS})
+
+    def release(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item['status'] == PENDING:
+                del self._items[key]
+
+    def _put(self, key, item):
+        self._items[key] = item
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+class DynamoDBIdempotencyStore:
+    """
+    DynamoDB 테이블 저장소 (파티션 키: idempotency_key, TTL 속성: expires_at)
+    조건부 쓰기로 동시에 들어온 중복 이벤트 중 하나만 제출하도록 보장합니다.
+    put_item/get_item/update_item/delete_item을 가진 가짜 클라이언트로 대체할 수 있습니다.
+    """
+
+    def __init__(self, table_name, client=None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or clients.get_client('dynamodb')
+
+    def get(self, key):
+        response = self.client.get_item(
+            TableName=self.table_name,
+            Key={'idempotency_key': {'S': key}},
+            ConsistentRead=True
+        )
+        item = response.get('Item')
+        if not item or float(item['expires_at']['N']) < time.time():
+            return None
+        return {
+            'status': item['status']['S'],
+            'job_id': item.get('job_id', {}).get('S'),
+            'expires_at': float(item['expires_at']['N'])
+        }
+
+    def claim(self, key):
+        now = time.time()
+        try:
+            self.client.put_item(
+                TableName=self.table_name,
+                Item={
+                    'idempotency_key': {'S': key},
+                    'status': {'S': PENDING},
+                    'expires_at': {'N': str(int(now + IDEMPOTENCY_PENDING_TTL_SECONDS))}
+                },
+                ConditionExpression='attribute_not_exists(idempotency_key) OR expires_at < :now',
+                ExpressionAttributeValues={':now': {'N': str(int(now))}}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def complete(self, key, job_id):
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={'idempotency_key': {'S': key}},
+            UpdateExpression='SET #s = :done, job_id = :job_id, expires_at = :expires_at',
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={
+                ':done': {'S': DONE},
+                ':job_id': {'S': job_id},
+                ':expires_at': {'N': str(int(time.time() + IDEMPOTENCY_TTL_SECONDS))}
+            }
+        )
+
+    def release(self, key):
+        try:
+            self.client.delete_item(
+                TableName=self.table_name,
+                Key={'idempotency_key': {'S': key}},
+                ConditionExpression='#s = :pending',
+                ExpressionAttributeNames={'#s': 'status'},
+                ExpressionAttributeValues={':pending': {'S': PENDING}}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+
+class LayeredIdempotencyStore:
+    """메모리 저장소를 앞에 두고 영구 저장소로 최종 판단"""
+
+    def __init__(self, memory, durable):
+        self.memory = memory
+        self.durable = durable
+
+    def get(self, key):
+        item = self.memory.get(key)
+        if item is None or item['status'] != DONE:
+            item = self.durable.get(key)
+            if item is not None and item['status'] == DONE:
+                self.memory.complete(key, item['job_id'])
+        return item
+
+    def claim(self, key):
+        if not self.memory.claim(key):
+            return False
+        if self.durable.claim(key):
+            return True
+        self.memory.release(key)
+        return False
+
+    def complete(self, key, job_id):
+        self.durable.complete(key, job_id)
+        self.memory.complete(key, job_id)
+
+    def release(self, key):
+        self.durable.release(key)
+        self.memory.release(key)
+
+
+def _default_store():
+    memory = MemoryIdempotencyStore()
+    if IDEMPOTENCY_TABLE:
+        return LayeredIdempotencyStore(memory, DynamoDBIdempotencyStore(IDEMPOTENCY_TABLE))
+    return memory
+
+
+store = _default_store()
+
+
+def submit_once(key, submit):
+    """
+    같은 키로는 한 번만 submit()을 실행
+    반환값: (job_id, duplicate) - 중복이면 기존 작업 ID (다른 곳에서 제출 중이면 None)
+    submit()이 None을 반환하거나 예외를 던지면 기록을 해제하여 재시도를 허용합니다.
+    """
+    existing = store.get(key)
+    if existing is not None and existing['status'] == DONE:
+        log.info("♻️ 중복 이벤트, 기존 작업 사용", idempotency_key=key, job_id=existing['job_id'])
+        return existing['job_id'], True
+
+    if not store.claim(key):
+        existing = store.get(key) or {}
+        log.info("♻️ 중복 이벤트, 이미 처리 중", idempotency_key=key)
+        return existing.get('job_id'), True
+
+    try:
+        job_id = submit()
+    except Exception:
+        store.release(key)
+        raise
+    if job_id:
+        store.complete(key, job_id)
+    else:
+        store.release(key)
+    return job_id, False
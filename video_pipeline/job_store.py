@@ -0,0 +1,365 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from botocore.exceptions import ClientError
+
+from video_pipeline import clients, log, metrics, progress
+
+# 업로드 → 작업 → 출력 연결 기록 (작업 상태 조회 시 list_jobs/get_job 호출 없이 조회)
+# JOB_STATE_TABLE을 지정하면 DynamoDB, JOB_STATE_DB를 지정하면 SQLite 파일(로컬 개발용), 둘 다 없으면 메모리만 사용
+JOB_STATE_TABLE = os.environ.get('JOB_STATE_TABLE')
+JOB_STATE_INPUT_INDEX = os.environ.get('JOB_STATE_INPUT_INDEX', 'input-index')
+JOB_STATE_DB = os.environ.get('JOB_STATE_DB')
+JOB_STATE_TTL_SECONDS = int(os.environ.get('JOB_STATE_TTL_DAYS', '90')) * 24 * 3600
+JOB_STATE_CACHE_SIZE = int(os.environ.get('JOB_STATE_CACHE_SIZE', '10000'))
+
+SUBMITTED = 'SUBMITTED'
+PROGRESSING = 'PROGRESSING'
+# 진행 중 주기적으로 오는 진행률 이벤트 (StatusUpdateInterval) - 기록에는 PROGRESSING으로 반영
+STATUS_UPDATE = 'STATUS_UPDATE'
+# 기록의 status를 바꾸는 작업 수명 주기 상태 - 그 밖의 이벤트(INPUT_INFORMATION, NEW_WARNING, QUEUE_HOP 등)는
+# last_event/last_event_at에만 남김
+LIFECYCLE_STATUSES = (SUBMITTED, PROGRESSING, 'COMPLETE', 'ERROR', 'CANCELED')
+# 이후 상태 변경 이벤트가 늦게 도착해도 되돌리지 않는 상태 (COPIED/CACHE_HIT: 작업 없이 출력 준비,
+# REJECTED: 예산 초과로 제출하지 않음)
+TERMINAL_STATUSES = ('COMPLETE', 'ERROR', 'CANCELED', 'COPIED', 'CACHE_HIT', 'REJECTED')
+
+# 기록 필드: job_id, input, status, submitted_at, started_at, finished_at(초 단위 epoch), outputs, error,
+#            input_format, queue, action, segment_group, duration(입력 길이 초), estimated_cost(예상 비용 USD)
+#            진행률: progress(%), phase, encode_speed(영상 초/실제 초), eta_at(예상 종료 epoch), progress_at
+#            last_event, last_event_at: 상태를 바꾸지 않는 마지막 이벤트와 그 시각
+FIELDS = ('job_id', 'input', 'status', 'submitted_at', 'started_at', 'finished_at', 'outputs', 'error',
+          'input_format', 'queue', 'action', 'segment_group', 'duration', 'estimated_cost',
+          'progress', 'phase', 'encode_speed', 'eta_at', 'progress_at', 'last_event', 'last_event_at')
+
+
+def apply_state(record, status, at, outputs=None, error=None, progress=None, **fields):
+    """
+    상태 변경을 기록에 반영한 새 기록 (종료 상태는 되돌리지 않고, 시각은 처음 값 유지)
+    fields는 비어 있을 때만 채우고, progress(진행률 필드)는 항상 최신 값으로 덮어씁니다.
+    """
+    if record and record.get('status') in TERMINAL_STATUSES and status not in TERMINAL_STATUSES:
+        return dict(record)
+    record = dict(record or {})
+    for key, value in fields.items():
+        if value is not None and record.get(key) is None:
+            record[key] = value
+    record['status'] = status
+    if status == PROGRESSING and record.get('started_at') is None:
+        record['started_at'] = at
+    if status in TERMINAL_STATUSES:
+        record['finished_at'] = at
+    if outputs:
+        record['outputs'] = list(outputs)
+    if error:
+        record['error'] = error
+    record.update(progress or {})
+    return record
+
+
+class MemoryJobStore:
+    """실행 환경 내부 LRU 저장소 (테스트/단독 실행용)"""
+
+    def __init__(self, max_size=JOB_STATE_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, record):
+        with self._lock:
+            self._items[record['job_id']] = dict(self._items.get(record['job_id'], {}), **record)
+            self._items.move_to_end(record['job_id'])
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def update(self, job_id, status, at, outputs=None, error=None, progress=None, **fields):
+        with self._lock:
+            record = apply_state(self._items.get(job_id), status, at, outputs, error, progress, job_id=job_id,
+                                 **fields)
+            self._items[job_id] = record
+            self._items.move_to_end(job_id)
+            return dict(record)
+
+    def get(self, job_id):
+        with self._lock:
+            record = self._items.get(job_id)
+            return dict(record) if record else None
+
+    def find_by_input(self, input_uri, limit=10):
+        with self._lock:
+            records = [dict(r) for r in self._items.values() if r.get('input') == input_uri]
+        return sorted(records, key=lambda r: r.get('submitted_at') or 0, reverse=True)[:limit]
+
+
+class SQLiteJobStore:
+    """SQLite 파일 저장소 - 로컬 개발/테스트에서 프로세스 간에도 기록 유지"""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS jobs ({', '.join(FIELDS)}, PRIMARY KEY (job_id))")
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_input ON jobs (input, submitted_at)")
+            # 이전 버전에서 만든 파일에는 새 필드 열 추가
+            existing = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            for field in FIELDS:
+                if field not in existing:
+                    self._db.execute(f"ALTER TABLE jobs ADD COLUMN {field}")
+
+    def _row(self, row):
+        record = dict(zip(FIELDS, row))
+        record['outputs'] = json.loads(record['outputs']) if record['outputs'] else None
+        return record
+
+    def _write(self, record):
+        values = [json.dumps(record[f]) if f == 'outputs' and record.get(f) else record.get(f) for f in FIELDS]
+        self._db.execute(
+            f"INSERT OR REPLACE INTO jobs ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})", values
+        )
+
+    def _read(self, job_id):
+        row = self._db.execute(f"SELECT {', '.join(FIELDS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def put(self, record):
+        with self._lock, self._db:
+            self._write(dict(self._read(record['job_id']) or {}, **record))
+
+    def update(self, job_id, status, at, outputs=None, error=None, progress=None, **fields):
+        with self._lock, self._db:
+            record = apply_state(self._read(job_id), status, at, outputs, error, progress, job_id=job_id, **fields)
+            self._write(record)
+            return record
+
+    def get(self, job_id):
+        with self._lock:
+            return self._read(job_id)
+
+    def find_by_input(self, input_uri, limit=10):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(FIELDS)} FROM jobs WHERE input = ? ORDER BY submitted_at DESC LIMIT ?",
+                (input_uri, limit)
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+
+class DynamoDBJobStore:
+    """
+    DynamoDB 테이블 저장소 (파티션 키: job_id, TTL 속성: expires_at)
+    입력별 조회에는 글로벌 보조 인덱스(JOB_STATE_INPUT_INDEX, 파티션 키 input / 정렬 키 submitted_at)를 사용합니다.
+    상태 변경은 조건부 업데이트로 종료 상태를 되돌리지 않습니다.
+    """
+
+    def __init__(self, table_name, client=None):
+        self.table_name = table_name
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or clients.get_client('dynamodb')
+
+    @staticmethod
+    def _to_item(record):
+        item = {}
+        for key, value in record.items():
+            if value is None:
+                continue
+            if key == 'outputs':
+                item[key] = {'L': [{'S': path} for path in value]}
+            elif isinstance(value, (int, float)):
+                item[key] = {'N': str(value)}
+            else:
+                item[key] = {'S': str(value)}
+        return item
+
+    @staticmethod
+    def _from_item(item):
+        record = {}
+        for key, value in item.items():
+            if key == 'expires_at':
+                continue
+            if 'L' in value:
+                record[key] = [entry['S'] for entry in value['L']]
+            elif 'N' in value:
+                record[key] = float(value['N'])
+            else:
+                record[key] = value['S']
+        return record
+
+    def put(self, record):
+        record = dict(record, expires_at=int(time.time() + JOB_STATE_TTL_SECONDS))
+        item = self._to_item(record)
+        names = {f"#f{i}": key for i, key in enumerate(item) if key != 'job_id'}
+        self.client.update_item(
+            TableName=self.table_name,
+            Key={'job_id': item['job_id']},
+            UpdateExpression='SET ' + ', '.join(f"{name} = :v{name[2:]}" for name in names),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues={f":v{name[2:]}": item[key] for name, key in names.items()}
+        )
+
+    def update(self, job_id, status, at, outputs=None, error=None, progress=None, **fields):
+        names = {'#s': 'status'}
+        values = {':status': {'S': status}}
+        sets = ['#s = :status']
+        if status == PROGRESSING:
+            sets.append('started_at = if_not_exists(started_at, :at)')
+            values[':at'] = {'N': str(at)}
+        if status in TERMINAL_STATUSES:
+            sets.append('finished_at = :at')
+            values[':at'] = {'N': str(at)}
+        if outputs:
+            sets.append('outputs = :outputs')
+            values[':outputs'] = {'L': [{'S': path} for path in outputs]}
+        if error:
+            sets.append('#e = :error')
+            names['#e'] = 'error'
+            values[':error'] = {'S': error}
+        for key, value in self._to_item({k: v for k, v in fields.items() if k in FIELDS}).items():
+            # input/action 등 예약어가 있으므로 속성 이름은 모두 치환
+            names[f"#{key}"] = key
+            sets.append(f"#{key} = if_not_exists(#{key}, :{key})")
+            values[f":{key}"] = value
+        for key, value in self._to_item(progress or {}).items():
+            names[f"#{key}"] = key
+            sets.append(f"#{key} = :{key}")
+            values[f":{key}"] = value
+        sets.append('expires_at = if_not_exists(expires_at, :expires_at)')
+        values[':expires_at'] = {'N': str(int(time.time() + JOB_STATE_TTL_SECONDS))}
+
+        params = {}
+        if status not in TERMINAL_STATUSES:
+            params['ConditionExpression'] = 'attribute_not_exists(#s) OR NOT #s IN (' + ', '.join(
+                f":t{i}" for i in range(len(TERMINAL_STATUSES))) + ')'
+            values.update({f":t{i}": {'S': s} for i, s in enumerate(TERMINAL_STATUSES)})
+        try:
+            response = self.client.update_item(
+                TableName=self.table_name,
+                Key={'job_id': {'S': job_id}},
+                UpdateExpression='SET ' + ', '.join(sets),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW',
+                **params
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # 이미 종료된 작업의 늦은 진행 이벤트 - 기록을 바꾸지 않음
+            return self.get(job_id)
+        return self._from_item(response['Attributes'])
+
+    def get(self, job_id):
+        item = self.client.get_item(TableName=self.table_name, Key={'job_id': {'S': job_id}}).get('Item')
+        return self._from_item(item) if item else None
+
+    def find_by_input(self, input_uri, limit=10):
+        response = self.client.query(
+            TableName=self.table_name,
+            IndexName=JOB_STATE_INPUT_INDEX,
+            KeyConditionExpression='#i = :input',
+            ExpressionAttributeNames={'#i': 'input'},
+            ExpressionAttributeValues={':input': {'S': input_uri}},
+            ScanIndexForward=False,
+            Limit=limit
+        )
+        return [self._from_item(item) for item in response.get('Items', [])]
+
+
+def _default_store():
+    if JOB_STATE_TABLE:
+        return DynamoDBJobStore(JOB_STATE_TABLE)
+    if JOB_STATE_DB:
+        return SQLiteJobStore(JOB_STATE_DB)
+    return MemoryJobStore()
+
+
+store = _default_store()
+
+
+def record_submission(job_id, input_uri, status=SUBMITTED, **fields):
+    """작업 제출(또는 작업 없이 출력 준비) 기록 - 저장 실패는 변환 흐름을 막지 않음"""
+    now = time.time()
+    record = dict(fields, job_id=job_id, input=input_uri, status=status, submitted_at=now)
+    if status in TERMINAL_STATUSES:
+        record['finished_at'] = now
+    try:
+        store.put({key: value for key, value in record.items() if key in FIELDS})
+    except Exception as e:
+        log.warning("⚠️ 작업 상태 기록 실패", job_id=job_id, error=str(e))
+
+
+def record_state_change(detail):
+    """
+    MediaConvert 상태 변경 이벤트를 기록에 반영
+    진행률 이벤트(STATUS_UPDATE)는 진행률/인코딩 속도/예상 종료 시각을 갱신하고, 종료 시 대기/인코딩 시간 지표 기록
+    수명 주기 상태가 아닌 이벤트는 status를 바꾸지 않고 last_event만 기록하며 None을 반환합니다.
+    """
+    metadata = detail.get('userMetadata') or {}
+    at = detail['timestamp'] / 1000 if detail.get('timestamp') else time.time()
+    status = detail['status']
+    if status not in LIFECYCLE_STATUSES and status != STATUS_UPDATE:
+        try:
+            store.put({'job_id': detail['jobId'], 'last_event': status, 'last_event_at': at})
+        except Exception as e:
+            log.warning("⚠️ 작업 이벤트 기록 실패", job_id=detail.get('jobId'), status=status, error=str(e))
+        return None
+    outputs = [
+        path
+        for group in detail.get('outputGroupDetails', [])
+        for output in group.get('outputDetails', [])
+        for path in output.get('outputFilePaths', [])
+    ]
+    try:
+        fields = None
+        if status == STATUS_UPDATE:
+            # 속도/남은 시간 계산에 시작 시각과 입력 길이가 필요
+            fields = progress.estimate(detail, store.get(detail['jobId']), at)
+            status = PROGRESSING
+        elif status == 'COMPLETE':
+            fields = {'progress': 100, 'progress_at': at}
+        record = store.update(
+            detail['jobId'],
+            status,
+            at,
+            outputs=outputs,
+            error=detail.get('errorMessage'),
+            progress=fields,
+            input=metadata.get('InputFile'),
+            input_format=metadata.get('InputFormat'),
+            segment_group=metadata.get('SegmentGroup') or metadata.get('StitchedFrom')
+        )
+    except Exception as e:
+        log.warning("⚠️ 작업 상태 갱신 실패", job_id=detail.get('jobId'), error=str(e))
+        return None
+    if detail['status'] == STATUS_UPDATE and fields and record and record.get('status') not in TERMINAL_STATUSES:
+        progress.record_metrics(fields)
+    if record and status in TERMINAL_STATUSES:
+        _record_timings(record)
+    return record
+
+
+def _record_timings(record):
+    """제출 → 시작 (큐 대기), 시작 → 종료 (인코딩), 제출 → 종료 (전체) 시간을 지표로 기록"""
+    submitted, started, finished = record.get('submitted_at'), record.get('started_at'), record.get('finished_at')
+    if submitted and finished:
+        metrics.record('TurnaroundTime', round((finished - submitted) * 1000), 'Milliseconds')
+    if submitted and started:
+        metrics.record('QueueTime', round((started - submitted) * 1000), 'Milliseconds')
+    if started and finished:
+        metrics.record('EncodeTime', round((finished - started) * 1000), 'Milliseconds')
+
+
+def lookup(job_id=None, input_uri=None, limit=10):
+    """작업 ID 또는 입력 S3 URI로 기록 조회 (입력별 조회는 최근 제출 순 목록)"""
+    if job_id:
+        record = store.get(job_id)
+        return [record] if record else []
+    if input_uri:
+        return store.find_by_input(input_uri, limit)
+    raise ValueError("job_id 또는 input_uri가 필요합니다")
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import random
+import sys
+import threading
+from contextlib import contextmanager
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+# 호출마다 이 비율로 DEBUG 로그(이벤트 전체 등)를 남김 - 0이면 LOG_LEVEL만 따름
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0'))
+
+# 호출 단위 상관관계 ID (request_id 등) / 스레드(배치 레코드) 단위 필드 (object_key, job_id 등)
+_invocation = {}
+_local = threading.local()
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그 - 메시지 포맷팅과 직렬화는 출력되는 로그에서만 수행"""
+
+    def format(self, record):
+        entry = {'level': record.levelname, 'message': record.getMessage()}
+        entry.update(_invocation)
+        entry.update(getattr(_local, 'fields', {}))
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _build_logger():
+    # Lambda 런타임이 루트 로거에 붙이는 텍스트 핸들러를 거치지 않도록 전파하지 않음
+    built = logging.getLogger('video_pipeline')
+    built.propagate = False
+    if not built.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+        built.addHandler(handler)
+    built.setLevel(LOG_LEVEL)
+    return built
+
+
+logger = _build_logger()
+
+
+def start_invocation(context=None, **fields):
+    """호출 시작 시 상관관계 ID를 설정하고 DEBUG 로그 샘플링 여부 결정"""
+    _invocation.clear()
+    _local.fields = {}
+    request_id = getattr(context, 'aws_request_id', None)
+    if request_id:
+        _invocation['request_id'] = request_id
+    _invocation.update(fields)
+    sampled = LOG_DEBUG_SAMPLE_RATE > 0 and random.random() < LOG_DEBUG_SAMPLE_RATE
+    logger.setLevel(logging.DEBUG if sampled else LOG_LEVEL)
+    if sampled:
+        _invocation['debug_sampled'] = True
+
+
+@contextmanager
+def bind(**fields):
+    """with 블록 동안 현재 스레드의 로그에 필드 추가 (배치 레코드별 object_key, job_id 등)"""
+    previous = getattr(_local, 'fields', {})
+    _local.fields = dict(previous, **fields)
+    try:
+        yield
+    finally:
+        _local.fields = previous
+
+
+def annotate(**fields):
+    """현재 bind 범위에 필드 추가 (작업 ID처럼 처리 도중에 알게 되는 값)"""
+    _local.fields = dict(getattr(_local, 'fields', {}), **fields)
+
+
+def is_enabled(level):
+    return logger.isEnabledFor(level)
+
+
+def _log(level, message, args, fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, extra={'fields': fields})
+
+
+def debug(message, *args, **fields):
+    _log(logging.DEBUG, message, args, fields)
+
+
+def info(message, *args, **fields):
+    _log(logging.INFO, message, args, fields)
+
+
+def warning(message, *args, **fields):
+    _log(logging.WARNING, message, args, fields)
+
+
+def error(message, *args, **fields):
+    _log(logging.ERROR, message, args, fields)
@@ -0,0 +1,104 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# CloudWatch Embedded Metric Format - 로그로 출력하면 CloudWatch가 지표로 추출하므로 API 호출이 없음
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'VideoPipeline')
+FUNCTION_NAME = os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local')
+# EMF 지표 하나에 담을 수 있는 최대 값 개수
+MAX_VALUES_PER_METRIC = 100
+# 1초 단위 고해상도로 저장할 지표 (초당 제출 수 확인용)
+HIGH_RESOLUTION_METRICS = {'JobsSubmitted'}
+
+# (차원 값 튜플) → {지표 이름: (단위, [값])}
+_pending = {}
+_lock = threading.Lock()
+_cold_start = True
+
+
+def record(name, value, unit='Count', **dimensions):
+    """지표 값 하나 기록 (호출 종료 시 차원 조합별로 묶어서 출력)"""
+    if not METRICS_ENABLED:
+        return
+    key = tuple(sorted(dimensions.items()))
+    with _lock:
+        metrics = _pending.setdefault(key, {})
+        metrics.setdefault(name, (unit, []))[1].append(value)
+
+
+def count(name, value=1, **dimensions):
+    record(name, value, 'Count', **dimensions)
+
+
+@contextmanager
+def timer(name, **dimensions):
+    """with 블록 실행 시간을 밀리초 지표로 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, round((time.perf_counter() - started) * 1000, 3), 'Milliseconds', **dimensions)
+
+
+def flush():
+    """쌓인 지표를 EMF 로그로 출력"""
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    timestamp = int(time.time() * 1000)
+    for key, metrics in pending.items():
+        dimensions = dict(key, Function=FUNCTION_NAME)
+        for document in _documents(timestamp, dimensions, metrics):
+            sys.stdout.write(json.dumps(document, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+def _documents(timestamp, dimensions, metrics):
+    """값이 많은 지표는 MAX_VALUES_PER_METRIC 단위로 나누어 여러 문서로 출력"""
+    chunk = 0
+    while True:
+        document = dict(dimensions)
+        definitions = []
+        for name, (unit, values) in metrics.items():
+            part = values[chunk * MAX_VALUES_PER_METRIC:(chunk + 1) * MAX_VALUES_PER_METRIC]
+            if not part:
+                continue
+            definition = {'Name': name, 'Unit': unit}
+            if name in HIGH_RESOLUTION_METRICS:
+                definition['StorageResolution'] = 1
+            definitions.append(definition)
+            document[name] = part if len(part) > 1 else part[0]
+        if not definitions:
+            return
+        document['_aws'] = {
+            'Timestamp': timestamp,
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [sorted(dimensions)],
+                'Metrics': definitions
+            }]
+        }
+        yield document
+        chunk += 1
+
+
+def instrument_handler(handler):
+    """Lambda 핸들러 전체 지연 시간/콜드 스타트를 기록하고 종료 시 지표 출력"""
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _cold_start
+        cold_start, _cold_start = _cold_start, False
+        count('ColdStart', 1 if cold_start else 0)
+        try:
+            with timer('HandlerLatency'):
+                return handler(event, context)
+        finally:
+            flush()
+
+    return wrapper
@@ -0,0 +1,49 @@
+import hashlib
+import os
+import posixpath
+from datetime import datetime
+
+# 출력 키 배치 방식 - 한 접두사에 출력이 몰리면 접두사별 요청 한도와 나열 속도가 문제가 되므로 나눠 저장
+# flat:   converted/<입력 파일명><NameModifier>.mp4 (기존 방식)
+# hash:   converted/<해시 2자리>/<입력 경로 해시>/<입력 파일명>... (입력 경로 해시로 샤딩)
+# date:   converted/<연>/<월>/<일>/<입력 파일명>... (변환 시작 날짜, UTC)
+# mirror: converted/<입력 키의 디렉터리>/<입력 파일명>... (입력 버킷 구조 유지)
+OUTPUT_KEY_LAYOUT = os.environ.get('OUTPUT_KEY_LAYOUT', 'flat')
+OUTPUT_PREFIX = os.environ.get('OUTPUT_PREFIX', 'converted/')
+# 분할 변환 구간 출력 접두사 (출력 버킷 안, 수명 주기 규칙으로 정리)
+SEGMENT_PREFIX = os.environ.get('SEGMENT_PREFIX', 'segments/')
+# hash 방식의 입력 경로 해시 길이 (앞 2자리는 샤드 접두사로도 사용)
+OUTPUT_HASH_LENGTH = 12
+
+LAYOUTS = ('flat', 'hash', 'date', 'mirror')
+if OUTPUT_KEY_LAYOUT not in LAYOUTS:
+    raise ValueError(f"알 수 없는 출력 키 배치 방식: {OUTPUT_KEY_LAYOUT}")
+
+
+def input_name(input_key):
+    """입력 키의 확장자를 뺀 파일명 (MediaConvert 출력 파일명의 앞부분)"""
+    return posixpath.splitext(posixpath.basename(input_key))[0]
+
+
+def output_prefix(input_bucket, input_key, layout=None, now=None):
+    """입력 하나의 출력이 저장될 키 접두사 ('/'로 끝남)"""
+    layout = layout or OUTPUT_KEY_LAYOUT
+    if layout == 'hash':
+        digest = hashlib.sha256(f"{input_bucket}/{input_key}".encode()).hexdigest()[:OUTPUT_HASH_LENGTH]
+        return f"{OUTPUT_PREFIX}{digest[:2]}/{digest}/"
+    if layout == 'date':
+        return f"{OUTPUT_PREFIX}{(now or datetime.utcnow()).strftime('%Y/%m/%d')}/"
+    if layout == 'mirror':
+        directory = posixpath.dirname(input_key)
+        return f"{OUTPUT_PREFIX}{directory}/" if directory else OUTPUT_PREFIX
+    return OUTPUT_PREFIX
+
+
+def destination(output_bucket, prefix):
+    """MediaConvert FileGroupSettings.Destination (출력 파일명은 입력 파일명 + NameModifier)"""
+    return f"s3://{output_bucket}/{prefix}"
+
+
+def output_key(prefix, input_key, name_modifier, extension='.mp4'):
+    """변환 없이 복사하는 경우처럼 직접 출력 키를 만들 때 - MediaConvert와 같은 이름 규칙"""
+    return f"{prefix}{input_name(input_key)}{name_modifier}{extension}"
@@ -0,0 +1,301 @@
+import os
+import struct
+
+from video_pipeline import clients, log, renditions
+
+# 업로드마다 헤더만 범위 읽기로 조회하여 변환 방식을 결정
+PROBE_ENABLED = os.environ.get('INPUT_PROBE_ENABLED', 'true').lower() == 'true'
+# 첫 범위 읽기 크기 / moov 박스 최대 읽기 크기
+PROBE_HEAD_BYTES = int(os.environ.get('PROBE_HEAD_BYTES', str(64 * 1024)))
+PROBE_MAX_MOOV_BYTES = int(os.environ.get('PROBE_MAX_MOOV_BYTES', str(8 * 1024 * 1024)))
+# 비트레이트 비교 시 허용 오차
+BITRATE_TOLERANCE = 1.1
+
+_MP4_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+_MP4_CODECS = {
+    b'avc1': 'h264', b'avc3': 'h264',
+    b'hvc1': 'h265', b'hev1': 'h265',
+    b'mp4v': 'mpeg4', b'mp4a': 'aac',
+}
+_MKV_CODECS = {
+    'V_MPEG4/ISO/AVC': 'h264', 'V_MPEGH/ISO/HEVC': 'h265',
+    'V_VP8': 'vp8', 'V_VP9': 'vp9', 'V_AV1': 'av1',
+    'A_AAC': 'aac', 'A_OPUS': 'opus', 'A_VORBIS': 'vorbis', 'A_AC3': 'ac3',
+}
+
+# Matroska 요소 ID
+_EBML_HEADER, _DOC_TYPE = 0x1A45DFA3, 0x4282
+_SEGMENT, _INFO, _TRACKS, _CLUSTER = 0x18538067, 0x1549A966, 0x1654AE6B, 0x1F43B675
+_TIMECODE_SCALE, _DURATION = 0x2AD7B1, 0x4489
+_TRACK_ENTRY, _TRACK_TYPE, _CODEC_ID, _DEFAULT_DURATION = 0xAE, 0x83, 0x86, 0x23E383
+_VIDEO, _PIXEL_WIDTH, _PIXEL_HEIGHT = 0xE0, 0xB0, 0xBA
+# 하위 요소를 담는 요소 - 첫 범위 읽기에서 잘려도 앞부분의 하위 요소는 읽을 수 있음
+_MASTER_ELEMENTS = {_EBML_HEADER, _SEGMENT, _INFO, _TRACKS, _TRACK_ENTRY, _VIDEO, _CLUSTER}
+
+
+def probe_object(bucket_name, object_key):
+    """
+    S3 범위 읽기로 컨테이너 헤더만 읽어 코덱/해상도/길이/프레임 레이트/비트레이트 확인
+    알 수 없는 형식이거나 읽기에 실패하면 None 반환
+    """
+    try:
+        head, total_size = _read_range(bucket_name, object_key, 0, PROBE_HEAD_BYTES)
+        if head[4:8] == b'ftyp':
+            info = _probe_mp4(bucket_name, object_key, head, total_size)
+        elif head[:4] == b'\x1a\x45\xdf\xa3':
+            info = _probe_matroska(head)
+        else:
+            return None
+    except Exception as e:
+        log.warning("⚠️ 입력 파일 분석 실패, 기본 변환 진행", error=str(e))
+        return None
+
+    if info is not None:
+        info['size'] = total_size
+        if info.get('duration'):
+            info['bitrate'] = int(total_size * 8 / info['duration'])
+    return info
+
+
+def plan_conversion(bucket_name, object_key, profile, ladder):
+    """
+    입력 분석 결과로 변환 방식 결정
+    copy: 이미 규격에 맞는 MP4 → 서버 측 복사
+    remux: 코덱은 맞지만 컨테이너만 다름 → 재인코딩 없이 MP4로 다시 담기
+    transcode: 기존과 같이 변환 (원본보다 큰 렌디션은 제외)
+    """
+    info = probe_object(bucket_name, object_key) if PROBE_ENABLED else None
+    rungs = renditions.ladder_rungs(ladder, info and info.get('height'))
+    action = 'transcode'
+    if info and rungs == profile.base_rungs and _is_compliant(info, profile):
+        action = 'copy' if info['container'] == 'mp4' and info.get('moov_first') else 'remux'
+    if info:
+        log.info("🔍 입력 분석", probe=info, action=action)
+    return {'action': action, 'info': info, 'rungs': rungs}
+
+
+def copy_to_output(bucket_name, object_key, output_bucket, output_key):
+    """규격에 맞는 입력을 서버 측 복사로 출력 위치에 저장 (5GB 초과 시 멀티파트 복사)"""
+    clients.get_client('s3').copy(
+        {'Bucket': bucket_name, 'Key': object_key},
+        output_bucket,
+        output_key,
+        ExtraArgs={'ContentType': 'video/mp4'}
+    )
+    output_uri = f"s3://{output_bucket}/{output_key}"
+    log.info("📋 변환 없이 복사 완료", output=output_uri)
+    return output_uri
+
+
+def _is_compliant(info, profile):
+    """프로파일 출력 규격(H.264/AAC, 해상도, 비트레이트) 이내인지 확인"""
+    video = profile.output_group['Outputs'][0]['VideoDescription']
+    if info.get('video_codec') != 'h264' or info.get('audio_codec') not in ('aac', None):
+        return False
+    if not info.get('width') or info['width'] > video['Width'] or info['height'] > video['Height']:
+        return False
+    max_bitrate = profile.max_bitrate * BITRATE_TOLERANCE
+    return info.get('bitrate') is not None and info['bitrate'] <= max_bitrate
+
+
+def _read_range(bucket_name, object_key, start, length):
+    response = clients.get_client('s3').get_object(
+        Bucket=bucket_name, Key=object_key, Range=f"bytes={start}-{start + length - 1}"
+    )
+    data = response['Body'].read()
+    total_size = int(response['ContentRange'].rsplit('/', 1)[1])
+    return data, total_size
+
+
+def _probe_mp4(bucket_name, object_key, head, total_size):
+    """최상위 박스 헤더를 따라가며 moov 박스만 읽어서 분석"""
+    offset = 0
+    saw_mdat = False
+    brand = head[8:12]
+    for _ in range(32):
+        if offset + 16 > total_size:
+            return None
+        header = head[offset:offset + 16] if offset + 16 <= len(head) else \
+            _read_range(bucket_name, object_key, offset, 16)[0]
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = total_size - offset
+        if size < header_size:
+            return None
+
+        if box_type == b'moov':
+            if size > PROBE_MAX_MOOV_BYTES:
+                return None
+            if offset + size <= len(head):
+                moov = head[offset + header_size:offset + size]
+            else:
+                moov = _read_range(bucket_name, object_key, offset + header_size, size - header_size)[0]
+            info = _parse_moov(moov)
+            info['container'] = 'mov' if brand == b'qt  ' else 'mp4'
+            info['moov_first'] = not saw_mdat
+            return info
+        if box_type == b'mdat':
+            saw_mdat = True
+        offset += size
+    return None
+
+
+def _iter_boxes(data):
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header_size = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header_size:
+            return
+        yield box_type, data[offset + header_size:offset + size]
+        offset += size
+
+
+def _parse_moov(moov):
+    info = {'video_codec': None, 'audio_codec': None, 'width': None, 'height': None, 'duration': None,
+            'frame_rate': None}
+    for box_type, payload in _iter_boxes(moov):
+        if box_type == b'mvhd':
+            if payload[0] == 1:
+                timescale, duration = struct.unpack('>IQ', payload[20:32])
+            else:
+                timescale, duration = struct.unpack('>II', payload[12:20])
+            if timescale:
+                info['duration'] = duration / timescale
+        elif box_type == b'trak':
+            track = {}
+            _parse_track(payload, track)
+            codec = _MP4_CODECS.get(track.get('format'), (track.get('format') or b'').decode('latin-1'))
+            if track.get('handler') == b'vide' and info['video_codec'] is None:
+                info['video_codec'] = codec
+                info['width'], info['height'] = track.get('width'), track.get('height')
+                if track.get('timescale') and track.get('sample_delta'):
+                    info['frame_rate'] = round(track['timescale'] / track['sample_delta'], 3)
+            elif track.get('handler') == b'soun' and info['audio_codec'] is None:
+                info['audio_codec'] = codec
+    return info
+
+
+def _parse_track(data, track):
+    for box_type, payload in _iter_boxes(data):
+        if box_type in _MP4_CONTAINER_BOXES:
+            _parse_track(payload, track)
+        elif box_type == b'tkhd':
+            start = 88 if payload[0] == 1 else 76
+            width, height = struct.unpack('>II', payload[start:start + 8])
+            track['width'], track['height'] = width >> 16, height >> 16
+        elif box_type == b'hdlr':
+            # QuickTime은 minf 안에 데이터 핸들러(hdlr)가 하나 더 있으므로 첫 번째(mdia)만 사용
+            track.setdefault('handler', payload[8:12])
+        elif box_type == b'stsd' and len(payload) >= 16:
+            track['format'] = payload[12:16]
+        elif box_type == b'mdhd':
+            start = 20 if payload[0] == 1 else 12
+            track['timescale'] = struct.unpack('>I', payload[start:start + 4])[0]
+        elif box_type == b'stts' and len(payload) >= 16:
+            # 가장 많은 샘플이 쓰는 프레임 간격 (첫 프레임만 다른 파일이 있음)
+            count = struct.unpack('>I', payload[4:8])[0]
+            entries = [struct.unpack('>II', payload[8 + i * 8:16 + i * 8])
+                       for i in range(min(count, (len(payload) - 8) // 8))]
+            track['sample_delta'] = max(entries)[1] if entries else None
+
+
+def _read_vint(data, pos, keep_marker=False):
+    first = data[pos]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8 or pos + length > len(data):
+        raise ValueError('잘못된 EBML 정수')
+    value = first if keep_marker else first & (0xFF >> length)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, pos + length, unknown
+
+
+def _iter_elements(data, start, end):
+    pos = start
+    while pos < end:
+        element_id, pos, _ = _read_vint(data, pos, keep_marker=True)
+        size, pos, unknown = _read_vint(data, pos)
+        if not unknown and pos + size > len(data) and element_id not in _MASTER_ELEMENTS:
+            # 값이 잘린 요소(코덱 ID 일부 등)는 잘못된 값이 되므로 읽지 않음
+            raise ValueError('잘린 EBML 요소')
+        # 크기를 알 수 없는 요소(라이브 세그먼트 등)는 버퍼 끝까지로 간주
+        element_end = end if unknown else min(pos + size, end)
+        yield element_id, pos, element_end
+        pos = element_end
+
+
+def _probe_matroska(head):
+    """EBML 헤더와 Segment의 Info/Tracks 요소만 분석 (첫 Cluster에서 중단)"""
+    info = {'container': None, 'video_codec': None, 'audio_codec': None,
+            'width': None, 'height': None, 'duration': None, 'frame_rate': None}
+    for element_id, start, end in _iter_elements(head, 0, len(head)):
+        if element_id == _EBML_HEADER:
+            for child_id, child_start, child_end in _iter_elements(head, start, end):
+                if child_id == _DOC_TYPE:
+                    info['container'] = head[child_start:child_end].decode('ascii', 'ignore')
+        elif element_id == _SEGMENT:
+            _parse_segment(head, start, end, info)
+            break
+    return info
+
+
+def _parse_segment(data, start, end, info):
+    try:
+        for element_id, child_start, child_end in _iter_elements(data, start, end):
+            if element_id == _INFO:
+                scale = 1000000
+                duration = None
+                for child_id, s, e in _iter_elements(data, child_start, child_end):
+                    if child_id == _TIMECODE_SCALE:
+                        scale = int.from_bytes(data[s:e], 'big')
+                    elif child_id == _DURATION:
+                        duration = struct.unpack('>f' if e - s == 4 else '>d', data[s:e])[0]
+                if duration:
+                    info['duration'] = duration * scale / 1e9
+            elif element_id == _TRACKS:
+                for child_id, s, e in _iter_elements(data, child_start, child_end):
+                    if child_id == _TRACK_ENTRY:
+                        _parse_track_entry(data, s, e, info)
+            elif element_id == _CLUSTER:
+                break
+    except (ValueError, IndexError, struct.error):
+        # 첫 범위 읽기에 잘린 요소는 무시하고 지금까지 얻은 정보 사용
+        pass
+
+
+def _parse_track_entry(data, start, end, info):
+    track_type = codec = width = height = frame_rate = None
+    for element_id, s, e in _iter_elements(data, start, end):
+        if element_id == _TRACK_TYPE:
+            track_type = int.from_bytes(data[s:e], 'big')
+        elif element_id == _DEFAULT_DURATION:
+            # 프레임 하나의 길이 (나노초)
+            frame_duration = int.from_bytes(data[s:e], 'big')
+            frame_rate = round(1e9 / frame_duration, 3) if frame_duration else None
+        elif element_id == _CODEC_ID:
+            codec_id = data[s:e].decode('ascii', 'ignore').rstrip('\x00')
+            codec = _MKV_CODECS.get(codec_id, _MKV_CODECS.get(codec_id.split('/')[0], codec_id))
+        elif element_id == _VIDEO:
+            for child_id, cs, ce in _iter_elements(data, s, e):
+                if child_id == _PIXEL_WIDTH:
+                    width = int.from_bytes(data[cs:ce], 'big')
+                elif child_id == _PIXEL_HEIGHT:
+                    height = int.from_bytes(data[cs:ce], 'big')
+    if track_type == 1 and info['video_codec'] is None:
+        info['video_codec'], info['width'], info['height'] = codec, width, height
+        info['frame_rate'] = frame_rate
+    elif track_type == 2 and info['audio_codec'] is None:
+        info['audio_codec'] = codec
@@ -0,0 +1,374 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+
+from botocore.exceptions import ClientError
+
+from video_pipeline import endpoint, log, renditions
+
+# 작업 제출 방식: inline(설정 전체 전송) / template(등록된 JobTemplate 이름으로 제출)
+JOB_SUBMISSION_MODE = os.environ.get('JOB_SUBMISSION_MODE', 'inline')
+JOB_TEMPLATE_PREFIX = os.environ.get('JOB_TEMPLATE_PREFIX', 'video-pipeline-')
+
+# H.264 공통 설정 (모든 프로파일이 공유)
+_H264_BASE = {
+    "InterlaceMode": "PROGRESSIVE",
+    "NumberReferenceFrames": 3,
+    "Syntax": "DEFAULT",
+    "Softness": 0,
+    "GopClosedCadence": 1,
+    "GopSize": 90,
+    "Slices": 1,
+    "GopBReference": "DISABLED",
+    "SlowPal": "DISABLED",
+    "SpatialAdaptiveQuantization": "ENABLED",
+    "TemporalAdaptiveQuantization": "ENABLED",
+    "FlickerAdaptiveQuantization": "DISABLED",
+    "EntropyEncoding": "CABAC",
+    "FramerateControl": "INITIALIZE_FROM_SOURCE",
+    "RateControlMode": "CBR",
+    "CodecProfile": "MAIN",
+    "Telecine": "NONE",
+    "MinIInterval": 0,
+    "AdaptiveQuantization": "HIGH",
+    "CodecLevel": "AUTO",
+    "FieldEncoding": "PAFF",
+    "SceneChangeDetect": "ENABLED",
+    "QualityTuningLevel": "SINGLE_PASS",
+    "FramerateConversionAlgorithm": "DUPLICATE_DROP",
+    "UnregisteredSeiTimecode": "DISABLED",
+    "GopSizeUnits": "FRAMES",
+    "ParControl": "INITIALIZE_FROM_SOURCE",
+    "NumberBFramesBetweenReferenceFrames": 2,
+    "RepeatPps": "DISABLED"
+}
+
+# AAC 공통 설정
+_AAC_BASE = {
+    "AudioDescriptionBroadcasterMix": "NORMAL",
+    "RateControlMode": "CBR",
+    "CodecProfile": "LC",
+    "CodingMode": "CODING_MODE_2_0",
+    "RawFormat": "NONE",
+    "SampleRate": 48000,
+    "Specification": "MPEG4"
+}
+
+
+def _video_description(width, height, bitrate, **extra):
+    description = {
+        "Width": width,
+        "Height": height,
+        "ScalingBehavior": "DEFAULT",
+        "TimecodeInsertion": "DISABLED",
+        "AntiAlias": "ENABLED",
+        "Sharpness": 50,
+        "CodecSettings": {
+            "Codec": "H_264",
+            "H264Settings": dict(_H264_BASE, Bitrate=bitrate)
+        }
+    }
+    description.update(extra)
+    return description
+
+
+def _audio_description(bitrate):
+    return {
+        "AudioTypeControl": "FOLLOW_INPUT",
+        "AudioSourceName": "Audio Selector 1",
+        "CodecSettings": {
+            "Codec": "AAC",
+            "AacSettings": dict(_AAC_BASE, Bitrate=bitrate)
+        },
+        "LanguageCodeControl": "FOLLOW_INPUT"
+    }
+
+
+def _mp4_container(**extra):
+    settings = {
+        "CslgAtom": "INCLUDE",
+        "FreeSpaceBox": "EXCLUDE",
+        "MoovPlacement": "PROGRESSIVE_DOWNLOAD"
+    }
+    settings.update(extra)
+    return {"Container": "MP4", "Mp4Settings": settings}
+
+
+# 인코딩 프로파일 정의 - 작업 설정의 단일 원본
+PROFILE_DEFINITIONS = {
+    # 형식 표준화 변환 (lambda_function.py)
+    'mp4_standard': {
+        'description': '720x480, H.264, AAC, 2Mbps',
+        'input': {
+            "AudioSelectors": {
+                "Audio Selector 1": {
+                    "DefaultSelection": "DEFAULT"
+                }
+            },
+            "VideoSelector": {},
+            "TimecodeSource": "ZEROBASED"
+        },
+        'output_group': {
+            "Name": "MP4_Conversion",
+            "OutputGroupSettings": {
+                "Type": "FILE_GROUP_SETTINGS",
+                "FileGroupSettings": {
+                    "Destination": None,
+                    "DestinationSettings": {
+                        "S3Settings": {
+                            "StorageClass": "STANDARD"
+                        }
+                    }
+                }
+            },
+            "Outputs": [
+                {
+                    "NameModifier": "_converted",
+                    "VideoDescription": _video_description(720, 480, 2000000),
+                    "AudioDescriptions": [_audio_description(128000)],
+                    "ContainerSettings": _mp4_container(Mp4MajorBrand="isom")
+                }
+            ]
+        },
+        'settings': {
+            "AdAvailOffset": 0,
+            "TimecodeConfig": {
+                "Source": "ZEROBASED"
+            }
+        },
+        'job': {
+            "AccelerationSettings": {
+                "Mode": "DISABLED"
+            },
+            "StatusUpdateInterval": "SECONDS_60",
+            "Priority": 0
+        },
+        'metadata': {
+            "OutputFormat": "MP4",
+            "ConversionType": "Format_Standardization",
+            "AnalysisRequired": "true"
+        }
+    },
+    # 비용 최적화 SD 변환 (optimized_lambda_function.py)
+    'mp4_sd': {
+        'description': '720x480, H.264, AAC, 1.5Mbps',
+        'input': {
+            "AudioSelectors": {
+                "Audio Selector 1": {
+                    "Offset": 0,
+                    "DefaultSelection": "DEFAULT",
+                    "ProgramSelection": 1
+                }
+            },
+            "VideoSelector": {
+                "ColorSpace": "FOLLOW"
+            },
+            "FilterEnable": "AUTO",
+            "PsiControl": "USE_PSI",
+            "FilterStrength": 0,
+            "DeblockFilter": "DISABLED",
+            "DenoiseFilter": "DISABLED",
+            "TimecodeSource": "EMBEDDED"
+        },
+        'output_group': {
+            "Name": "File Group",
+            "OutputGroupSettings": {
+                "Type": "FILE_GROUP_SETTINGS",
+                "FileGroupSettings": {
+                    "Destination": None
+                }
+            },
+            "Outputs": [
+                {
+                    "NameModifier": "_sd",
+                    "VideoDescription": _video_description(
+                        720, 480, 1500000,  # SD 해상도, 1.5 Mbps
+                        AfdSignaling="NONE",
+                        DropFrameTimecode="ENABLED",
+                        RespondToAfd="NONE",
+                        ColorMetadata="INSERT"
+                    ),
+                    "AudioDescriptions": [_audio_description(96000)],
+                    "ContainerSettings": _mp4_container()
+                }
+            ]
+        },
+        'settings': {},
+        'job': {
+            "Queue": "Default"
+        },
+        'metadata': {}
+    }
+}
+
+
+class CompiledProfile:
+    """
+    초기화 시 한 번 컴파일된 작업 설정 템플릿
+    템플릿 자체는 절대 수정하지 않고, 작업마다 입력 경로/출력 위치/메타데이터/우선순위가
+    바뀌는 경로만 얕은 복사하여 요청을 만듭니다.
+    """
+
+    def __init__(self, name, definition):
+        definition = copy.deepcopy(definition)
+        self.name = name
+        self.description = definition['description']
+        self.input = definition['input']
+        self.output_group = definition['output_group']
+        self.settings = definition['settings']
+        self.job_fields = definition['job']
+        self.metadata = definition['metadata']
+        # 설정이 바뀌면 해시도 바뀌므로 등록된 JobTemplate 이름/캐시 키로 사용
+        self.digest = hashlib.sha256(
+            json.dumps(definition, sort_keys=True).encode()
+        ).hexdigest()[:12]
+        self.template_name = f"{JOB_TEMPLATE_PREFIX}{name}-{self.digest}"
+        # 프로파일 자체 출력(720x480)에 해당하는 렌디션 - 이 경우 출력 목록을 바꾸지 않음
+        self.base_rungs = ('480p',)
+        base_output = self.output_group['Outputs'][0]
+        self.name_modifier = base_output['NameModifier']
+        self.quality = base_output['VideoDescription']['CodecSettings']['H264Settings']['QualityTuningLevel']
+        self.max_bitrate = base_output['VideoDescription']['CodecSettings']['H264Settings']['Bitrate'] + sum(
+            audio['CodecSettings']['AacSettings']['Bitrate'] for audio in base_output['AudioDescriptions']
+        )
+        self._registered_destination = None
+        self._lock = threading.Lock()
+
+    def build(self, role, input_uri, destination, metadata=None, priority=None, rungs=None, remux=False,
+              queue=None, acceleration=None, quality=None, inline=False):
+        """
+        작업별 값만 채워 create_job 요청 파라미터 반환
+        rungs를 지정하면 렌디션마다 출력을 하나씩 만들어 한 번의 디코딩으로 여러 화질을 인코딩합니다.
+        remux이면 재인코딩 없이 영상/음성을 그대로 MP4 컨테이너에 담습니다.
+        queue/priority/acceleration(가속 모드)/quality(H.264 화질 튜닝 수준)를 지정하면 프로파일 기본값 대신 사용합니다.
+        inline이면 JOB_SUBMISSION_MODE와 관계없이 설정 전체를 전송합니다 (요청의 출력 설정을 고쳐 쓰는 경우).
+        """
+        inputs = [dict(self.input, FileInput=input_uri)]
+        rungs = tuple(rungs) if rungs and tuple(rungs) != self.base_rungs else None
+        quality = quality if quality != self.quality else None
+
+        if remux:
+            settings = dict(self.settings, Inputs=inputs, OutputGroups=self.remux_output_groups(destination))
+            request = dict(self.job_fields)
+        elif (JOB_SUBMISSION_MODE == 'template' and not inline and rungs is None and quality is None
+                and self._ensure_registered(destination) == destination):
+            # 나머지 설정은 등록된 템플릿에 있으므로 입력만 전송
+            settings = {'Inputs': inputs}
+            request = {'JobTemplate': self.template_name}
+            request.update((k, v) for k, v in self.job_fields.items() if k in ('Queue', 'Priority'))
+        else:
+            settings = dict(self.settings, Inputs=inputs,
+                            OutputGroups=self.output_groups(destination, rungs, quality))
+            request = dict(self.job_fields)
+
+        request['Role'] = role
+        request['Settings'] = settings
+        request['UserMetadata'] = dict(self.metadata, **(metadata or {}))
+        if priority is not None:
+            request['Priority'] = priority
+        if queue is not None:
+            request['Queue'] = queue
+        if acceleration is not None:
+            request['AccelerationSettings'] = {'Mode': acceleration}
+        return request
+
+    def output_groups(self, destination, rungs=None, quality=None, outputs=None):
+        """
+        출력 위치/렌디션/화질 튜닝에 맞춘 OutputGroups - 호출마다 새로 만듦
+        출력 위치는 OUTPUT_KEY_LAYOUT에 따라 작업마다 달라지므로 캐시하지 않고, 위치와 무관한 출력 목록만 캐시합니다.
+        그룹/출력 dict는 호출자별 복사본이라 고쳐 써도 다른 작업에 영향이 없습니다.
+        """
+        group = self.output_group
+        group_settings = group['OutputGroupSettings']
+        file_settings = dict(group_settings['FileGroupSettings'], Destination=destination)
+        group = dict(group, OutputGroupSettings=dict(group_settings, FileGroupSettings=file_settings))
+        if outputs is None and (rungs or quality):
+            outputs = self.rendition_outputs(rungs or self.base_rungs, quality)
+        group['Outputs'] = [dict(output) for output in (outputs or group['Outputs'])]
+        return [group]
+
+    def remux_output_groups(self, destination):
+        """영상/음성 패스스루 출력 (컨테이너만 MP4로 변경)"""
+        return self.output_groups(destination, outputs=self.remux_outputs())
+
+    @lru_cache(maxsize=1)
+    def remux_outputs(self):
+        """패스스루 출력 목록 (출력 위치와 무관하므로 프로파일당 한 번만 만듦)"""
+        base = self.output_group['Outputs'][0]
+        return (dict(
+            base,
+            VideoDescription={"CodecSettings": {"Codec": "PASSTHROUGH"}},
+            AudioDescriptions=[{
+                "AudioSourceName": "Audio Selector 1",
+                "CodecSettings": {"Codec": "PASSTHROUGH"}
+            }]
+        ),)
+
+    @lru_cache(maxsize=16)
+    def rendition_outputs(self, rungs, quality=None):
+        """
+        프로파일 출력을 기준으로 렌디션별 해상도/비트레이트(와 화질 튜닝 수준)만 바꾼 출력 목록 (캐시되므로 튜플)
+        기본 렌디션만 있으면 출력 이름(NameModifier)은 프로파일 그대로 유지합니다.
+        """
+        base = self.output_group['Outputs'][0]
+        outputs = []
+        for rung in rungs:
+            video = dict(base['VideoDescription'])
+            h264 = dict(video['CodecSettings']['H264Settings'])
+            if rungs == self.base_rungs:
+                name_modifier = base['NameModifier']
+            else:
+                spec = renditions.RENDITIONS[rung]
+                video.update(Width=spec['width'], Height=spec['height'])
+                h264['Bitrate'] = spec['bitrate'] or h264['Bitrate']
+                name_modifier = f"_{rung}"
+            if quality:
+                h264['QualityTuningLevel'] = quality
+            video['CodecSettings'] = dict(video['CodecSettings'], H264Settings=h264)
+            outputs.append(dict(base, NameModifier=name_modifier, VideoDescription=video))
+        return tuple(outputs)
+
+    def _ensure_registered(self, destination):
+        """MediaConvert JobTemplate으로 등록 (프로세스당 한 번) 후 템플릿의 출력 위치 반환"""
+        if self._registered_destination is None:
+            with self._lock:
+                if self._registered_destination is None:
+                    self._registered_destination = self._register(destination)
+        return self._registered_destination
+
+    def _register(self, destination):
+        try:
+            response = endpoint.call_mediaconvert('get_job_template', Name=self.template_name)
+            group = response['JobTemplate']['Settings']['OutputGroups'][0]
+            return group['OutputGroupSettings']['FileGroupSettings']['Destination']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'NotFoundException':
+                raise
+
+        settings = dict(self.settings, OutputGroups=self.output_groups(destination))
+        settings['Inputs'] = [self.input]
+        params = {k: v for k, v in self.job_fields.items() if k != 'Queue'}
+        endpoint.call_mediaconvert(
+            'create_job_template',
+            Name=self.template_name,
+            Description=self.description,
+            Settings=settings,
+            **params
+        )
+        log.info("📋 MediaConvert JobTemplate 등록", template=self.template_name)
+        return destination
+
+
+# 모든 프로파일을 모듈 로드 시 한 번만 컴파일
+PROFILES = {name: CompiledProfile(name, definition) for name, definition in PROFILE_DEFINITIONS.items()}
+
+
+def get_profile(name):
+    """이름으로 컴파일된 프로파일 반환"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"알 수 없는 인코딩 프로파일: {name}")
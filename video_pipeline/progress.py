@@ -0,0 +1,44 @@
+import time
+
+from video_pipeline import metrics
+
+# MediaConvert STATUS_UPDATE 이벤트(StatusUpdateInterval마다 발송)의 진행률로 인코딩 속도와 남은 시간 추정
+
+
+def estimate(detail, record, at):
+    """
+    STATUS_UPDATE 이벤트와 작업 기록으로 진행 필드 계산 (진행률이 없으면 None)
+    encode_speed: 처리한 영상 길이(초) / 경과 시간(초) - 입력 길이를 알 때만
+    eta_at: 지금까지의 진행 속도가 유지된다고 보고 계산한 예상 종료 시각 (epoch 초)
+    """
+    job_progress = detail.get('jobProgress') or {}
+    percent = job_progress.get('jobPercentComplete')
+    if percent is None:
+        return None
+    fields = {'progress': percent, 'phase': job_progress.get('currentPhase'), 'progress_at': at}
+
+    record = record or {}
+    # 시작 이벤트(PROGRESSING)를 못 받았으면 제출 시각 기준 (대기 시간이 포함되어 속도가 낮게 잡힘)
+    started = record.get('started_at') or record.get('submitted_at')
+    elapsed = at - started if started else 0
+    if elapsed > 0 and percent > 0:
+        fields['eta_at'] = round(at + elapsed * (100 - percent) / percent, 3)
+        if record.get('duration'):
+            fields['encode_speed'] = round(record['duration'] * percent / 100 / elapsed, 3)
+    return fields
+
+
+def record_metrics(fields):
+    """진행률 이벤트마다 인코딩 속도/남은 시간 지표 기록 (합계로 전체 처리량과 적체 해소 시간 추정)"""
+    metrics.record('JobProgress', fields['progress'], 'Percent')
+    if fields.get('encode_speed') is not None:
+        metrics.record('EncodeSpeed', fields['encode_speed'], 'None')
+    if fields.get('eta_at') is not None:
+        metrics.record('JobEta', round(fields['eta_at'] - fields['progress_at']), 'Seconds')
+
+
+def remaining_seconds(record, now=None):
+    """조회 시점 기준 남은 시간 (초) - 종료되었거나 추정값이 없으면 None"""
+    if not record or record.get('finished_at') or not record.get('eta_at'):
+        return None
+    return max(0, round(record['eta_at'] - (now or time.time())))
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+
+from video_pipeline import endpoint, log
+
+# 작업을 분산할 MediaConvert 큐 목록 (JSON 배열, 미지정 시 프로파일의 큐 사용)
+# 예: [{"name": "reserved-hd", "reserved": true, "capacity": 5},
+#      {"name": "Default", "capacity": 20},
+#      {"name": "short-clips", "capacity": 20, "max_bytes": 104857600}]
+# capacity: 동시에 처리할 수 있는 작업 수 (예약 큐는 예약 슬롯 수) / max_bytes: 이 크기를 넘는 입력은 받지 않음
+MEDIACONVERT_QUEUES = json.loads(os.environ.get('MEDIACONVERT_QUEUES', '[]'))
+# 큐 적체 조회(GetQueue) 결과 재사용 시간
+QUEUE_STATS_TTL_SECONDS = float(os.environ.get('QUEUE_STATS_TTL_SECONDS', '30'))
+
+# 입력 크기별 작업 우선순위 (-50 ~ 50, 높을수록 먼저 처리) - 짧은 클립이 긴 영상 뒤에서 기다리지 않도록
+SMALL_JOB_BYTES = int(os.environ.get('SMALL_JOB_BYTES', str(100 * 1024 * 1024)))
+LARGE_JOB_BYTES = int(os.environ.get('LARGE_JOB_BYTES', str(2 * 1024 * 1024 * 1024)))
+SMALL_JOB_PRIORITY = int(os.environ.get('SMALL_JOB_PRIORITY', '10'))
+LARGE_JOB_PRIORITY = int(os.environ.get('LARGE_JOB_PRIORITY', '-10'))
+
+DEFAULT_QUEUE_CAPACITY = 20
+
+# 큐 이름별 {'backlog': 제출+처리 중 작업 수, 'fetched_at': 조회 시각}
+_stats = {}
+_lock = threading.Lock()
+
+
+def job_priority(size):
+    """입력 크기로 작업 우선순위 결정 (크기를 모르면 None - 프로파일 기본값 사용)"""
+    if size is None:
+        return None
+    if size <= SMALL_JOB_BYTES:
+        return SMALL_JOB_PRIORITY
+    if size >= LARGE_JOB_BYTES:
+        return LARGE_JOB_PRIORITY
+    return 0
+
+
+def route_job(size=None, accelerated=False, queue=None):
+    """
+    입력 크기와 큐 적체 상황으로 제출할 큐와 우선순위 결정
+    반환값: {'queue': 큐 이름 또는 None, 'priority': 우선순위 또는 None, 'metadata': UserMetadata에 기록할 값}
+    예약 큐는 빈 슬롯이 있으면 우선 사용하고, 나머지는 (적체 / 용량)이 가장 낮은 큐를 선택합니다.
+    가속 변환 작업은 예약 큐에서 실행할 수 없으므로 온디맨드 큐만 고려하며, queue를 지정하면 그대로 사용합니다.
+    """
+    priority = job_priority(size)
+    metadata = {}
+    if priority is not None:
+        metadata['JobPriority'] = str(priority)
+
+    if queue:
+        metadata.update(QueueName=queue, QueueRouting='policy')
+        return {'queue': queue, 'priority': priority, 'metadata': metadata}
+
+    eligible = [q for q in MEDIACONVERT_QUEUES if not (accelerated and q.get('reserved'))]
+    candidates = [
+        q for q in eligible
+        if q.get('max_bytes') is None or (size is not None and size <= q['max_bytes'])
+    ] or eligible
+    if not candidates:
+        return {'queue': None, 'priority': priority, 'metadata': metadata}
+
+    # 큐 조회(네트워크 호출)는 잠금 밖에서 하고, 잠금은 캐시된 적체를 읽고 갱신할 때만 사용
+    _refresh([q['name'] for q in candidates])
+    with _lock:
+        loads = [(_stats[q['name']]['backlog'] / q.get('capacity', DEFAULT_QUEUE_CAPACITY), q) for q in candidates]
+        free_reserved = [(load, q) for load, q in loads if q.get('reserved') and load < 1]
+        load, queue = min(free_reserved or loads, key=lambda item: item[0])
+        # 다음 조회 전까지 같은 실행 환경의 다른 작업이 같은 큐로 몰리지 않도록 미리 반영
+        _stats[queue['name']]['backlog'] += 1
+
+    reason = 'reserved_free_slot' if free_reserved else 'least_loaded'
+    metadata.update(QueueName=queue['name'], QueueLoad=f"{load:.2f}", QueueRouting=reason)
+    log.info("🚦 큐 선택", queue=queue['name'], load=round(load, 2), routing=reason, priority=priority)
+    return {'queue': queue['name'], 'priority': priority, 'metadata': metadata}
+
+
+def _refresh(queue_names):
+    """TTL이 지난 큐의 적체를 다시 조회해 캐시 갱신 (조회 실패 시 마지막 값 사용)"""
+    with _lock:
+        now = time.monotonic()
+        stale = [
+            name for name in queue_names
+            if name not in _stats or now - _stats[name]['fetched_at'] >= QUEUE_STATS_TTL_SECONDS
+        ]
+    fetched = {name: _fetch_backlog(name) for name in stale}
+    with _lock:
+        for name, backlog in fetched.items():
+            if backlog is None:
+                entry = _stats.get(name)
+                backlog = entry['backlog'] if entry else 0
+            _stats[name] = {'backlog': backlog, 'fetched_at': time.monotonic()}
+
+
+def _fetch_backlog(queue_name):
+    """큐의 제출 대기 + 처리 중 작업 수 (GetQueue 조회, 실패 시 None)"""
+    try:
+        response = endpoint.call_mediaconvert('get_queue', Name=queue_name)['Queue']
+    except Exception as e:
+        log.warning("⚠️ 큐 상태 조회 실패", queue=queue_name, error=str(e))
+        return None
+    return response.get('SubmittedJobsCount', 0) + response.get('ProgressingJobsCount', 0)
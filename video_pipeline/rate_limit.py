@@ -0,0 +1,132 @@
+import json
+import os
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from video_pipeline import clients, endpoint, log, metrics
+
+# 실행 환경당 create_job 초당 요청 수 (계정 한도 / 예상 동시 실행 환경 수로 설정)
+CREATE_JOB_TPS = float(os.environ.get('CREATE_JOB_TPS', '10'))
+CREATE_JOB_BURST = int(os.environ.get('CREATE_JOB_BURST', '20'))
+# 스로틀 시 재시도 설정 (MediaConvert 클라이언트의 짧은 standard 재시도가 모두 실패한 뒤 적용되는 바깥쪽 재시도)
+SUBMIT_MAX_ATTEMPTS = int(os.environ.get('SUBMIT_MAX_ATTEMPTS', '5'))
+SUBMIT_MAX_WAIT_SECONDS = float(os.environ.get('SUBMIT_MAX_WAIT_SECONDS', '60'))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10.0
+# 지정하면 한도 초과 시 이벤트를 이 SQS 큐로 다시 넣어 나중에 처리
+DEFERRAL_QUEUE_URL = os.environ.get('DEFERRAL_QUEUE_URL')
+DEFERRAL_DELAY_SECONDS = int(os.environ.get('DEFERRAL_DELAY_SECONDS', '60'))
+
+THROTTLE_ERROR_CODES = {'TooManyRequestsException', 'ThrottlingException', 'LimitExceededException'}
+
+
+class SubmissionDeferred(Exception):
+    """스로틀 재시도 한도를 넘어 제출을 미뤄야 하는 경우"""
+
+
+class TokenBucket:
+    """
+    토큰 버킷 속도 제한기
+    스로틀을 받으면 속도를 절반으로 줄이고, 성공할 때마다 설정값까지 조금씩 회복합니다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.max_rate = rate
+        self.min_rate = rate / 10
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """토큰을 하나 얻을 때까지 대기 - timeout 안에 얻지 못하면 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+create_job_bucket = TokenBucket(CREATE_JOB_TPS, CREATE_JOB_BURST)
+
+
+def is_throttle_error(error):
+    return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in THROTTLE_ERROR_CODES
+
+
+def create_job(**job_request):
+    """
+    속도 제한과 지터 백오프를 적용한 create_job 호출
+    재시도 한도/대기 시간을 넘기면 SubmissionDeferred를 던져 호출자가 재전달하도록 합니다.
+    """
+    input_format = (job_request.get('UserMetadata') or {}).get('InputFormat')
+    dimensions = {'InputFormat': input_format} if input_format else {}
+    started = time.monotonic()
+    for attempt in range(SUBMIT_MAX_ATTEMPTS):
+        remaining = SUBMIT_MAX_WAIT_SECONDS - (time.monotonic() - started)
+        with metrics.timer('RateLimitWait'):
+            acquired = remaining > 0 and create_job_bucket.acquire(timeout=remaining)
+        if not acquired:
+            break
+        if attempt:
+            metrics.count('SubmitRetries')
+        try:
+            with metrics.timer('CreateJobLatency', **dimensions):
+                response = endpoint.call_mediaconvert('create_job', **job_request)
+            create_job_bucket.succeeded()
+            metrics.count('JobsSubmitted', **dimensions)
+            return response
+        except ClientError as e:
+            if not is_throttle_error(e):
+                raise
+            metrics.count('Throttles')
+            create_job_bucket.throttled()
+            if attempt + 1 == SUBMIT_MAX_ATTEMPTS:
+                break
+            # full jitter 지수 백오프
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            log.warning("⏳ create_job 스로틀, 재시도 대기", attempt=attempt + 1, max_attempts=SUBMIT_MAX_ATTEMPTS,
+                        delay=round(delay, 2), tps=round(create_job_bucket.rate, 1))
+            time.sleep(delay)
+    metrics.count('SubmissionsDeferred')
+    raise SubmissionDeferred(f"create_job 스로틀 한도 초과 ({SUBMIT_MAX_ATTEMPTS}회 시도)")
+
+
+def defer_event(event, error):
+    """
+    제출하지 못한 이벤트를 지연 큐에 다시 넣음
+    큐가 설정되지 않았으면 예외를 다시 던져 Lambda 재시도/DLQ가 처리하도록 합니다.
+    """
+    if not DEFERRAL_QUEUE_URL:
+        raise error
+    clients.get_client('sqs').send_message(
+        QueueUrl=DEFERRAL_QUEUE_URL,
+        MessageBody=json.dumps(event),
+        DelaySeconds=min(900, DEFERRAL_DELAY_SECONDS)
+    )
+    log.warning("📮 스로틀로 제출을 미루고 지연 큐에 재등록", error=str(error))
+    return {
+        'statusCode': 202,
+        'body': json.dumps({'message': '스로틀로 인해 작업 제출을 미룸', 'deferred': True})
+    }
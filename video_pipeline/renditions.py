@@ -0,0 +1,74 @@
+import json
+import os
+
+from video_pipeline import clients, log
+
+# 화질별 렌디션 정의 (bitrate가 None이면 프로파일 기본 비트레이트 사용)
+RENDITIONS = {
+    '480p': {'width': 720, 'height': 480, 'bitrate': None},
+    '720p': {'width': 1280, 'height': 720, 'bitrate': 3000000},
+    '1080p': {'width': 1920, 'height': 1080, 'bitrate': 5000000},
+}
+
+# 렌디션 사다리 - 하나의 작업에서 여러 출력으로 인코딩 (낮은 화질부터)
+LADDERS = {
+    'sd': ('480p',),
+    'hd': ('480p', '720p'),
+    'fhd': ('480p', '720p', '1080p'),
+}
+
+DEFAULT_LADDER = os.environ.get('DEFAULT_RENDITION_LADDER', 'sd')
+# 입력 키 접두사별 사다리 선택 규칙 (예: {"premium/": "fhd", "shorts/": "hd"})
+LADDER_RULES = json.loads(os.environ.get('RENDITION_LADDER_RULES', '{}'))
+# 객체 메타데이터(x-amz-meta-rendition-ladder)로 선택 - HeadObject 호출이 필요하므로 선택 사항
+METADATA_LOOKUP = os.environ.get('RENDITION_METADATA_LOOKUP', 'false').lower() == 'true'
+METADATA_KEY = 'rendition-ladder'
+
+
+def _validate(default, rules):
+    """기본 사다리와 접두사 규칙의 사다리 이름 확인 - 잘못된 이름은 요청마다 KeyError가 되므로 초기화 시 실패"""
+    if default not in LADDERS:
+        raise ValueError(f"알 수 없는 렌디션 사다리: DEFAULT_RENDITION_LADDER={default}")
+    for prefix, ladder in rules.items():
+        if ladder not in LADDERS:
+            raise ValueError(f"알 수 없는 렌디션 사다리: RENDITION_LADDER_RULES[{prefix!r}]={ladder}")
+
+
+_validate(DEFAULT_LADDER, LADDER_RULES)
+
+# 접두사가 긴 규칙이 먼저 적용되도록 정렬
+_SORTED_RULES = sorted(LADDER_RULES.items(), key=lambda item: len(item[0]), reverse=True)
+
+
+def select_ladder(object_key, metadata=None):
+    """객체 메타데이터 → 키 접두사 규칙 → 기본값 순서로 렌디션 사다리 이름 선택"""
+    requested = (metadata or {}).get(METADATA_KEY)
+    if requested in LADDERS:
+        return requested
+    for prefix, ladder in _SORTED_RULES:
+        if object_key.startswith(prefix):
+            return ladder
+    return DEFAULT_LADDER
+
+
+def resolve_ladder(bucket_name, object_key):
+    """S3 객체에 적용할 렌디션 사다리 결정 (설정된 경우에만 메타데이터 조회)"""
+    metadata = None
+    if METADATA_LOOKUP:
+        try:
+            metadata = clients.get_client('s3').head_object(Bucket=bucket_name, Key=object_key)['Metadata']
+        except Exception as e:
+            log.warning("⚠️ 객체 메타데이터 조회 실패, 접두사 규칙 사용", error=str(e))
+    return select_ladder(object_key, metadata)
+
+
+def ladder_rungs(ladder, source_height=None):
+    """
+    사다리의 렌디션 이름 튜플 반환
+    원본 해상도를 알면 원본보다 큰 렌디션은 제외 (가장 낮은 렌디션은 항상 유지)
+    """
+    rungs = LADDERS[ladder]
+    if source_height:
+        kept = tuple(r for r in rungs if RENDITIONS[r]['height'] <= source_height)
+        rungs = kept or rungs[:1]
+    return rungs
@@ -0,0 +1,267 @@
+import hashlib
+import math
+import os
+
+from video_pipeline import acceleration, clients, idempotency, job_store, log, metrics, output_layout, queues, rate_limit
+
+# 긴 영상 분할 병렬 변환 - 입력을 시간 구간으로 나눠 구간별 작업을 동시에 실행하고,
+# 모든 구간이 끝나면 렌디션별로 구간 출력을 재인코딩 없이 이어 붙이는 작업(패스스루)을 제출합니다.
+SEGMENTED_TRANSCODING_ENABLED = os.environ.get('SEGMENTED_TRANSCODING_ENABLED', 'false').lower() == 'true'
+# 이 길이(초) 이상인 입력만 분할 (길이는 입력 분석 결과 기준 - 모르면 분할하지 않음)
+SEGMENT_MIN_DURATION_SECONDS = int(os.environ.get('SEGMENT_MIN_DURATION_SECONDS', '1800'))
+SEGMENT_TARGET_SECONDS = int(os.environ.get('SEGMENT_TARGET_SECONDS', '600'))
+# 영상 하나가 큐의 동시 처리 슬롯을 모두 차지하지 않도록 제한
+SEGMENT_MAX_COUNT = int(os.environ.get('SEGMENT_MAX_COUNT', '20'))
+# 구간 출력 위치 (입장 필터도 같은 값을 쓰도록 output_layout에 정의)
+SEGMENT_PREFIX = output_layout.SEGMENT_PREFIX
+# 구간 작업이 이 상태로 끝나면 구간 출력이 없어 이어 붙일 수 없음
+FAILED_STATUSES = ('ERROR', 'CANCELED')
+
+
+def require_shared_idempotency():
+    """
+    분할 변환을 쓰는데 IDEMPOTENCY_TABLE이 없으면 ValueError (핸들러 초기화 시 호출)
+    재시도 시 구간 재제출 방지와 이어 붙이기 1회 제출은 실행 환경 간에 공유되는 멱등성 저장소에 달려 있어,
+    실행 환경별 메모리 저장소로는 다른 실행 환경이 받은 완료 이벤트가 이어 붙이기를 다시 제출합니다.
+    """
+    if SEGMENTED_TRANSCODING_ENABLED and not idempotency.IDEMPOTENCY_TABLE:
+        raise ValueError("SEGMENTED_TRANSCODING_ENABLED에는 IDEMPOTENCY_TABLE이 필요합니다")
+
+
+def plan(duration, frame_rate=None):
+    """
+    입력 길이(초)를 구간 목록 [(시작 초, 끝 초)]으로 분할 - 분할하지 않으면 None
+    구간 경계는 초 단위로 맞추고, 마지막 구간은 끝을 지정하지 않아 파일 끝까지 변환합니다.
+    구간 끝을 다음 구간 시작 한 프레임 전으로 잘라야 하므로 프레임 레이트를 모르면 분할하지 않습니다.
+    """
+    if not SEGMENTED_TRANSCODING_ENABLED or not duration or duration < SEGMENT_MIN_DURATION_SECONDS:
+        return None
+    if not frame_rate:
+        return None
+    count = min(SEGMENT_MAX_COUNT, math.ceil(duration / SEGMENT_TARGET_SECONDS))
+    if count < 2:
+        return None
+    length = math.ceil(duration / count)
+    return [(i * length, (i + 1) * length if i < count - 1 else None) for i in range(count)]
+
+
+def group_id(input_bucket, input_key, object_info=None):
+    """같은 입력(버전)의 재시도는 같은 구간 위치를 쓰도록 입력 경로/ETag로 그룹 ID 생성"""
+    version = (object_info or {}).get('etag') or (object_info or {}).get('size') or ''
+    raw = f"{input_bucket}/{input_key}#{version}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def timecode(seconds, frame=0):
+    """초와 그 초 안의 프레임 번호 → MediaConvert 타임코드 (HH:MM:SS:FF)"""
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}:{frame:02d}"
+
+
+def clip(request, start, end, frame_rate):
+    """
+    create_job 요청의 입력을 start초부터 end초 한 프레임 전까지로 제한한 복사본 (템플릿 객체는 수정하지 않음)
+    입력 클리핑은 양 끝 프레임을 모두 포함하므로 end초의 첫 프레임은 다음 구간에만 넣어야
+    이어 붙인 뒤 경계마다 프레임이 겹치거나 음성이 밀리지 않습니다.
+    타임코드 프레임 번호는 정수 프레임 레이트(29.97 → 30) 기준입니다.
+    """
+    clipping = {'StartTimecode': timecode(start)}
+    if end is not None:
+        clipping['EndTimecode'] = timecode(end - 1, round(frame_rate) - 1)
+    settings = dict(request['Settings'])
+    # 원본 타임코드와 무관하게 0부터 세도록 ZEROBASED 사용
+    settings['Inputs'] = [dict(settings['Inputs'][0], TimecodeSource='ZEROBASED', InputClippings=[clipping])]
+    return dict(request, Settings=settings)
+
+
+def name_modifiers(request):
+    """요청의 출력 이름 목록 (렌디션별 NameModifier)"""
+    return [
+        output['NameModifier']
+        for group in request['Settings'].get('OutputGroups', [])
+        for output in group['Outputs']
+    ]
+
+
+def segment_key(group, index, modifier):
+    return f"{SEGMENT_PREFIX}{group}/part{index:04d}{modifier}.mp4"
+
+
+def submit(profile, role, input_uri, output_bucket, output_base, group, ranges, size=None, probe_info=None,
+           metadata=None, rungs=None):
+    """
+    구간별 변환 작업 제출 후 작업 ID 목록 반환
+    output_base: 최종 출력 키에서 NameModifier/확장자를 뺀 부분 (출력 접두사 + 입력 파일명)
+    구간마다 길이/크기를 비례 배분하여 가속 정책과 큐를 다시 고르므로 구간이 여러 큐로 흩어질 수 있습니다.
+    """
+    segment_size = int(size / len(ranges)) if size else None
+    job_ids = []
+    skipped = 0
+    for index, (start, end) in enumerate(ranges):
+        # 구간마다 멱등성 키를 두어, 중간 구간에서 실패한 제출을 재시도하면 이미 제출한 구간은 건너뜀
+        job_id, duplicate = idempotency.submit_once(
+            f"segment/{group}/{index}",
+            lambda index=index, start=start, end=end: _submit_segment(
+                profile, role, input_uri, output_bucket, output_base, group, ranges, index, start, end,
+                segment_size, probe_info, metadata, rungs
+            )
+        )
+        skipped += duplicate
+        job_ids.append(job_id)
+    metrics.count('SegmentedJobs')
+    metrics.count('SegmentsSubmitted', len(job_ids) - skipped)
+    if skipped:
+        metrics.count('SegmentsSkipped', skipped)
+    log.info("✂️ 분할 변환 작업 제출", segment_group=group, segments=len(job_ids), skipped=skipped, job_ids=job_ids)
+    return job_ids
+
+
+def _submit_segment(profile, role, input_uri, output_bucket, output_base, group, ranges, index, start, end,
+                    segment_size, probe_info, metadata, rungs):
+    """구간 하나의 작업 제출 후 작업 ID 반환"""
+    length = (end if end is not None else (probe_info or {}).get('duration') or start) - start
+    tuning = acceleration.select(segment_size, dict(probe_info or {}, duration=length))
+    route = queues.route_job(segment_size, tuning['mode'] in ('PREFERRED', 'ENABLED'), tuning['queue'])
+    request = profile.build(
+        role,
+        input_uri,
+        f"s3://{output_bucket}/{SEGMENT_PREFIX}{group}/part{index:04d}",
+        metadata=dict(
+            metadata or {},
+            SegmentGroup=group,
+            SegmentIndex=str(index),
+            SegmentCount=str(len(ranges)),
+            SegmentOutput=f"s3://{output_bucket}/{output_base}",
+            **acceleration.job_metadata(tuning),
+            **route['metadata']
+        ),
+        rungs=rungs,
+        priority=route['priority'],
+        queue=route['queue'],
+        acceleration=tuning['mode'],
+        quality=tuning['quality'],
+        # 구간마다 출력 위치/이름이 달라야 하므로 JobTemplate 없이 항상 설정 전체 전송
+        inline=True
+    )
+    request = clip(request, start, end, probe_info['frame_rate'])
+    request['UserMetadata']['SegmentModifiers'] = ','.join(name_modifiers(request))
+    job_id = rate_limit.create_job(**request)['Job']['Id']
+    job_store.record_submission(job_id, input_uri, input_format=request['UserMetadata'].get('InputFormat'),
+                                queue=request.get('Queue'), action='segment', segment_group=group,
+                                duration=length or None)
+    return job_id
+
+
+def group_job_id(group):
+    """분할 변환 전체를 가리키는 ID (핸들러 반환값, 그룹 실패 기록의 job_id)"""
+    return f"segments-{group}"
+
+
+def is_segment(detail):
+    return 'SegmentIndex' in (detail.get('userMetadata') or {})
+
+
+def on_segment_failed(detail):
+    """
+    구간 작업 실패/취소 이벤트 처리 - 이어 붙일 수 없으므로 그룹 전체를 같은 상태(ERROR/CANCELED)로 기록하고 지표 기록
+    반환값: {'group', 'failed_segment'}
+    """
+    metadata = detail['userMetadata']
+    group = metadata['SegmentGroup']
+    status = 'CANCELED' if detail.get('status') == 'CANCELED' else 'ERROR'
+    reason = '취소' if status == 'CANCELED' else '변환 실패'
+    error = detail.get('errorMessage') or f"구간 {metadata['SegmentIndex']} {reason}"
+    job_store.record_submission(group_job_id(group), metadata.get('InputFile'), status=status,
+                                input_format=metadata.get('InputFormat'), action='segment', segment_group=group,
+                                error=error)
+    metrics.count('SegmentGroupsFailed')
+    log.error("❌ 구간 변환 실패, 분할 변환 중단", segment_group=group, segment_index=metadata['SegmentIndex'],
+              status=status, error=error)
+    return {'group': group, 'failed_segment': int(metadata['SegmentIndex'])}
+
+
+def completed_segments(bucket, group):
+    """구간 출력 위치에 있는 파일 키 집합"""
+    paginator = clients.get_client('s3').get_paginator('list_objects_v2')
+    keys = set()
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{SEGMENT_PREFIX}{group}/"):
+        keys.update(item['Key'] for item in page.get('Contents', []))
+    return keys
+
+
+def on_segment_complete(detail, profile, role):
+    """
+    구간 작업 완료 이벤트 처리 - 모든 구간 출력이 준비되었으면 렌디션별 이어 붙이기 작업 제출
+    완료 이벤트가 동시에 와도 이어 붙이기는 한 번만 제출되도록 멱등성 저장소를 사용합니다.
+    실패/취소 이벤트가 들어오거나 그룹이 이미 실패/취소로 기록되었으면 이어 붙이지 않습니다.
+    반환값: {'group', 'remaining', 'stitch_jobs'}
+    """
+    metadata = detail['userMetadata']
+    group = metadata['SegmentGroup']
+    if detail.get('status') in FAILED_STATUSES:
+        on_segment_failed(detail)
+        return {'group': group, 'remaining': None, 'stitch_jobs': None}
+    stopped = job_store.lookup(job_id=group_job_id(group))
+    if stopped and stopped[0].get('status') in FAILED_STATUSES:
+        log.warning("⚠️ 실패/취소된 분할 변환의 구간 완료, 이어 붙이지 않음", segment_group=group,
+                    segment_index=metadata['SegmentIndex'], status=stopped[0]['status'])
+        return {'group': group, 'remaining': None, 'stitch_jobs': None}
+    count = int(metadata['SegmentCount'])
+    modifiers = metadata['SegmentModifiers'].split(',')
+    bucket, output_base = metadata['SegmentOutput'][len('s3://'):].split('/', 1)
+
+    present = completed_segments(bucket, group)
+    expected = [segment_key(group, index, modifier) for index in range(count) for modifier in modifiers]
+    remaining = len([key for key in expected if key not in present])
+    log.info("✂️ 구간 변환 완료", segment_group=group, segment_index=metadata['SegmentIndex'],
+             remaining=remaining)
+    if remaining:
+        return {'group': group, 'remaining': remaining, 'stitch_jobs': None}
+
+    stitch_jobs, duplicate = idempotency.submit_once(
+        f"stitch/{group}",
+        lambda: ','.join(stitch(profile, role, bucket, output_base, group, count, modifiers, metadata))
+    )
+    return {'group': group, 'remaining': 0, 'stitch_jobs': stitch_jobs.split(',') if stitch_jobs else None}
+
+
+def stitch(profile, role, bucket, output_base, group, count, modifiers, segment_metadata):
+    """렌디션마다 구간 출력을 순서대로 입력으로 넣어 하나의 MP4로 이어 붙이는 작업 제출 (영상/음성 패스스루)"""
+    # 구간 작업에만 의미가 있는 값은 제외하고 원본 정보만 넘김
+    metadata = {
+        key: value for key, value in segment_metadata.items()
+        if key in ('InputFile', 'InputFormat', 'RenditionLadder')
+    }
+    route = queues.route_job()
+    job_ids = []
+    for modifier in modifiers:
+        # 출력 위치에 원본 파일명을 넣어 분할하지 않은 변환과 같은 이름으로 저장
+        request = profile.build(
+            role,
+            f"s3://{bucket}/{segment_key(group, 0, modifier)}",
+            f"s3://{bucket}/{output_base}",
+            metadata=dict(metadata, ConversionAction='stitch', StitchedFrom=group, SegmentCount=str(count),
+                          **route['metadata']),
+            remux=True,
+            priority=route['priority'],
+            queue=route['queue'],
+            inline=True
+        )
+        settings = dict(request['Settings'])
+        template_input = settings['Inputs'][0]
+        settings['Inputs'] = [
+            dict(template_input, FileInput=f"s3://{bucket}/{segment_key(group, index, modifier)}")
+            for index in range(count)
+        ]
+        settings['OutputGroups'] = [
+            dict(output_group, Outputs=[dict(output, NameModifier=modifier) for output in output_group['Outputs']])
+            for output_group in settings['OutputGroups']
+        ]
+        request['Settings'] = settings
+        job_ids.append(rate_limit.create_job(**request)['Job']['Id'])
+        job_store.record_submission(job_ids[-1], metadata.get('InputFile'), input_format=metadata.get('InputFormat'),
+                                    queue=request.get('Queue'), action='stitch', segment_group=group)
+    metrics.count('SegmentStitches')
+    log.info("🧵 구간 이어 붙이기 작업 제출", segment_group=group, job_ids=job_ids)
+    return job_ids
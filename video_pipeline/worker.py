@@ -0,0 +1,376 @@
+"""
+상시 실행 워커 - 업로드 이벤트 큐를 Lambda 밖에서 계속 처리
+
+S3 업로드 이벤트(EventBridge → SQS 타겟 또는 S3 → SQS 알림)가 쌓이는 큐에서 메시지를 받아
+변환 Lambda 핸들러의 배치 모드로 처리합니다. 클라이언트/프로파일/중복 제거/속도 제한은 프로세스 안에서
+계속 재사용되므로 호출마다의 오버헤드와 콜드 스타트가 없습니다.
+처리에 성공한 메시지만 삭제하고, 실패한 메시지는 가시성 제한 시간이 지나면 다시 전달됩니다.
+
+사용 예:
+    python -m video_pipeline.worker --queue-url https://sqs.ap-northeast-2.amazonaws.com/123456789012/uploads \\
+        --workers 20 --health-port 8080
+"""
+import argparse
+import importlib
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from video_pipeline import log
+
+# SQS 한 번의 수신 최대 메시지 수
+SQS_MAX_MESSAGES = 10
+
+
+class SQSQueue:
+    """SQS 큐 - 긴 폴링으로 수신하고 10개씩 묶어 삭제"""
+
+    def __init__(self, queue_url, client=None):
+        self.queue_url = queue_url
+        self.client = client
+
+    def _sqs(self):
+        if self.client is None:
+            # 커넥션 풀 크기(BATCH_MAX_WORKERS)가 정해진 뒤 클라이언트 생성
+            from video_pipeline import clients
+            self.client = clients.get_client('sqs')
+        return self.client
+
+    def receive(self, max_messages, wait_seconds):
+        response = self._sqs().receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(SQS_MAX_MESSAGES, max_messages),
+            WaitTimeSeconds=wait_seconds
+        )
+        return [
+            {'id': m['MessageId'], 'body': m['Body'], 'handle': m['ReceiptHandle']}
+            for m in response.get('Messages', [])
+        ]
+
+    def delete(self, messages):
+        for start in range(0, len(messages), SQS_MAX_MESSAGES):
+            chunk = messages[start:start + SQS_MAX_MESSAGES]
+            response = self._sqs().delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[{'Id': str(i), 'ReceiptHandle': m['handle']} for i, m in enumerate(chunk)]
+            )
+            if response.get('Failed'):
+                log.warning("⚠️ 메시지 삭제 실패", failed=len(response['Failed']))
+
+    def release(self, messages):
+        """처리하지 않은 메시지를 바로 다시 받을 수 있도록 가시성 제한 해제"""
+        for start in range(0, len(messages), SQS_MAX_MESSAGES):
+            chunk = messages[start:start + SQS_MAX_MESSAGES]
+            self._sqs().change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {'Id': str(i), 'ReceiptHandle': m['handle'], 'VisibilityTimeout': 0}
+                    for i, m in enumerate(chunk)
+                ]
+            )
+
+
+class MemoryQueue:
+    """
+    프로세스 메모리 큐 (로컬 실행/테스트용) - SQS처럼 받은 메시지는 삭제 전까지 숨기고
+    visibility_timeout이 지나면 다시 전달합니다.
+    max_receive_count번 받고도 삭제되지 않은 메시지는 dead_letters로 옮깁니다 (SQS 재드라이브 정책과 같음).
+    """
+
+    def __init__(self, visibility_timeout=30, max_receive_count=5):
+        self.visibility_timeout = visibility_timeout
+        self.max_receive_count = max_receive_count
+        self.dead_letters = []
+        self._messages = queue.Queue()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def send(self, body):
+        message_id = str(uuid.uuid4())
+        self._messages.put({
+            'id': message_id,
+            'body': body if isinstance(body, str) else json.dumps(body),
+            'receive_count': 0
+        })
+        return message_id
+
+    def receive(self, max_messages, wait_seconds):
+        self._requeue_expired()
+        received = []
+        deadline = time.time() + wait_seconds
+        while len(received) < max_messages:
+            try:
+                timeout = max(0, deadline - time.time()) if not received else 0
+                message = self._messages.get(timeout=timeout) if timeout else self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if message['receive_count'] >= self.max_receive_count:
+                self.dead_letters.append(message)
+                continue
+            message = dict(message, handle=str(uuid.uuid4()), receive_count=message['receive_count'] + 1)
+            with self._lock:
+                self._in_flight[message['handle']] = (message, time.time() + self.visibility_timeout)
+            received.append(message)
+        return received
+
+    def delete(self, messages):
+        with self._lock:
+            for message in messages:
+                self._in_flight.pop(message['handle'], None)
+
+    def release(self, messages):
+        with self._lock:
+            released = [self._in_flight.pop(m['handle'], None) for m in messages]
+        for entry in released:
+            if entry:
+                # 처리하지 않고 돌려준 메시지는 수신 횟수에 넣지 않음
+                self._requeue(entry[0], entry[0]['receive_count'] - 1)
+
+    def _requeue_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [handle for handle, (_, until) in self._in_flight.items() if until <= now]
+            entries = [self._in_flight.pop(handle) for handle in expired]
+        for message, _ in entries:
+            self._requeue(message, message['receive_count'])
+
+    def _requeue(self, message, receive_count):
+        self._messages.put({'id': message['id'], 'body': message['body'], 'receive_count': receive_count})
+
+    def pending(self):
+        """아직 삭제되지 않은 메시지 수 (대기 + 처리 중)"""
+        with self._lock:
+            return self._messages.qsize() + len(self._in_flight)
+
+
+class WorkerStats:
+    """처리량/상태 카운터 - 헬스 체크 응답과 주기 로그에 사용"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.received = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.batches = 0
+        self.in_flight = 0
+        self.last_poll_at = None
+        self.last_batch_at = None
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self):
+        with self._lock:
+            uptime = max(time.time() - self.started_at, 1e-9)
+            return {
+                'uptime_seconds': round(uptime, 1),
+                'received': self.received,
+                'succeeded': self.succeeded,
+                'failed': self.failed,
+                'batches': self.batches,
+                'in_flight': self.in_flight,
+                'messages_per_second': round((self.succeeded + self.failed) / uptime, 3),
+                'last_poll_at': self.last_poll_at,
+                'last_batch_at': self.last_batch_at,
+            }
+
+
+class Worker:
+    """
+    큐 수신 스레드가 메시지를 미리 받아 두고, 메인 루프가 모인 메시지를 핸들러 배치로 처리
+    핸들러 배치 모드가 BATCH_MAX_WORKERS 스레드 풀에서 레코드를 병렬로 제출합니다.
+    핸들러 호출은 한 번에 하나씩만 실행되어 호출 단위 로그/지표 상태가 섞이지 않습니다.
+    """
+
+    def __init__(self, source, handler, batch_size=10, wait_seconds=20, prefetch=None, idle_timeout=None):
+        self.source = source
+        self.handler = handler
+        self.batch_size = batch_size
+        self.wait_seconds = wait_seconds
+        self.idle_timeout = idle_timeout
+        self.stats = WorkerStats()
+        self._buffer = queue.Queue(maxsize=prefetch or batch_size * 2)
+        self._stopping = threading.Event()
+        self._receiver = None
+
+    def stop(self, *_):
+        """수신을 멈추고 처리 중인 배치가 끝나면 종료 (시그널 핸들러로도 사용)"""
+        if not self._stopping.is_set():
+            log.info("🛑 워커 종료 요청 - 처리 중인 메시지 마무리", in_flight=self.stats.in_flight)
+        self._stopping.set()
+
+    def healthy(self, stale_seconds=120):
+        """
+        처리 중인 배치가 있거나, 최근에 큐를 폴링했거나 배치를 끝냈으면 정상
+        긴 배치 동안 버퍼가 가득 차 수신 스레드가 폴링을 멈춰도 바쁜 워커를 비정상으로 보지 않습니다.
+        """
+        if self._stopping.is_set():
+            return False
+        if self.stats.in_flight:
+            return True
+        last_activity = max(self.stats.last_poll_at or 0, self.stats.last_batch_at or 0, self.stats.started_at)
+        return time.time() - last_activity < max(stale_seconds, self.wait_seconds * 3)
+
+    def _receive_loop(self):
+        while not self._stopping.is_set():
+            try:
+                messages = self.source.receive(SQS_MAX_MESSAGES, self.wait_seconds)
+            except Exception as e:
+                log.error("❌ 큐 수신 실패", error=str(e))
+                self._stopping.wait(1)
+                continue
+            self.stats.last_poll_at = time.time()
+            self.stats.add(received=len(messages))
+            for index, message in enumerate(messages):
+                # 버퍼가 가득 차면 처리를 기다리되, 종료 중이면 남은 메시지를 큐에 돌려줌
+                while not self._stopping.is_set():
+                    try:
+                        self._buffer.put(message, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+                else:
+                    self.source.release(messages[index:])
+                    return
+
+    def _next_batch(self):
+        """버퍼에서 최대 batch_size개 메시지 수집 (첫 메시지는 잠시 기다림)"""
+        messages = []
+        try:
+            messages.append(self._buffer.get(timeout=1))
+            while len(messages) < self.batch_size:
+                messages.append(self._buffer.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    def process(self, messages):
+        """메시지 묶음을 핸들러 배치 이벤트로 처리하고 성공한 메시지 삭제 - 실패한 메시지 수 반환"""
+        event = {'Records': [
+            {'messageId': m['id'], 'eventSource': 'aws:sqs', 'body': m['body']}
+            for m in messages
+        ]}
+        self.stats.add(in_flight=len(messages))
+        try:
+            response = self.handler.lambda_handler(event, None)
+            failed_ids = {item['itemIdentifier'] for item in response.get('batchItemFailures', [])}
+        except Exception as e:
+            # 예외는 전체 실패로 보고 메시지를 삭제하지 않음 (가시성 제한 후 재전달)
+            log.error("❌ 배치 처리 실패", error=str(e), messages=len(messages))
+            failed_ids = {m['id'] for m in messages}
+        finally:
+            self.stats.add(in_flight=-len(messages))
+
+        done = [m for m in messages if m['id'] not in failed_ids]
+        if done:
+            self.source.delete(done)
+        self.stats.add(succeeded=len(done), failed=len(messages) - len(done), batches=1)
+        self.stats.last_batch_at = time.time()
+        return len(messages) - len(done)
+
+    def run(self):
+        self._receiver = threading.Thread(target=self._receive_loop, name='queue-receiver', daemon=True)
+        self._receiver.start()
+        log.info("🚀 워커 시작", batch_size=self.batch_size)
+        idle_since = time.time()
+
+        while not self._stopping.is_set():
+            messages = self._next_batch()
+            if messages:
+                self.process(messages)
+                idle_since = time.time()
+            elif self.idle_timeout and time.time() - idle_since >= self.idle_timeout:
+                log.info("💤 대기 시간 초과로 워커 종료", idle_seconds=self.idle_timeout)
+                self.stop()
+
+        # 종료: 진행 중인 수신을 기다린 뒤 미리 받아 둔 메시지는 처리하지 않고 큐에 돌려줌
+        self._receiver.join(timeout=self.wait_seconds + 5)
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._buffer.get_nowait())
+            except queue.Empty:
+                break
+        if leftover:
+            self.source.release(leftover)
+        log.info("👋 워커 종료", released=len(leftover), **self.stats.snapshot())
+        return self.stats.snapshot()
+
+
+def serve_health(worker, port):
+    """GET /health (정상 200 / 비정상 503), GET /stats - 카운터 JSON"""
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ('/health', '/stats'):
+                self.send_error(404)
+                return
+            healthy = worker.healthy()
+            body = json.dumps(dict(worker.stats.snapshot(), healthy=healthy)).encode()
+            self.send_response(200 if healthy or self.path == '/stats' else 503)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            # 헬스 체크 요청은 로그에 남기지 않음
+            pass
+
+    server = ThreadingHTTPServer(('', port), HealthHandler)
+    threading.Thread(target=server.serve_forever, name='health', daemon=True).start()
+    return server
+
+
+def report_periodically(worker, interval):
+    """interval초마다 처리량 카운터 로그"""
+    def loop():
+        while not worker._stopping.wait(interval):
+            log.info("📈 워커 처리량", **worker.stats.snapshot())
+
+    threading.Thread(target=loop, name='stats-reporter', daemon=True).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='업로드 이벤트 큐를 계속 처리하는 변환 워커')
+    parser.add_argument('--queue-url', default=os.environ.get('WORKER_QUEUE_URL'), help='SQS 큐 URL')
+    parser.add_argument('--handler', default='lambda_function',
+                        choices=['lambda_function', 'enhanced_lambda_function', 'optimized_lambda_function'])
+    parser.add_argument('--workers', type=int, default=10, help='동시에 제출할 작업 수 (BATCH_MAX_WORKERS)')
+    parser.add_argument('--batch-size', type=int, help='핸들러 호출 한 번에 담을 메시지 수 (기본값 workers)')
+    parser.add_argument('--wait-seconds', type=int, default=20, help='SQS 긴 폴링 대기 시간')
+    parser.add_argument('--health-port', type=int, help='헬스 체크/카운터 HTTP 포트')
+    parser.add_argument('--stats-interval', type=int, default=60, help='처리량 로그 간격 (초, 0이면 끔)')
+    parser.add_argument('--idle-timeout', type=int, help='이 시간(초) 동안 메시지가 없으면 종료')
+    args = parser.parse_args(argv)
+    if not args.queue_url:
+        parser.error('--queue-url 또는 WORKER_QUEUE_URL이 필요합니다')
+
+    # 동시성 설정은 모듈 임포트 시 읽히므로 핸들러를 불러오기 전에 환경 변수로 지정
+    os.environ['BATCH_MAX_WORKERS'] = str(args.workers)
+    handler = importlib.import_module(args.handler)
+
+    worker = Worker(SQSQueue(args.queue_url), handler, batch_size=args.batch_size or args.workers,
+                    wait_seconds=args.wait_seconds, idle_timeout=args.idle_timeout)
+    # 컨테이너 종료(SIGTERM)/Ctrl+C 시 처리 중인 메시지를 마무리하고 종료
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    if args.health_port:
+        serve_health(worker, args.health_port)
+    if args.stats_interval:
+        report_periodically(worker, args.stats_interval)
+    stats = worker.run()
+    return 1 if stats['failed'] and not stats['succeeded'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())